@@ -1,12 +1,275 @@
+from __future__ import annotations
+
+import time
 from dataclasses import dataclass
-from typing import Dict, Any, List
-import numpy as np
+from enum import IntFlag
+from typing import TYPE_CHECKING, Dict, Any, List, NamedTuple, Optional
+
+# NumPy is only needed by the batch / state-export helpers; it is imported inside them so the
+# per-tick step() path starts without it.
+if TYPE_CHECKING:
+    import numpy as np
+
+
+STATES = ("NORMAL", "CAUTION", "CRITICAL")
+ACTIONS = ("GO", "SLOW + VERIFY", "STOP + ALERT")
+
+
+class Event(IntFlag):
+    SPIKE_MQ2 = 1
+    SPIKE_TEMP = 2
+    SPIKE_DIST = 4
+    INCONSISTENT_SENSORS = 8
+    CONF_DOWN = 16
+    CONF_RECOVER = 32
+    FORECAST_ESCALATION = 64
+
+
+# plain ints for the hot path; IntFlag arithmetic allocates
+EV_SPIKE_MQ2 = int(Event.SPIKE_MQ2)
+EV_SPIKE_TEMP = int(Event.SPIKE_TEMP)
+EV_SPIKE_DIST = int(Event.SPIKE_DIST)
+EV_INCONSISTENT = int(Event.INCONSISTENT_SENSORS)
+EV_CONF_DOWN = int(Event.CONF_DOWN)
+EV_CONF_RECOVER = int(Event.CONF_RECOVER)
+EV_FORECAST_ESCALATION = int(Event.FORECAST_ESCALATION)
+
+
+def render_events(mask: int, conf_before: float, conf: float) -> List[str]:
+    """Event bitmask -> the strings step() reports, in step() order."""
+    events = []
+    if mask & EV_SPIKE_MQ2: events.append("SPIKE_MQ2")
+    if mask & EV_SPIKE_TEMP: events.append("SPIKE_TEMP")
+    if mask & EV_SPIKE_DIST: events.append("SPIKE_DIST")
+    if mask & EV_INCONSISTENT: events.append("INCONSISTENT_SENSORS")
+    if mask & EV_CONF_DOWN:
+        events.append(f"CONF_DOWN:{conf_before:.2f}->{conf:.2f}")
+    elif mask & EV_CONF_RECOVER:
+        events.append(f"CONF_RECOVER:{conf_before:.2f}->{conf:.2f}")
+    if mask & EV_FORECAST_ESCALATION: events.append("FORECAST_ESCALATION")
+    return events
+
+
+class StepResult(NamedTuple):
+    """Result of AEISCore.step_lean(): numbers only, strings rendered on demand."""
+    t: int
+    temp_r: float
+    gas_r: float
+    dist_r: float
+    tilt_r: float
+    vib_r: float
+    baseline: int
+    conf_before: float
+    confidence: float
+    raw_risk: float
+    current_risk: float
+    forecast_risk: float
+    effective_risk: float
+    state: int
+    events: int
+
+    @property
+    def aeis_state(self) -> str:
+        return STATES[self.state]
+
+    @property
+    def baseline_state(self) -> str:
+        return STATES[self.baseline]
+
+    @property
+    def action(self) -> str:
+        return ACTIONS[self.state]
+
+    def event_strings(self) -> List[str]:
+        return render_events(self.events, self.conf_before, self.confidence)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The dict layout returned by AEISCore.step()."""
+        return {
+            "t": self.t,
+            "factors": {
+                "temp_r": self.temp_r,
+                "gas_r": self.gas_r,
+                "dist_r": self.dist_r,
+                "tilt_r": self.tilt_r,
+                "vib_r": self.vib_r,
+            },
+            "baseline_state": STATES[self.baseline],
+            "confidence": self.confidence,
+            "raw_risk": self.raw_risk,
+            "current_risk": self.current_risk,
+            "forecast_risk": self.forecast_risk,
+            "effective_risk": self.effective_risk,
+            "aeis_state": STATES[self.state],
+            "action": ACTIONS[self.state],
+            "events": self.event_strings(),
+        }
 
 
 def clamp01(x: float) -> float:
     return max(0.0, min(1.0, x))
 
 
+class RiskTrend:
+    """
+    Least-squares trend over the last `window` risk values.
+    Ring buffer + running sums (sum_y, sum_xy), so push() and forecast() are O(1)
+    and memory is capped at `window` floats.
+    """
+
+    def __init__(self, window: int, horizon: int):
+        self.window = max(1, int(window))
+        self.horizon = horizon
+        self.min_len = max(5, self.window)
+        self.buf: List[float] = [0.0] * self.window
+        self.head = 0
+        self.count = 0
+        self.last = 0.0
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+        w = self.window
+        self.x_mean = (w - 1) / 2.0
+        self.denom = w * (w * w - 1) / 12.0
+
+    def push(self, y: float) -> None:
+        w = self.window
+        if self.count < w:
+            self.buf[self.count] = y
+            self.sum_xy += self.count * y
+            self.sum_y += y
+        else:
+            y0 = self.buf[self.head]
+            self.buf[self.head] = y
+            self.head = (self.head + 1) % w
+            # x shifts down by one for every value still in the window
+            self.sum_xy += (w - 1) * y - (self.sum_y - y0)
+            self.sum_y += y - y0
+            if self.head == 0:
+                self._resync()
+        if self.count < self.min_len:
+            self.count += 1
+        self.last = y
+
+    def _resync(self) -> None:
+        # once per full lap: drop accumulated rounding error from the running sums.
+        # Plain in-order additions (sum() compensates on Python >= 3.12), as in kernel.py and run_batch.
+        sum_y = sum_xy = 0.0
+        for v in self.buf:
+            sum_y += v
+        for i, v in enumerate(self.buf):
+            sum_xy += i * v
+        self.sum_y, self.sum_xy = sum_y, sum_xy
+
+    def values(self) -> List[float]:
+        if self.count < self.window:
+            return self.buf[:self.count]
+        return self.buf[self.head:] + self.buf[:self.head]
+
+    def forecast(self) -> float:
+        if self.count < self.min_len:
+            return self.last if self.count else 0.0
+        if self.denom == 0: return self.last
+        slope = (self.sum_xy - self.x_mean * self.sum_y) / self.denom
+        return clamp01(self.last + slope * self.horizon)
+
+
+class LatencyHistogram:
+    """Log-scale nanosecond histogram (4 buckets per power of two, ~25% resolution), fixed memory."""
+
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * 256
+        self.n = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns: int) -> None:
+        b = ns.bit_length()
+        idx = b * 4 + ((ns >> (b - 3)) & 3) if b >= 3 else b * 4
+        self.counts[idx] += 1
+        self.n += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ns) of the bucket holding the q-th percentile."""
+        if self.n == 0:
+            return 0.0
+        rank = q / 100.0 * self.n
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                b, sub = divmod(idx, 4)
+                bound = ((4 + sub + 1) << (b - 3)) if b >= 3 else (1 << b)
+                return float(min(bound, self.max))
+        return float(self.max)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.n,
+            "mean_us": self.total / self.n / 1e3 if self.n else 0.0,
+            "p50_us": self.percentile(50) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max / 1e3,
+        }
+
+
+class StepStats:
+    """
+    Per-stage timings and event counters collected by AEISCore.step() while enabled.
+    Deadband fast-path ticks count in `step` and the counters like any other tick, and are
+    timed as one stage of their own (`fast`, also counted in `fast_steps`).
+    """
+
+    STAGES = ("normalize", "detect", "confidence", "fuse", "forecast", "output")
+    COUNTERS = ("steps", "fast_steps", "spike_mq2", "spike_temp", "spike_dist", "inconsistent", "conf_drops",
+                "forecast_escalations")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.step = LatencyHistogram()
+        self.stages = {name: LatencyHistogram() for name in self.STAGES}
+        self.fast = LatencyHistogram()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def record(self, marks: List[int], events: int) -> None:
+        st = self.stages
+        for name, a, b in zip(self.STAGES, marks, marks[1:]):
+            st[name].add(b - a)
+        self.step.add(marks[-1] - marks[0])
+        self._count(events)
+
+    def record_fast(self, ns: int, events: int) -> None:
+        self.fast.add(ns)
+        self.step.add(ns)
+        self.counters["fast_steps"] += 1
+        self._count(events)
+
+    def _count(self, events: int) -> None:
+        c = self.counters
+        c["steps"] += 1
+        if events:
+            if events & EV_SPIKE_MQ2: c["spike_mq2"] += 1
+            if events & EV_SPIKE_TEMP: c["spike_temp"] += 1
+            if events & EV_SPIKE_DIST: c["spike_dist"] += 1
+            if events & EV_INCONSISTENT: c["inconsistent"] += 1
+            if events & EV_CONF_DOWN: c["conf_drops"] += 1
+            if events & EV_FORECAST_ESCALATION: c["forecast_escalations"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "step": self.step.snapshot(),
+            "stages": {name: h.snapshot() for name, h in self.stages.items()},
+            "fast": self.fast.snapshot(),
+            "counters": dict(self.counters),
+        }
+
+
 @dataclass
 class AEISConfig:
     caution_risk: float = 0.42          
@@ -36,12 +299,145 @@ class AEISConfig:
     base_dist_crit: float = 0.82
 
 
+@dataclass
+class Deadband:
+    """
+    Change-driven evaluation (AEISCore.enable_deadband): a tick whose inputs are all within these
+    bands of the last fully evaluated sample, with confidence fully recovered, reuses that sample's
+    factors and risk and only advances the trend. At most `max_skip` ticks in a row take the fast
+    path, so a change hidden inside the bands is reported no more than `max_skip` ticks late.
+    Bands must stay below half the spike deltas (350 ADC / 5 °C / 35 cm) so no spike can be skipped.
+    """
+    temp_c: float = 0.2
+    mq2_adc: float = 15.0
+    dist_cm: float = 1.0
+    tilt_deg: float = 0.3
+    vib: float = 0.02
+    max_skip: int = 10
+
+
+class DeadbandStats:
+    """How often change-driven mode took the fast path, and how often max_skip forced a full step."""
+
+    __slots__ = ("fast", "full", "forced")
+
+    def __init__(self):
+        self.fast = 0
+        self.full = 0
+        self.forced = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        n = self.fast + self.full
+        return {
+            "fast": self.fast,
+            "full": self.full,
+            "forced": self.forced,
+            "fast_ratio": self.fast / n if n else 0.0,
+        }
+
+
+PREV_KEYS = ("mq2_adc", "temp_c", "dist_cm")
+
+
+def state_dtype(window: int) -> np.dtype:
+    """
+    Fixed-size record of everything AEISCore carries between ticks: confidence, the previous
+    spike-check readings and the trend ring (at most `window` values plus its running sums).
+    head and count are stored as u2, so windows above 65535 are rejected rather than truncated.
+    """
+    import numpy as np
+    window = max(1, int(window))
+    if window > 0xFFFF:
+        raise ValueError(f"trend_window {window} does not fit the state record (max 65535)")
+    return np.dtype([
+        ("conf", "<f8"),
+        ("prev", "<f8", (len(PREV_KEYS),)),
+        ("has_prev", "u1"),
+        ("head", "<u2"),
+        ("count", "<u2"),
+        ("last", "<f8"),
+        ("sum_y", "<f8"),
+        ("sum_xy", "<f8"),
+        ("buf", "<f8", (window,)),
+    ])
+
+
 class AEISCore:
     def __init__(self, cfg: AEISConfig):
         self.cfg = cfg
         self.conf = cfg.base_confidence
         self.prev: Dict[str, float] = {}
-        self.risk_history: List[float] = []
+        self.trend = RiskTrend(cfg.trend_window, cfg.forecast_horizon)
+        self.stats: Optional[StepStats] = None
+        self.deadband: Optional[Deadband] = None
+        self.deadband_stats = DeadbandStats()
+        self._db_ref: Optional[tuple] = None      # inputs of the last fully evaluated tick
+        self._db_last: Optional[StepResult] = None
+        self._db_skipped = 0
+
+    def enable_stats(self) -> StepStats:
+        """Start collecting per-stage timings; while disabled, step() pays one None check per stage."""
+        if self.stats is None:
+            self.stats = StepStats()
+        return self.stats
+
+    def disable_stats(self) -> None:
+        self.stats = None
+
+    def enable_deadband(self, db: Optional[Deadband] = None) -> DeadbandStats:
+        """Opt into change-driven evaluation; off by default, where every tick is fully evaluated."""
+        self.deadband = db or Deadband()
+        self._db_ref = None
+        return self.deadband_stats
+
+    def disable_deadband(self) -> None:
+        self.deadband = None
+        self._db_ref = None
+
+    @property
+    def risk_history(self) -> List[float]:
+        # only the trend window is retained
+        return self.trend.values()
+
+    def get_state(self) -> np.ndarray:
+        """Runtime state as one state_dtype record; set_state() on a fresh core resumes bit-exactly."""
+        import numpy as np
+        tr = self.trend
+        rec = np.zeros(1, dtype=state_dtype(tr.window))
+        rec["conf"] = self.conf
+        if self.prev:
+            rec["prev"] = [self.prev[k] for k in PREV_KEYS]
+            rec["has_prev"] = 1
+        rec["head"] = tr.head
+        rec["count"] = tr.count
+        rec["last"] = tr.last
+        rec["sum_y"] = tr.sum_y
+        rec["sum_xy"] = tr.sum_xy
+        rec["buf"] = tr.buf
+        return rec
+
+    def set_state(self, rec) -> None:
+        import numpy as np
+        rec = np.asarray(rec).reshape(-1)[0]
+        tr = self.trend
+        if rec["buf"].shape[0] != tr.window:
+            raise ValueError(f"State window {rec['buf'].shape[0]} != trend_window {tr.window}")
+        self.conf = float(rec["conf"])
+        self.prev = dict(zip(PREV_KEYS, rec["prev"].tolist())) if rec["has_prev"] else {}
+        tr.head = int(rec["head"])
+        tr.count = int(rec["count"])
+        tr.last = float(rec["last"])
+        tr.sum_y = float(rec["sum_y"])
+        tr.sum_xy = float(rec["sum_xy"])
+        tr.buf = rec["buf"].tolist()
+        self._db_ref = None
+
+    def state_bytes(self) -> bytes:
+        return self.get_state().tobytes()
+
+    def load_state_bytes(self, data: bytes) -> None:
+        import numpy as np
+        self.set_state(np.frombuffer(data, dtype=state_dtype(self.trend.window)))
 
     def norm_temp(self, temp_c: float) -> float:
         return clamp01((temp_c - self.cfg.temp_min) / (self.cfg.temp_max - self.cfg.temp_min))
@@ -82,18 +478,7 @@ class AEISCore:
         )
 
     def forecast_risk(self) -> float:
-        if len(self.risk_history) < max(5, self.cfg.trend_window):
-            return self.risk_history[-1] if self.risk_history else 0.0
-        w = self.cfg.trend_window
-        y = np.array(self.risk_history[-w:], dtype=float)
-        x = np.arange(w, dtype=float)
-        x_mean = x.mean()
-        y_mean = y.mean()
-        denom = ((x - x_mean) ** 2).sum()
-        if denom == 0: return self.risk_history[-1] if self.risk_history else 0.0
-        slope = ((x - x_mean) * (y - y_mean)).sum() / denom
-        forecast = y[-1] + slope * self.cfg.forecast_horizon
-        return clamp01(float(forecast))
+        return self.trend.forecast()
 
     def baseline_state(self, factors: Dict[str, float]) -> str:
         gas_r = factors["gas_r"]
@@ -106,84 +491,398 @@ class AEISCore:
         return "NORMAL"
 
     def step(self, s: Dict[str, float]) -> Dict[str, Any]:
-        t = int(s.get("t", -1))
-        temp_c = float(s["temp_c"])
-        mq2_adc = float(s["mq2_adc"])
-        dist_cm = float(s["dist_cm"])
-        tilt_deg = float(s["tilt_deg"])
-        vib = float(s["vib"])
-
-        factors = {
-            "temp_r": self.norm_temp(temp_c),
-            "gas_r": self.norm_mq2(mq2_adc),
-            "dist_r": self.norm_dist_risk(dist_cm),
-            "tilt_r": self.norm_tilt(tilt_deg),
-            "vib_r": self.norm_vib(vib),
-        }
+        return self.step_lean(
+            float(s["temp_c"]),
+            float(s["mq2_adc"]),
+            float(s["dist_cm"]),
+            float(s["tilt_deg"]),
+            float(s["vib"]),
+            int(s.get("t", -1)),
+        ).to_dict()
+
+    def step_lean(self, temp_c: float, mq2_adc: float, dist_cm: float, tilt_deg: float, vib: float,
+                  t: int = -1) -> StepResult:
+        """step() without the per-tick dict/list/string allocations; events come back as an Event bitmask."""
+        db = self.deadband
+        if db is not None and self._db_ref is not None and self.conf >= 1.0:
+            r = self._db_ref
+            if (abs(temp_c - r[0]) <= db.temp_c and abs(mq2_adc - r[1]) <= db.mq2_adc
+                    and abs(dist_cm - r[2]) <= db.dist_cm and abs(tilt_deg - r[3]) <= db.tilt_deg
+                    and abs(vib - r[4]) <= db.vib):
+                if self._db_skipped < db.max_skip:
+                    return self._step_fast(temp_c, mq2_adc, dist_cm, t)
+                self.deadband_stats.forced += 1
+
+        st = self.stats
+        if st is not None: marks = [time.perf_counter_ns()]
+        cfg = self.cfg
 
-        base_state = self.baseline_state(factors)
-        events: List[str] = []
+        # norm_* / _detect_spike / _inconsistency / fuse_risk inlined: same formulas, no call overhead
+        temp_r = max(0.0, min(1.0, (temp_c - cfg.temp_min) / (cfg.temp_max - cfg.temp_min)))
+        gas_r = max(0.0, min(1.0, (mq2_adc - cfg.mq2_min) / (cfg.mq2_max - cfg.mq2_min)))
+        dist_r = max(0.0, min(1.0, 1.0 - max(0.0, min(1.0, (dist_cm - cfg.dist_min) / (cfg.dist_max - cfg.dist_min)))))
+        if tilt_deg <= cfg.tilt_warn: tilt_r = 0.0
+        elif tilt_deg >= cfg.tilt_crit: tilt_r = 1.0
+        else: tilt_r = max(0.0, min(1.0, (tilt_deg - cfg.tilt_warn) / (cfg.tilt_crit - cfg.tilt_warn)))
+        if vib <= cfg.vib_warn: vib_r = 0.0
+        elif vib >= cfg.vib_crit: vib_r = 1.0
+        else: vib_r = max(0.0, min(1.0, (vib - cfg.vib_warn) / (cfg.vib_crit - cfg.vib_warn)))
+
+        if gas_r >= cfg.base_gas_crit or temp_r >= cfg.base_temp_crit or dist_r >= cfg.base_dist_crit:
+            base = 2
+        elif gas_r >= cfg.base_gas_warn or temp_r >= cfg.base_temp_warn or dist_r >= cfg.base_dist_warn:
+            base = 1
+        else:
+            base = 0
+        events = 0
         penalty = 0.0
+        if st is not None: marks.append(time.perf_counter_ns())
 
-        if self._detect_spike("mq2_adc", mq2_adc, 350):
-            penalty += self.cfg.spike_penalty
-            events.append("SPIKE_MQ2")
-        if self._detect_spike("temp_c", temp_c, 5.0):
-            penalty += self.cfg.spike_penalty
-            events.append("SPIKE_TEMP")
-        if self._detect_spike("dist_cm", dist_cm, 35.0):
-            penalty += self.cfg.spike_penalty
-            events.append("SPIKE_DIST")
+        prev = self.prev
+        if prev:
+            if abs(mq2_adc - prev["mq2_adc"]) >= 350:
+                penalty += cfg.spike_penalty
+                events |= EV_SPIKE_MQ2
+            if abs(temp_c - prev["temp_c"]) >= 5.0:
+                penalty += cfg.spike_penalty
+                events |= EV_SPIKE_TEMP
+            if abs(dist_cm - prev["dist_cm"]) >= 35.0:
+                penalty += cfg.spike_penalty
+                events |= EV_SPIKE_DIST
 
-        if self._inconsistency(factors["gas_r"], factors["temp_r"], factors["dist_r"]):
-            penalty += self.cfg.inconsistency_penalty
-            events.append("INCONSISTENT_SENSORS")
+        if ((gas_r > 0.65) + (temp_r > 0.65) + (dist_r > 0.65) == 1
+                and (gas_r < 0.25) + (temp_r < 0.25) + (dist_r < 0.25) >= 2):
+            penalty += cfg.inconsistency_penalty
+            events |= EV_INCONSISTENT
 
+        if st is not None: marks.append(time.perf_counter_ns())
         conf_before = self.conf
         if penalty > 0:
-            self.conf = max(self.cfg.min_confidence, self.conf - penalty)
+            self.conf = max(cfg.min_confidence, self.conf - penalty)
         else:
-            self.conf = min(1.0, self.conf + self.cfg.recovery_rate)
+            self.conf = min(1.0, self.conf + cfg.recovery_rate)
+        conf = self.conf
 
-        if self.conf < conf_before:
-            events.append(f"CONF_DOWN:{conf_before:.2f}->{self.conf:.2f}")
-        elif self.conf > conf_before and (t % 20 == 0):
-            events.append(f"CONF_RECOVER:{conf_before:.2f}->{self.conf:.2f}")
+        if conf < conf_before:
+            events |= EV_CONF_DOWN
+        elif conf > conf_before and (t % 20 == 0):
+            events |= EV_CONF_RECOVER
 
-        raw_risk = self.fuse_risk(factors)
-        current_risk = clamp01(raw_risk + (1.0 - self.conf) * 0.22)  
-        self.risk_history.append(current_risk)
+        if st is not None: marks.append(time.perf_counter_ns())
+        raw_risk = clamp01(0.45 * gas_r + 0.23 * temp_r + 0.13 * dist_r + 0.11 * tilt_r + 0.08 * vib_r)
+        current_risk = clamp01(raw_risk + (1.0 - conf) * 0.22)
+        self.trend.push(current_risk)
 
-        forecast_r = self.forecast_risk()
+        if st is not None: marks.append(time.perf_counter_ns())
+        forecast_r = self.trend.forecast()
         effective_risk = max(current_risk, forecast_r)
 
-        if effective_risk >= self.cfg.critical_risk:
-            aeis_state = "CRITICAL"
-            action = "STOP + ALERT"
-        elif effective_risk >= self.cfg.caution_risk:
-            aeis_state = "CAUTION"
-            action = "SLOW + VERIFY"
+        if effective_risk >= cfg.critical_risk:
+            state = 2
+        elif effective_risk >= cfg.caution_risk:
+            state = 1
         else:
-            aeis_state = "NORMAL"
-            action = "GO"
+            state = 0
 
         if forecast_r > current_risk + 0.08:
-            events.append("FORECAST_ESCALATION")
+            events |= EV_FORECAST_ESCALATION
+
+        if st is not None: marks.append(time.perf_counter_ns())
+        prev["mq2_adc"] = mq2_adc
+        prev["temp_c"] = temp_c
+        prev["dist_cm"] = dist_cm
+
+        res = StepResult(t, temp_r, gas_r, dist_r, tilt_r, vib_r, base, conf_before, conf,
+                         raw_risk, current_risk, forecast_r, effective_risk, state, events)
+        if st is not None:
+            marks.append(time.perf_counter_ns())
+            st.record(marks, events)
+        if db is not None:
+            self._db_ref = (temp_c, mq2_adc, dist_cm, tilt_deg, vib)
+            self._db_last = res
+            self._db_skipped = 0
+            self.deadband_stats.full += 1
+        return res
+
+    def _step_fast(self, temp_c: float, mq2_adc: float, dist_cm: float, t: int) -> StepResult:
+        """
+        Deadband fast path: factors, baseline and current risk are those of the last full step and
+        confidence stays at 1.0 (no spike or inconsistency is possible inside the bands). Only the
+        trend advances, so forecast-driven transitions still happen on time.
+        """
+        st = self.stats
+        if st is not None: t0 = time.perf_counter_ns()
+        cfg = self.cfg
+        last = self._db_last
+        current_risk = last.current_risk
+        self.trend.push(current_risk)
+        forecast_r = self.trend.forecast()
+        effective_risk = max(current_risk, forecast_r)
+
+        if effective_risk >= cfg.critical_risk:
+            state = 2
+        elif effective_risk >= cfg.caution_risk:
+            state = 1
+        else:
+            state = 0
+        events = EV_FORECAST_ESCALATION if forecast_r > current_risk + 0.08 else 0
+
+        prev = self.prev
+        prev["mq2_adc"] = mq2_adc
+        prev["temp_c"] = temp_c
+        prev["dist_cm"] = dist_cm
+        self._db_skipped += 1
+        self.deadband_stats.fast += 1
+        conf = self.conf
+        res = StepResult(t, last.temp_r, last.gas_r, last.dist_r, last.tilt_r, last.vib_r, last.baseline, conf, conf,
+                         last.raw_risk, current_risk, forecast_r, effective_risk, state, events)
+        if st is not None:
+            st.record_fast(time.perf_counter_ns() - t0, events)
+        return res
+
+    def _ramp(self, x: np.ndarray, warn: float, crit: float) -> np.ndarray:
+        import numpy as np
+        r = np.empty_like(x)
+        mid = (x > warn) & (x < crit)
+        r[x <= warn] = 0.0
+        r[x >= crit] = 1.0
+        r[mid] = np.clip((x[mid] - warn) / (crit - warn), 0.0, 1.0)
+        return r
 
-        self.prev["mq2_adc"] = mq2_adc
-        self.prev["temp_c"] = temp_c
-        self.prev["dist_cm"] = dist_cm
+    def _batch_spikes(self, key: str, x: np.ndarray, delta: float) -> np.ndarray:
+        import numpy as np
+        spikes = np.zeros(len(x), dtype=bool)
+        if len(x) == 0: return spikes
+        spikes[1:] = np.abs(np.diff(x)) >= delta
+        if key in self.prev:
+            spikes[0] = abs(x[0] - self.prev[key]) >= delta
+        return spikes
+
+    def _batch_forecast(self, cur: np.ndarray) -> np.ndarray:
+        # Replays RiskTrend.push's running sums (and the resync once per lap) with cumsum, which
+        # accumulates in order: the forecasts and the trend state left behind are bit-identical
+        # to pushing every value. Laps are rows of a (laps, window) matrix, so there is no
+        # per-tick Python loop.
+        import numpy as np
+        tr = self.trend
+        w, n = tr.window, len(cur)
+        out = cur.copy()
+        if n == 0:
+            return out
+        buf = np.array(tr.buf, dtype=float)
+        head, count = tr.head, tr.count
+        s_y, s_xy = tr.sum_y, tr.sum_xy
+        sy = np.empty(n)   # sums as forecast() sees them after each tick's push
+        sxy = np.empty(n)
+        ix = np.arange(w, dtype=float)
+
+        def lap(y, y0, start_y, start_xy):
+            run_y = np.cumsum(np.column_stack([start_y, y - y0]), axis=1)
+            run_xy = np.cumsum(np.column_stack([start_xy, (w - 1) * y - (run_y[:, :-1] - y0)]), axis=1)
+            return run_y[:, 1:], run_xy[:, 1:]
+
+        def resync(rows):
+            return np.cumsum(rows, axis=1)[:, -1], np.cumsum(ix * rows, axis=1)[:, -1]
+
+        k = 0
+        if count < w:
+            # window still filling: plain appends
+            k = min(w - count, n)
+            y = cur[:k]
+            sxy[:k] = np.cumsum(np.concatenate(([s_xy], np.arange(count, count + k) * y)))[1:]
+            sy[:k] = np.cumsum(np.concatenate(([s_y], y)))[1:]
+            buf[count:count + k] = y
+            s_y, s_xy = sy[k - 1], sxy[k - 1]
+        while k < n:
+            if head == 0 and n - k >= w:
+                # whole laps: each row overwrites the previous row and ends with a resync
+                laps = (n - k) // w
+                rows = cur[k:k + laps * w].reshape(laps, w)
+                rs_y, rs_xy = resync(rows)
+                run_y, run_xy = lap(rows, np.vstack([buf[None], rows[:-1]]),
+                                    np.concatenate(([s_y], rs_y[:-1])), np.concatenate(([s_xy], rs_xy[:-1])))
+                run_y[:, -1], run_xy[:, -1] = rs_y, rs_xy
+                sy[k:k + laps * w] = run_y.ravel()
+                sxy[k:k + laps * w] = run_xy.ravel()
+                buf = rows[-1].copy()
+                s_y, s_xy = rs_y[-1], rs_xy[-1]
+                k += laps * w
+                continue
+            # rest of a lap started before this batch, or a lap this batch does not finish
+            m = min(w - head, n - k)
+            run_y, run_xy = lap(cur[None, k:k + m], buf[None, head:head + m], [s_y], [s_xy])
+            buf[head:head + m] = cur[k:k + m]
+            sy[k:k + m], sxy[k:k + m] = run_y[0], run_xy[0]
+            head = (head + m) % w
+            k += m
+            if head == 0:
+                rs_y, rs_xy = resync(buf[None])
+                sy[k - 1], sxy[k - 1] = rs_y[0], rs_xy[0]
+            s_y, s_xy = sy[k - 1], sxy[k - 1]
+
+        # first tick whose trend window is warmed up; everything after it is too
+        r0 = max(0, tr.min_len - count - 1)
+        if tr.denom != 0 and r0 < n:
+            slope = (sxy[r0:] - tr.x_mean * sy[r0:]) / tr.denom
+            out[r0:] = np.clip(cur[r0:] + slope * tr.horizon, 0.0, 1.0)
+
+        tr.buf = buf.tolist()
+        tr.head = head
+        tr.count = min(tr.min_len, count + n)
+        tr.last = float(cur[-1])
+        tr.sum_y, tr.sum_xy = float(s_y), float(s_xy)
+        return out
+
+    def _batch_confidence(self, penalty: np.ndarray) -> np.ndarray:
+        # Only penalty ticks are visited in Python; recovery runs in between are a cumsum,
+        # which accumulates in order and therefore matches step()'s repeated addition exactly.
+        import numpy as np
+        cfg = self.cfg
+        n = len(penalty)
+        out = np.empty(n)
+        conf = self.conf
+        pos = 0
+        hits = np.flatnonzero(penalty > 0).tolist()
+        for k in hits + [n]:
+            if k > pos:
+                if conf >= 1.0:
+                    out[pos:k] = 1.0
+                else:
+                    run = np.full(k - pos + 1, cfg.recovery_rate)
+                    run[0] = conf
+                    np.minimum(np.cumsum(run)[1:], 1.0, out=out[pos:k])
+                conf = float(out[k - 1])
+            if k < n:
+                conf = max(cfg.min_confidence, conf - float(penalty[k]))
+                out[k] = conf
+                pos = k + 1
+        return out
+
+    def batch_factors(self, arrays: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Normalized risk factors for whole sensor arrays (vectorized norm_* functions)."""
+        import numpy as np
+        cfg = self.cfg
+        temp_c = np.asarray(arrays["temp_c"], dtype=float)
+        mq2_adc = np.asarray(arrays["mq2_adc"], dtype=float)
+        dist_cm = np.asarray(arrays["dist_cm"], dtype=float)
+        return {
+            "temp_r": np.clip((temp_c - cfg.temp_min) / (cfg.temp_max - cfg.temp_min), 0.0, 1.0),
+            "gas_r": np.clip((mq2_adc - cfg.mq2_min) / (cfg.mq2_max - cfg.mq2_min), 0.0, 1.0),
+            "dist_r": 1.0 - np.clip((dist_cm - cfg.dist_min) / (cfg.dist_max - cfg.dist_min), 0.0, 1.0),
+            "tilt_r": self._ramp(np.asarray(arrays["tilt_deg"], dtype=float), cfg.tilt_warn, cfg.tilt_crit),
+            "vib_r": self._ramp(np.asarray(arrays["vib"], dtype=float), cfg.vib_warn, cfg.vib_crit),
+        }
+
+    def run_batch(self, arrays: Dict[str, Any], factors: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized step() over whole sensor arrays (temp_c, mq2_adc, dist_cm, tilt_deg, vib, optional t).
+        Only the confidence recurrence runs sequentially. Results are bit-identical to step(), and
+        core state (conf, prev, trend) is advanced exactly as if step() had been called for every tick.
+        States are returned as indices into STATES / ACTIONS, events as boolean columns.
+        `factors` may carry batch_factors() output computed earlier for the same arrays and
+        normalization settings.
+        """
+        import numpy as np
+        cfg = self.cfg
+        temp_c = np.asarray(arrays["temp_c"], dtype=float)
+        mq2_adc = np.asarray(arrays["mq2_adc"], dtype=float)
+        dist_cm = np.asarray(arrays["dist_cm"], dtype=float)
+        n = len(temp_c)
+        t = np.asarray(arrays["t"], dtype=int) if "t" in arrays else np.arange(n)
+
+        if factors is None:
+            factors = self.batch_factors(arrays)
+        temp_r = factors["temp_r"]
+        gas_r = factors["gas_r"]
+        dist_r = factors["dist_r"]
+        tilt_r = factors["tilt_r"]
+        vib_r = factors["vib_r"]
+
+        base = np.zeros(n, dtype=np.int8)
+        base[(gas_r >= cfg.base_gas_warn) | (temp_r >= cfg.base_temp_warn) | (dist_r >= cfg.base_dist_warn)] = 1
+        base[(gas_r >= cfg.base_gas_crit) | (temp_r >= cfg.base_temp_crit) | (dist_r >= cfg.base_dist_crit)] = 2
+
+        spike_mq2 = self._batch_spikes("mq2_adc", mq2_adc, 350)
+        spike_temp = self._batch_spikes("temp_c", temp_c, 5.0)
+        spike_dist = self._batch_spikes("dist_cm", dist_cm, 35.0)
+        hi = (gas_r > 0.65).astype(int) + (temp_r > 0.65) + (dist_r > 0.65)
+        lo = (gas_r < 0.25).astype(int) + (temp_r < 0.25) + (dist_r < 0.25)
+        inconsistent = (hi == 1) & (lo >= 2)
+
+        # same accumulation order as step() so the penalties are bit-identical
+        penalty = np.zeros(n)
+        penalty += np.where(spike_mq2, cfg.spike_penalty, 0.0)
+        penalty += np.where(spike_temp, cfg.spike_penalty, 0.0)
+        penalty += np.where(spike_dist, cfg.spike_penalty, 0.0)
+        penalty += np.where(inconsistent, cfg.inconsistency_penalty, 0.0)
+
+        conf_arr = self._batch_confidence(penalty)
+        conf_before = np.empty(n)
+        if n:
+            conf_before[0] = self.conf
+            conf_before[1:] = conf_arr[:-1]
+
+        raw = np.clip(0.45 * gas_r + 0.23 * temp_r + 0.13 * dist_r + 0.11 * tilt_r + 0.08 * vib_r, 0.0, 1.0)
+        cur = np.clip(raw + (1.0 - conf_arr) * 0.22, 0.0, 1.0)
+        fcast = self._batch_forecast(cur)
+        eff = np.maximum(cur, fcast)
+
+        state = np.zeros(n, dtype=np.int8)
+        state[eff >= cfg.caution_risk] = 1
+        state[eff >= cfg.critical_risk] = 2
+
+        if n:
+            self.conf = float(conf_arr[-1])
+            self.prev["mq2_adc"] = float(mq2_adc[-1])
+            self.prev["temp_c"] = float(temp_c[-1])
+            self.prev["dist_cm"] = float(dist_cm[-1])
 
         return {
             "t": t,
-            "factors": factors,
-            "baseline_state": base_state,
-            "confidence": self.conf,
-            "raw_risk": raw_risk,
-            "current_risk": current_risk,
-            "forecast_risk": forecast_r,
-            "effective_risk": effective_risk,
-            "aeis_state": aeis_state,
-            "action": action,
-            "events": events,
-        }
\ No newline at end of file
+            "temp_r": temp_r,
+            "gas_r": gas_r,
+            "dist_r": dist_r,
+            "tilt_r": tilt_r,
+            "vib_r": vib_r,
+            "baseline_state": base,
+            "confidence": conf_arr,
+            "conf_before": conf_before,
+            "raw_risk": raw,
+            "current_risk": cur,
+            "forecast_risk": fcast,
+            "effective_risk": eff,
+            "aeis_state": state,
+            "spike_mq2": spike_mq2,
+            "spike_temp": spike_temp,
+            "spike_dist": spike_dist,
+            "inconsistent": inconsistent,
+            "conf_down": conf_arr < conf_before,
+            "conf_recover": (conf_arr > conf_before) & (t % 20 == 0),
+            "forecast_escalation": fcast > cur + 0.08,
+        }
+
+
+def batch_event_masks(res: Dict[str, np.ndarray]) -> np.ndarray:
+    """run_batch() boolean event columns -> one Event bitmask per tick (uint8)."""
+    import numpy as np
+    mask = np.zeros(len(res["confidence"]), dtype=np.uint8)
+    for key, bit in (
+        ("spike_mq2", EV_SPIKE_MQ2), ("spike_temp", EV_SPIKE_TEMP), ("spike_dist", EV_SPIKE_DIST),
+        ("inconsistent", EV_INCONSISTENT), ("conf_down", EV_CONF_DOWN), ("conf_recover", EV_CONF_RECOVER),
+        ("forecast_escalation", EV_FORECAST_ESCALATION),
+    ):
+        mask[res[key]] |= bit
+    return mask
+
+
+def batch_events(res: Dict[str, np.ndarray], i: int) -> List[str]:
+    """Render the event strings step() would have produced for tick i of a run_batch() result."""
+    mask = 0
+    if res["spike_mq2"][i]: mask |= EV_SPIKE_MQ2
+    if res["spike_temp"][i]: mask |= EV_SPIKE_TEMP
+    if res["spike_dist"][i]: mask |= EV_SPIKE_DIST
+    if res["inconsistent"][i]: mask |= EV_INCONSISTENT
+    if res["conf_down"][i]: mask |= EV_CONF_DOWN
+    if res["conf_recover"][i]: mask |= EV_CONF_RECOVER
+    if res["forecast_escalation"][i]: mask |= EV_FORECAST_ESCALATION
+    return render_events(mask, res["conf_before"][i], res["confidence"][i])
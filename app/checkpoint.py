@@ -0,0 +1,104 @@
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from aeis_core import AEISCore, AEISConfig, PREV_KEYS, state_dtype
+
+
+def pack_cores(cores: Sequence[AEISCore]) -> np.ndarray:
+    """State records for many cores, filled column by column."""
+    window = cores[0].trend.window if cores else 1
+    rec = np.zeros(len(cores), dtype=state_dtype(window))
+    if not cores:
+        return rec
+    trends = [c.trend for c in cores]
+    rec["conf"] = [c.conf for c in cores]
+    rec["has_prev"] = [bool(c.prev) for c in cores]
+    rec["prev"] = [[c.prev.get(k, 0.0) for k in PREV_KEYS] for c in cores]
+    rec["head"] = [t.head for t in trends]
+    rec["count"] = [t.count for t in trends]
+    rec["last"] = [t.last for t in trends]
+    rec["sum_y"] = [t.sum_y for t in trends]
+    rec["sum_xy"] = [t.sum_xy for t in trends]
+    rec["buf"] = [t.buf for t in trends]
+    return rec
+
+
+def unpack_cores(rec: np.ndarray, cfg: AEISConfig) -> List[AEISCore]:
+    cores = [AEISCore(cfg) for _ in range(len(rec))]
+    if cores and rec["buf"].shape[1] != cores[0].trend.window:
+        raise ValueError(f"State window {rec['buf'].shape[1]} != trend_window {cores[0].trend.window}")
+    cols = [rec[f].tolist() for f in ("conf", "has_prev", "prev", "head", "count", "last", "sum_y", "sum_xy", "buf")]
+    for core, (conf, has_prev, prev, head, count, last, sum_y, sum_xy, buf) in zip(cores, zip(*cols)):
+        core.conf = conf
+        if has_prev:
+            core.prev = dict(zip(PREV_KEYS, prev))
+        tr = core.trend
+        tr.head, tr.count, tr.last, tr.sum_y, tr.sum_xy, tr.buf = head, count, last, sum_y, sum_xy, buf
+    return cores
+
+
+def write_checkpoint(path: str, units: Sequence[str], rec: np.ndarray) -> None:
+    """
+    Atomically replace `path` with (units, states): write a temp file next to it,
+    fsync, rename over the old checkpoint, fsync the directory.
+    A crash at any point leaves either the old or the new checkpoint, never a torn one.
+    """
+    if len(units) != len(rec):
+        raise ValueError(f"{len(units)} units for {len(rec)} state records")
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.savez(f, units=np.asarray(units, dtype=str), state=rec)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def read_checkpoint(path: str) -> Tuple[List[str], np.ndarray]:
+    with np.load(path) as z:
+        return z["units"].tolist(), z["state"]
+
+
+def restore_cores(path: str, cfg: AEISConfig) -> Dict[str, AEISCore]:
+    units, rec = read_checkpoint(path)
+    return dict(zip(units, unpack_cores(rec, cfg)))
+
+
+class CheckpointWriter:
+    """
+    Periodic checkpoints for a set of cores (dict unit -> AEISCore) or an AEISFleet.
+    Call maybe_write() from the processing loop; it writes at most every `interval_s`.
+    """
+
+    def __init__(self, path: str, interval_s: float = 5.0) -> None:
+        self.path = path
+        self.interval_s = interval_s
+        self.writes = 0
+        self.last_write_s = 0.0
+        self._last = time.monotonic()
+
+    def write(self, cores, units: Optional[Sequence[str]] = None) -> None:
+        t0 = time.perf_counter()
+        if isinstance(cores, dict):
+            units, rec = list(cores), pack_cores(list(cores.values()))
+        else:
+            rec = cores.get_state()
+            units = list(units) if units is not None else [str(i) for i in range(len(rec))]
+        write_checkpoint(self.path, units, rec)
+        self.writes += 1
+        self.last_write_s = time.perf_counter() - t0
+        self._last = time.monotonic()
+
+    def maybe_write(self, cores, units: Optional[Sequence[str]] = None) -> bool:
+        if time.monotonic() - self._last < self.interval_s:
+            return False
+        self.write(cores, units)
+        return True
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import os
+import pty
+import selectors
+import threading
+import time
+import tty
+from typing import Any, Optional
+
+import numpy as np
+
+from app.aeis_core import AEISCore, AEISConfig
+from app.scenarios import false_alarm_stress_arrays, real_hazard_escalation_arrays, sensor_dropout_arrays
+from app.transport_serial import ENV_CODES, PROTO_BINARY, PROTO_JSONL, LineFramer, encode_binary, encode_jsonl
+
+GENERATORS = (false_alarm_stress_arrays, real_hazard_escalation_arrays, sensor_dropout_arrays)
+
+
+class SimDevice:
+    """
+    One simulated ESP32 on a pseudo-terminal. `port` is the slave path a host opens like a real board.
+
+    Telemetry follows the firmware layout; env/confidence come from an on-device AEISCore run over
+    a scenarios.py stream (cycled). Commands honored: fan_set, json_only (0 = interleave debug
+    text lines, as the firmware does) and proto (jsonl / bin1).
+    Writes that would block (host not reading) are dropped and counted, like a UART overrun.
+    """
+
+    def __init__(self, index: int, steps: int = 3000, json_only: int = 1, cfg: Optional[AEISConfig] = None) -> None:
+        self.index = index
+        _, arrays, _ = GENERATORS[index % len(GENERATORS)](steps=steps, seed=index)
+        self.cols = [arrays[k].tolist() for k in ("temp_c", "mq2_adc", "dist_cm", "tilt_deg", "vib")]
+        self.steps = steps
+        self.core = AEISCore(cfg or AEISConfig())
+        self.master, slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self._slave = slave
+        os.set_blocking(self.master, False)
+        self.framer = LineFramer()
+        self.json_only = json_only
+        self.proto = PROTO_JSONL
+        self.fan = 0
+        self.k = 0
+        self.seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.commands = 0
+        self.fan_changes = 0
+
+    def telemetry(self, ts_ms: int) -> dict[str, Any]:
+        i = self.k % self.steps
+        temp_c, mq2, dist_cm, tilt_deg, vib = (c[i] for c in self.cols)
+        out = self.core.step_lean(temp_c, mq2, dist_cm, tilt_deg, vib, self.k)
+        self.k += 1
+        return {
+            "type": "telemetry",
+            "ts_ms": ts_ms,
+            "env": ENV_CODES[out.state],
+            "sys": "OK" if out.confidence >= 0.6 else "DEGRADED",
+            "confidence": round(out.confidence, 3),
+            "mq2": int(mq2),
+            "dist_cm": round(dist_cm, 1),
+            "acc": round(vib, 3),
+            "fan": self.fan,
+        }
+
+    def emit(self, ts_ms: int) -> None:
+        msg = self.telemetry(ts_ms)
+        if self.proto == PROTO_BINARY:
+            data = encode_binary(msg, self.seq)
+            self.seq = (self.seq + 1) & 0xFFFF
+        else:
+            data = encode_jsonl(msg)
+            if not self.json_only:
+                data = f"AEIS dbg t={ts_ms} mq2={msg['mq2']} env={msg['env']}\n".encode("ascii") + data
+        try:
+            n = os.write(self.master, data)
+        except BlockingIOError:
+            n = 0
+        if n == len(data):
+            self.sent += 1
+        else:
+            # partial writes leave a torn frame; the host framer counts it as a decode error
+            self.dropped += 1
+
+    def on_readable(self) -> None:
+        try:
+            data = os.read(self.master, 4096)
+        except (BlockingIOError, OSError):
+            return
+        for cmd in self.framer.feed(data):
+            if cmd.get("type") != "cmd":
+                continue
+            self.commands += 1
+            name, value = cmd.get("cmd"), cmd.get("value")
+            if name == "fan_set":
+                value = 1 if value else 0
+                if value != self.fan:
+                    self.fan_changes += 1
+                self.fan = value
+            elif name == "json_only":
+                self.json_only = 1 if value else 0
+            elif name == "proto" and value in (PROTO_JSONL, PROTO_BINARY):
+                self.proto = value
+
+    def close(self) -> None:
+        for fd in (self.master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "port": self.port,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "commands": self.commands,
+            "fan_changes": self.fan_changes,
+            "fan": self.fan,
+        }
+
+
+class DeviceFarm:
+    """
+    N SimDevices driven by one thread: each emits telemetry at `rate_hz` (phases staggered
+    so the load is spread evenly) and commands are serviced between emissions.
+    """
+
+    def __init__(self, n: int, rate_hz: float = 10.0, steps: int = 3000, json_only: int = 1,
+                 cfg: Optional[AEISConfig] = None) -> None:
+        self.devices = [SimDevice(i, steps, json_only, cfg) for i in range(n)]
+        self.rate_hz = rate_hz
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.late = 0
+
+    @property
+    def ports(self) -> list[str]:
+        return [d.port for d in self.devices]
+
+    def start(self) -> None:
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="aeis-device-farm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        for d in self.devices:
+            d.close()
+
+    def __enter__(self) -> "DeviceFarm":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        sel = selectors.DefaultSelector()
+        for d in self.devices:
+            sel.register(d.master, selectors.EVENT_READ, d)
+        period = 1.0 / self.rate_hz
+        n = len(self.devices)
+        t0 = time.perf_counter()
+        # next emission time per device, staggered across one period
+        due = np.array([t0 + period * i / n for i in range(n)])
+        try:
+            while self._running.is_set():
+                i = int(np.argmin(due))
+                wait = due[i] - time.perf_counter()
+                for key, _ in sel.select(timeout=max(0.0, wait)):
+                    key.data.on_readable()
+                now = time.perf_counter()
+                if now < due[i]:
+                    continue
+                if now - due[i] > period:
+                    self.late += 1
+                self.devices[i].emit(int((now - t0) * 1000))
+                due[i] += period
+        finally:
+            sel.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        devs = [d.snapshot() for d in self.devices]
+        return {
+            "devices": len(devs),
+            "sent": sum(d["sent"] for d in devs),
+            "dropped": sum(d["dropped"] for d in devs),
+            "commands": sum(d["commands"] for d in devs),
+            "late": self.late,
+        }
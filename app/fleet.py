@@ -0,0 +1,204 @@
+from typing import Dict, Any, Optional
+import numpy as np
+
+from aeis_core import AEISConfig, state_dtype
+
+
+class AEISFleet:
+    """
+    N independent AEIS units with columnar state, advanced together by one step() call.
+    Per unit this performs the same float operations as AEISCore.step() (and RiskTrend),
+    so states, actions and events match N separate cores exactly.
+    """
+
+    def __init__(self, cfg: AEISConfig, n_units: int):
+        self.cfg = cfg
+        self.n = n_units
+        self.conf = np.full(n_units, float(cfg.base_confidence))
+        self.prev_mq2 = np.zeros(n_units)
+        self.prev_temp = np.zeros(n_units)
+        self.prev_dist = np.zeros(n_units)
+        self.has_prev = np.zeros(n_units, dtype=bool)
+
+        w = max(1, int(cfg.trend_window))
+        self.window = w
+        self.min_len = max(5, w)
+        self.x_mean = (w - 1) / 2.0
+        self.denom = w * (w * w - 1) / 12.0
+        self.buf = np.zeros((n_units, w))
+        self.head = np.zeros(n_units, dtype=np.int64)
+        self.count = np.zeros(n_units, dtype=np.int64)
+        self.last = np.zeros(n_units)
+        self.sum_y = np.zeros(n_units)
+        self.sum_xy = np.zeros(n_units)
+
+    def get_state(self) -> np.ndarray:
+        """One state_dtype record per unit, interchangeable with AEISCore.get_state()."""
+        rec = np.zeros(self.n, dtype=state_dtype(self.window))
+        rec["conf"] = self.conf
+        rec["prev"] = np.stack([self.prev_mq2, self.prev_temp, self.prev_dist], axis=1)
+        rec["has_prev"] = self.has_prev
+        rec["head"] = self.head
+        rec["count"] = self.count
+        rec["last"] = self.last
+        rec["sum_y"] = self.sum_y
+        rec["sum_xy"] = self.sum_xy
+        rec["buf"] = self.buf
+        return rec
+
+    def set_state(self, rec: np.ndarray) -> None:
+        if len(rec) != self.n or rec["buf"].shape[1] != self.window:
+            raise ValueError(f"State shape {rec['buf'].shape} != ({self.n}, {self.window})")
+        self.conf = rec["conf"].astype(float)
+        self.prev_mq2 = rec["prev"][:, 0].copy()
+        self.prev_temp = rec["prev"][:, 1].copy()
+        self.prev_dist = rec["prev"][:, 2].copy()
+        self.has_prev = rec["has_prev"].astype(bool)
+        self.head = rec["head"].astype(np.int64)
+        self.count = rec["count"].astype(np.int64)
+        self.last = rec["last"].copy()
+        self.sum_y = rec["sum_y"].copy()
+        self.sum_xy = rec["sum_xy"].copy()
+        self.buf = rec["buf"].copy()
+
+    def _ramp(self, x: np.ndarray, warn: float, crit: float) -> np.ndarray:
+        r = np.clip((x - warn) / (crit - warn), 0.0, 1.0)
+        r[x <= warn] = 0.0
+        r[x >= crit] = 1.0
+        return r
+
+    def _push(self, u: np.ndarray, y: np.ndarray) -> None:
+        w = self.window
+        cnt = self.count[u]
+        filling = cnt < w
+
+        fu, fy, fc = u[filling], y[filling], cnt[filling]
+        self.buf[fu, fc] = fy
+        self.sum_xy[fu] += fc * fy
+        self.sum_y[fu] += fy
+
+        ru, ry = u[~filling], y[~filling]
+        if len(ru):
+            h = self.head[ru]
+            y0 = self.buf[ru, h]
+            self.buf[ru, h] = ry
+            h = (h + 1) % w
+            self.head[ru] = h
+            sy = self.sum_y[ru]
+            self.sum_xy[ru] += (w - 1) * ry - (sy - y0)
+            self.sum_y[ru] = sy + (ry - y0)
+            lapped = ru[h == 0]
+            if len(lapped):
+                self._resync(lapped)
+
+        self.count[u] = np.minimum(cnt + 1, self.min_len)
+        self.last[u] = y
+
+    def _resync(self, u: np.ndarray) -> None:
+        # column by column, in the same order as RiskTrend._resync's Python sum()
+        rows = self.buf[u]
+        sy = np.zeros(len(u))
+        sxy = np.zeros(len(u))
+        for j in range(self.window):
+            sy += rows[:, j]
+            sxy += j * rows[:, j]
+        self.sum_y[u] = sy
+        self.sum_xy[u] = sxy
+
+    def _forecast(self, u: np.ndarray) -> np.ndarray:
+        last = self.last[u]
+        if self.denom == 0:
+            return last.copy()
+        slope = (self.sum_xy[u] - self.x_mean * self.sum_y[u]) / self.denom
+        out = np.clip(last + slope * self.cfg.forecast_horizon, 0.0, 1.0)
+        cold = self.count[u] < self.min_len
+        out[cold] = last[cold]
+        return out
+
+    def step(self, batch: Dict[str, Any], units: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Advance every unit (or only `units`, an index array) by one tick.
+        `batch` holds one column per sensor field (temp_c, mq2_adc, dist_cm, tilt_deg, vib,
+        optional t) with one row per advanced unit. Returns the same columns as
+        AEISCore.run_batch(), indexed by unit instead of by time.
+        """
+        cfg = self.cfg
+        u = np.arange(self.n) if units is None else np.asarray(units, dtype=np.int64)
+        m = len(u)
+        temp_c = np.asarray(batch["temp_c"], dtype=float)
+        mq2_adc = np.asarray(batch["mq2_adc"], dtype=float)
+        dist_cm = np.asarray(batch["dist_cm"], dtype=float)
+        tilt_deg = np.asarray(batch["tilt_deg"], dtype=float)
+        vib = np.asarray(batch["vib"], dtype=float)
+        t = np.broadcast_to(np.asarray(batch.get("t", -1), dtype=np.int64), (m,))
+
+        temp_r = np.clip((temp_c - cfg.temp_min) / (cfg.temp_max - cfg.temp_min), 0.0, 1.0)
+        gas_r = np.clip((mq2_adc - cfg.mq2_min) / (cfg.mq2_max - cfg.mq2_min), 0.0, 1.0)
+        dist_r = 1.0 - np.clip((dist_cm - cfg.dist_min) / (cfg.dist_max - cfg.dist_min), 0.0, 1.0)
+        tilt_r = self._ramp(tilt_deg, cfg.tilt_warn, cfg.tilt_crit)
+        vib_r = self._ramp(vib, cfg.vib_warn, cfg.vib_crit)
+
+        base = np.zeros(m, dtype=np.int8)
+        base[(gas_r >= cfg.base_gas_warn) | (temp_r >= cfg.base_temp_warn) | (dist_r >= cfg.base_dist_warn)] = 1
+        base[(gas_r >= cfg.base_gas_crit) | (temp_r >= cfg.base_temp_crit) | (dist_r >= cfg.base_dist_crit)] = 2
+
+        has_prev = self.has_prev[u]
+        spike_mq2 = has_prev & (np.abs(mq2_adc - self.prev_mq2[u]) >= 350)
+        spike_temp = has_prev & (np.abs(temp_c - self.prev_temp[u]) >= 5.0)
+        spike_dist = has_prev & (np.abs(dist_cm - self.prev_dist[u]) >= 35.0)
+        hi = (gas_r > 0.65).astype(int) + (temp_r > 0.65) + (dist_r > 0.65)
+        lo = (gas_r < 0.25).astype(int) + (temp_r < 0.25) + (dist_r < 0.25)
+        inconsistent = (hi == 1) & (lo >= 2)
+
+        penalty = np.zeros(m)
+        penalty += np.where(spike_mq2, cfg.spike_penalty, 0.0)
+        penalty += np.where(spike_temp, cfg.spike_penalty, 0.0)
+        penalty += np.where(spike_dist, cfg.spike_penalty, 0.0)
+        penalty += np.where(inconsistent, cfg.inconsistency_penalty, 0.0)
+
+        conf_before = self.conf[u]
+        conf = np.where(
+            penalty > 0,
+            np.maximum(cfg.min_confidence, conf_before - penalty),
+            np.minimum(1.0, conf_before + cfg.recovery_rate),
+        )
+        self.conf[u] = conf
+
+        raw = np.clip(0.45 * gas_r + 0.23 * temp_r + 0.13 * dist_r + 0.11 * tilt_r + 0.08 * vib_r, 0.0, 1.0)
+        cur = np.clip(raw + (1.0 - conf) * 0.22, 0.0, 1.0)
+        self._push(u, cur)
+        fcast = self._forecast(u)
+        eff = np.maximum(cur, fcast)
+
+        state = np.zeros(m, dtype=np.int8)
+        state[eff >= cfg.caution_risk] = 1
+        state[eff >= cfg.critical_risk] = 2
+
+        self.prev_mq2[u] = mq2_adc
+        self.prev_temp[u] = temp_c
+        self.prev_dist[u] = dist_cm
+        self.has_prev[u] = True
+
+        return {
+            "t": t,
+            "temp_r": temp_r,
+            "gas_r": gas_r,
+            "dist_r": dist_r,
+            "tilt_r": tilt_r,
+            "vib_r": vib_r,
+            "baseline_state": base,
+            "confidence": conf,
+            "conf_before": conf_before,
+            "raw_risk": raw,
+            "current_risk": cur,
+            "forecast_risk": fcast,
+            "effective_risk": eff,
+            "aeis_state": state,
+            "spike_mq2": spike_mq2,
+            "spike_temp": spike_temp,
+            "spike_dist": spike_dist,
+            "inconsistent": inconsistent,
+            "conf_down": conf < conf_before,
+            "conf_recover": (conf > conf_before) & (t % 20 == 0),
+            "forecast_escalation": fcast > cur + 0.08,
+        }
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import serial
+
+from app.aeis_core import AEISCore, AEISConfig, Deadband, DeadbandStats, LatencyHistogram, StepResult
+from app.trace_writer import TraceWriter
+from app.transport_serial import SerialConfig, SerialJsonlTransport
+
+Policy = Callable[[dict[str, Any], StepResult], Optional[dict[str, Any]]]
+
+
+def telemetry_sample(msg: dict[str, Any], temp_c: float = 24.0, tilt_deg: float = 2.0) -> tuple[float, float, float, float, float]:
+    """Telemetry carries mq2 / dist_cm / acc; temperature and tilt fall back to fixed values unless present."""
+    return (
+        float(msg.get("temp_c", temp_c)),
+        float(msg.get("mq2", 0.0)),
+        float(msg.get("dist_cm", 0.0)),
+        float(msg.get("tilt_deg", tilt_deg)),
+        float(msg.get("acc", 0.0)),
+    )
+
+
+def default_policy(msg: dict[str, Any], out: StepResult) -> Optional[dict[str, Any]]:
+    """
+    Host-side decision from the device's own AEIS core:
+    - CRITICAL or confidence < 0.60 -> fan ON
+    - NORMAL and confidence > 0.80 -> fan OFF
+    """
+    if out.state == 2 or out.confidence < 0.60:
+        return {"type": "cmd", "cmd": "fan_set", "value": 1}
+    if out.state == 0 and out.confidence > 0.80:
+        return {"type": "cmd", "cmd": "fan_set", "value": 0}
+    return None
+
+
+class DeviceStats:
+    """
+    Per-device counters. Each field is written by exactly one thread (reader: received, dropped,
+    read_errors; worker: processed, latency, rtt; writer: commands, write_batches, write_errors),
+    so no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        self.commands = 0
+        self.write_batches = 0
+        self.read_errors = 0
+        self.write_errors = 0
+        self.latency = LatencyHistogram()  # frame read -> decision made
+        self.rtt = LatencyHistogram()      # fan_set issued -> first telemetry echoing the new fan state
+        self.deadband: Optional[DeadbandStats] = None  # the device core's, when change-driven mode is on
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "queue_depth": self.received - self.dropped - self.processed,
+            "commands": self.commands,
+            "write_batches": self.write_batches,
+            "read_errors": self.read_errors,
+            "write_errors": self.write_errors,
+            "latency": self.latency.snapshot(),
+            "rtt": self.rtt.snapshot(),
+            "deadband": self.deadband.snapshot() if self.deadband is not None else None,
+        }
+
+
+class Device:
+    def __init__(self, port: str, transport: SerialJsonlTransport, shard: int) -> None:
+        self.port = port
+        self.transport = transport
+        self.shard = shard
+        self.stats = DeviceStats()
+        self.reader: Optional[threading.Thread] = None
+        # (fan value, issue time ns) of the last fan_set not yet echoed; worker thread only
+        self.fan_pending: Optional[tuple[int, int]] = None
+        # link rate window of Gateway.snapshot(); the transport's own log line keeps a separate one
+        self.link_mark = transport.stats.mark()
+
+
+class Gateway:
+    """
+    Many serial devices, one AEISCore per device.
+
+    - one reader thread per port frames telemetry and queues (device, t_ns, msg) to its shard
+    - `workers` worker threads each own the cores of their shard's devices (no shared state)
+    - one writer thread sends commands, coalescing everything pending for a device into one write
+
+    A full shard queue drops the incoming message and counts it on the device.
+    With `deadband` set, every core runs in change-driven mode (see AEISCore.enable_deadband).
+    With `trace` set, every step and command is handed to the TraceWriter (which never blocks).
+    """
+
+    def __init__(
+        self,
+        cfg: Optional[AEISConfig] = None,
+        workers: int = 4,
+        queue_size: int = 1024,
+        policy: Policy = default_policy,
+        flush_interval_s: float = 0.02,
+        deadband: Optional[Deadband] = None,
+        trace: Optional[TraceWriter] = None,
+    ) -> None:
+        self.cfg = cfg or AEISConfig()
+        self.deadband = deadband
+        self.trace = trace
+        self.policy = policy
+        self.flush_interval_s = flush_interval_s
+        self.devices: dict[str, Device] = {}
+        self.shards = [queue.Queue(maxsize=queue_size) for _ in range(max(1, workers))]
+        self.commands: queue.Queue = queue.Queue()
+        self._running = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def add_device(self, port: str, baud: int = 115200, transport: Optional[SerialJsonlTransport] = None) -> Device:
+        if port in self.devices:
+            raise ValueError(f"Device already added: {port}")
+        tr = transport or SerialJsonlTransport(SerialConfig(port=port, baud=baud))
+        dev = Device(port, tr, len(self.devices) % len(self.shards))
+        self.devices[port] = dev
+        if self._running.is_set():
+            self._start_reader(dev)
+        return dev
+
+    def start(self) -> None:
+        self._running.set()
+        for i in range(len(self.shards)):
+            self._spawn(self._work, i, name=f"aeis-worker-{i}")
+        self._spawn(self._write, name="aeis-writer")
+        for dev in self.devices.values():
+            self._start_reader(dev)
+
+    def stop(self) -> None:
+        self._running.clear()
+        for th in self._threads:
+            th.join()
+        self._threads.clear()
+        for dev in self.devices.values():
+            dev.transport.close()
+
+    def __enter__(self) -> "Gateway":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _spawn(self, target, *args, name: str) -> threading.Thread:
+        th = threading.Thread(target=target, args=args, name=name, daemon=True)
+        th.start()
+        self._threads.append(th)
+        return th
+
+    def _start_reader(self, dev: Device) -> None:
+        dev.reader = self._spawn(self._read, dev, name=f"aeis-reader-{dev.port}")
+
+    def send(self, port: str, cmd: dict[str, Any]) -> None:
+        self.commands.put((port, cmd))
+
+    def _read(self, dev: Device) -> None:
+        q = self.shards[dev.shard]
+        st = dev.stats
+        clock = time.perf_counter_ns
+        while self._running.is_set():
+            try:
+                msgs = dev.transport.read_messages()
+            except (serial.SerialException, OSError):
+                st.read_errors += 1
+                time.sleep(0.1)
+                continue
+            t_ns = clock()
+            for msg in msgs:
+                st.received += 1
+                try:
+                    q.put_nowait((dev, t_ns, msg))
+                except queue.Full:
+                    st.dropped += 1
+
+    def _work(self, shard: int) -> None:
+        q = self.shards[shard]
+        cores: dict[str, AEISCore] = {}
+        ticks: dict[str, int] = {}
+        last_cmd: dict[str, dict[str, Any]] = {}
+        clock = time.perf_counter_ns
+        trace = self.trace
+        while self._running.is_set():
+            try:
+                batch = [q.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            while len(batch) < 256:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for dev, t_ns, msg in batch:
+                if msg.get("type") == "telemetry":
+                    core = cores.get(dev.port)
+                    if core is None:
+                        core = cores[dev.port] = AEISCore(self.cfg)
+                        if self.deadband is not None:
+                            dev.stats.deadband = core.enable_deadband(self.deadband)
+                    # t is the per-device tick count, as on the device and in replay; periodic
+                    # rules (t % 20) must not depend on the device's millisecond clock
+                    t = ticks.get(dev.port, 0)
+                    ticks[dev.port] = t + 1
+                    out = core.step_lean(*telemetry_sample(msg), t=t)
+                    if trace is not None:
+                        trace.write_step(out, device=dev.port, ts_ms=msg.get("ts_ms"))
+                    pending = dev.fan_pending
+                    if pending is not None and msg.get("fan") == pending[0]:
+                        dev.stats.rtt.add(clock() - pending[1])
+                        dev.fan_pending = None
+                    cmd = self.policy(msg, out)
+                    if cmd and cmd != last_cmd.get(dev.port):
+                        last_cmd[dev.port] = cmd
+                        if cmd.get("cmd") == "fan_set" and msg.get("fan") != cmd.get("value"):
+                            dev.fan_pending = (cmd.get("value"), clock())
+                        self.commands.put((dev.port, cmd))
+                        if trace is not None:
+                            trace.write({"t": out.t, "ts_ms": msg.get("ts_ms"), "device": dev.port, **cmd})
+                dev.stats.processed += 1
+                dev.stats.latency.add(clock() - t_ns)
+
+    def _write(self) -> None:
+        while self._running.is_set():
+            try:
+                first = self.commands.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                continue
+            pending: dict[str, list[dict[str, Any]]] = {}
+            item = first
+            while item is not None:
+                pending.setdefault(item[0], []).append(item[1])
+                try:
+                    item = self.commands.get_nowait()
+                except queue.Empty:
+                    item = None
+            for port, cmds in pending.items():
+                dev = self.devices.get(port)
+                if dev is None:
+                    continue
+                try:
+                    dev.transport.write_messages(cmds)
+                except (serial.SerialException, OSError):
+                    dev.stats.write_errors += 1
+                    continue
+                dev.stats.commands += len(cmds)
+                dev.stats.write_batches += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-device counters; link rates cover the time since the previous snapshot()."""
+        devices = {}
+        for port, dev in self.devices.items():
+            snap = devices[port] = dev.stats.snapshot()
+            mark = dev.transport.stats.mark()
+            snap["link"] = dev.transport.link_snapshot(dev.link_mark)
+            dev.link_mark = mark
+            snap["decode_errors"] = snap["link"]["decode_errors"]
+        return {
+            "devices": devices,
+            "shard_depth": [q.qsize() for q in self.shards],
+            "pending_commands": self.commands.qsize(),
+            "trace": self.trace.snapshot() if self.trace is not None else None,
+        }
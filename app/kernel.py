@@ -0,0 +1,285 @@
+from typing import Dict, Any, Optional
+import numpy as np
+
+from aeis_core import (
+    AEISCore, AEISConfig,
+    EV_SPIKE_MQ2, EV_SPIKE_TEMP, EV_SPIKE_DIST, EV_INCONSISTENT, EV_CONF_DOWN, EV_CONF_RECOVER, EV_FORECAST_ESCALATION,
+)
+from fleet import AEISFleet
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+prange = numba.prange if HAVE_NUMBA else range
+
+# params / state vector layouts shared by the wrapper and the kernel
+P_SPIKE, P_INCONS, P_MIN_CONF, P_RECOVERY, P_CAUTION, P_CRITICAL, P_HORIZON, P_MIN_LEN, P_X_MEAN, P_DENOM = range(10)
+S_CONF, S_HAS_PREV, S_PREV_MQ2, S_PREV_TEMP, S_PREV_DIST, S_HEAD, S_COUNT, S_LAST, S_SUM_Y, S_SUM_XY = range(10)
+O_CONF_BEFORE, O_CONF, O_RAW, O_CUR, O_FCAST, O_EFF = range(6)
+
+
+def _series_kernel(temp_c, mq2_adc, dist_cm, gas_r, temp_r, dist_r, tilt_r, vib_r, t, p, s, buf, out_f, out_state, out_events):
+    """
+    The step() recurrence over one series, written as plain scalar loops so Numba can compile it.
+    Same float operations in the same order as AEISCore.step_lean / RiskTrend, so results are bit-identical.
+    `s` and `buf` carry the core state in and out.
+    """
+    w = buf.shape[0]
+    min_len = int(p[P_MIN_LEN])
+    conf = s[S_CONF]
+    has_prev = s[S_HAS_PREV] != 0.0
+    pm, pt, pd = s[S_PREV_MQ2], s[S_PREV_TEMP], s[S_PREV_DIST]
+    head = int(s[S_HEAD])
+    count = int(s[S_COUNT])
+    last, sum_y, sum_xy = s[S_LAST], s[S_SUM_Y], s[S_SUM_XY]
+
+    for i in range(temp_c.shape[0]):
+        g, tr, dr = gas_r[i], temp_r[i], dist_r[i]
+        events = 0
+        penalty = 0.0
+        if has_prev:
+            if abs(mq2_adc[i] - pm) >= 350:
+                penalty += p[P_SPIKE]
+                events |= EV_SPIKE_MQ2
+            if abs(temp_c[i] - pt) >= 5.0:
+                penalty += p[P_SPIKE]
+                events |= EV_SPIKE_TEMP
+            if abs(dist_cm[i] - pd) >= 35.0:
+                penalty += p[P_SPIKE]
+                events |= EV_SPIKE_DIST
+        # int() so NumPy scalars count instead of OR-ing as np.bool_ when running uncompiled
+        hi = int(g > 0.65) + int(tr > 0.65) + int(dr > 0.65)
+        lo = int(g < 0.25) + int(tr < 0.25) + int(dr < 0.25)
+        if hi == 1 and lo >= 2:
+            penalty += p[P_INCONS]
+            events |= EV_INCONSISTENT
+
+        conf_before = conf
+        if penalty > 0:
+            conf = max(p[P_MIN_CONF], conf - penalty)
+        else:
+            conf = min(1.0, conf + p[P_RECOVERY])
+        if conf < conf_before:
+            events |= EV_CONF_DOWN
+        elif conf > conf_before and t[i] % 20 == 0:
+            events |= EV_CONF_RECOVER
+
+        raw = max(0.0, min(1.0, 0.45 * g + 0.23 * tr + 0.13 * dr + 0.11 * tilt_r[i] + 0.08 * vib_r[i]))
+        cur = max(0.0, min(1.0, raw + (1.0 - conf) * 0.22))
+
+        # RiskTrend.push
+        if count < w:
+            buf[count] = cur
+            sum_xy += count * cur
+            sum_y += cur
+        else:
+            y0 = buf[head]
+            buf[head] = cur
+            head = (head + 1) % w
+            sum_xy += (w - 1) * cur - (sum_y - y0)
+            sum_y += cur - y0
+            if head == 0:
+                sum_y = 0.0
+                sum_xy = 0.0
+                for j in range(w):
+                    sum_y += buf[j]
+                for j in range(w):
+                    sum_xy += j * buf[j]
+        if count < min_len:
+            count += 1
+        last = cur
+
+        # RiskTrend.forecast
+        if count < min_len:
+            fcast = last
+        elif p[P_DENOM] == 0:
+            fcast = last
+        else:
+            slope = (sum_xy - p[P_X_MEAN] * sum_y) / p[P_DENOM]
+            fcast = max(0.0, min(1.0, last + slope * p[P_HORIZON]))
+        eff = max(cur, fcast)
+
+        if eff >= p[P_CRITICAL]:
+            state = 2
+        elif eff >= p[P_CAUTION]:
+            state = 1
+        else:
+            state = 0
+        if fcast > cur + 0.08:
+            events |= EV_FORECAST_ESCALATION
+
+        has_prev = True
+        pm, pt, pd = mq2_adc[i], temp_c[i], dist_cm[i]
+
+        out_f[O_CONF_BEFORE, i] = conf_before
+        out_f[O_CONF, i] = conf
+        out_f[O_RAW, i] = raw
+        out_f[O_CUR, i] = cur
+        out_f[O_FCAST, i] = fcast
+        out_f[O_EFF, i] = eff
+        out_state[i] = state
+        out_events[i] = events
+
+    s[S_CONF] = conf
+    s[S_HAS_PREV] = 1.0 if has_prev else 0.0
+    s[S_PREV_MQ2], s[S_PREV_TEMP], s[S_PREV_DIST] = pm, pt, pd
+    s[S_HEAD] = head
+    s[S_COUNT] = count
+    s[S_LAST], s[S_SUM_Y], s[S_SUM_XY] = last, sum_y, sum_xy
+
+
+series_kernel = numba.njit(cache=True, nogil=True)(_series_kernel) if HAVE_NUMBA else _series_kernel
+
+
+def _grid_kernel(temp_c, mq2_adc, dist_cm, gas_r, temp_r, dist_r, tilt_r, vib_r, t, p, s, buf, out_f, out_state, out_events):
+    """
+    _series_kernel over (runs, time) arrays: row r is an independent series with state s[r] and
+    buf[r], writing out_f[r] (a (6, time) block), out_state[r] and out_events[r]. Rows run in
+    parallel when compiled.
+    """
+    for r in prange(temp_c.shape[0]):
+        series_kernel(temp_c[r], mq2_adc[r], dist_cm[r], gas_r[r], temp_r[r], dist_r[r], tilt_r[r], vib_r[r],
+                      t[r], p, s[r], buf[r], out_f[r], out_state[r], out_events[r])
+
+
+grid_kernel = numba.njit(cache=True, nogil=True, parallel=True)(_grid_kernel) if HAVE_NUMBA else _grid_kernel
+
+
+def _params(core: AEISCore) -> np.ndarray:
+    cfg, tr = core.cfg, core.trend
+    return np.array([
+        cfg.spike_penalty, cfg.inconsistency_penalty, cfg.min_confidence, cfg.recovery_rate,
+        cfg.caution_risk, cfg.critical_risk, tr.horizon, tr.min_len, tr.x_mean, tr.denom,
+    ], dtype=float)
+
+
+def _state_in(core: AEISCore):
+    rec = core.get_state()[0]
+    s = np.array([
+        rec["conf"], rec["has_prev"], rec["prev"][0], rec["prev"][1], rec["prev"][2],
+        rec["head"], rec["count"], rec["last"], rec["sum_y"], rec["sum_xy"],
+    ], dtype=float)
+    return rec, s, rec["buf"].copy()
+
+
+def _state_out(core: AEISCore, rec, s: np.ndarray, buf: np.ndarray) -> None:
+    rec["conf"] = s[S_CONF]
+    rec["has_prev"] = int(s[S_HAS_PREV])
+    rec["prev"] = s[S_PREV_MQ2:S_PREV_DIST + 1]
+    rec["head"] = int(s[S_HEAD])
+    rec["count"] = int(s[S_COUNT])
+    rec["last"], rec["sum_y"], rec["sum_xy"] = s[S_LAST], s[S_SUM_Y], s[S_SUM_XY]
+    rec["buf"] = buf
+    core.set_state(rec)
+
+
+def _baseline(cfg: AEISConfig, f: Dict[str, np.ndarray]) -> np.ndarray:
+    base = np.zeros(f["gas_r"].shape, dtype=np.int8)
+    base[(f["gas_r"] >= cfg.base_gas_warn) | (f["temp_r"] >= cfg.base_temp_warn) | (f["dist_r"] >= cfg.base_dist_warn)] = 1
+    base[(f["gas_r"] >= cfg.base_gas_crit) | (f["temp_r"] >= cfg.base_temp_crit) | (f["dist_r"] >= cfg.base_dist_crit)] = 2
+    return base
+
+
+def _columns(t: np.ndarray, f: Dict[str, np.ndarray], base: np.ndarray, out_f: np.ndarray,
+             state: np.ndarray, events: np.ndarray) -> Dict[str, np.ndarray]:
+    # out_f is indexed by O_* first: (6, time) for a series, (6, runs, time) for a grid
+    out = {
+        "t": t,
+        "temp_r": f["temp_r"],
+        "gas_r": f["gas_r"],
+        "dist_r": f["dist_r"],
+        "tilt_r": f["tilt_r"],
+        "vib_r": f["vib_r"],
+        "baseline_state": base,
+        "confidence": out_f[O_CONF],
+        "conf_before": out_f[O_CONF_BEFORE],
+        "raw_risk": out_f[O_RAW],
+        "current_risk": out_f[O_CUR],
+        "forecast_risk": out_f[O_FCAST],
+        "effective_risk": out_f[O_EFF],
+        "aeis_state": state,
+    }
+    _events_to_columns(out, events)
+    return out
+
+
+def _events_to_columns(out: Dict[str, np.ndarray], events: np.ndarray) -> None:
+    for key, bit in (
+        ("spike_mq2", EV_SPIKE_MQ2), ("spike_temp", EV_SPIKE_TEMP), ("spike_dist", EV_SPIKE_DIST),
+        ("inconsistent", EV_INCONSISTENT), ("conf_down", EV_CONF_DOWN), ("conf_recover", EV_CONF_RECOVER),
+        ("forecast_escalation", EV_FORECAST_ESCALATION),
+    ):
+        out[key] = (events & bit) != 0
+
+
+def run_series(core: AEISCore, arrays: Dict[str, Any], factors: Optional[Dict[str, np.ndarray]] = None,
+               compiled: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """
+    Drop-in for core.run_batch(): same columns, same values, core state advanced the same way.
+    Runs the compiled kernel when Numba is available (or compiled=True), else the NumPy run_batch path.
+    """
+    compiled = HAVE_NUMBA if compiled is None else compiled
+    if not compiled:
+        return core.run_batch(arrays, factors)
+
+    cfg = core.cfg
+    temp_c = np.ascontiguousarray(arrays["temp_c"], dtype=float)
+    mq2_adc = np.ascontiguousarray(arrays["mq2_adc"], dtype=float)
+    dist_cm = np.ascontiguousarray(arrays["dist_cm"], dtype=float)
+    n = len(temp_c)
+    t = np.ascontiguousarray(arrays["t"], dtype=np.int64) if "t" in arrays else np.arange(n, dtype=np.int64)
+    f = factors if factors is not None else core.batch_factors(arrays)
+
+    out_f = np.empty((6, n))
+    state = np.empty(n, dtype=np.int8)
+    events = np.empty(n, dtype=np.uint8)
+    rec, s, buf = _state_in(core)
+    series_kernel(temp_c, mq2_adc, dist_cm, f["gas_r"], f["temp_r"], f["dist_r"], f["tilt_r"], f["vib_r"],
+                  t, _params(core), s, buf, out_f, state, events)
+    _state_out(core, rec, s, buf)
+    return _columns(t, f, _baseline(cfg, f), out_f, state, events)
+
+
+def run_grid(cfg: AEISConfig, arrays: Dict[str, np.ndarray], compiled: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """
+    Independent runs stacked as (runs, time) arrays -> run_batch() columns as (runs, time) arrays.
+    Every run starts from a fresh core. The compiled path computes the risk factors once for the
+    whole grid and runs it through one kernel call (rows in parallel); the NumPy fallback advances
+    all runs together as an AEISFleet, one time step per call.
+    """
+    compiled = HAVE_NUMBA if compiled is None else compiled
+    temp_c = np.asarray(arrays["temp_c"], dtype=float)
+    runs, steps = temp_c.shape
+    t = np.asarray(arrays["t"]) if "t" in arrays else np.arange(steps)
+    t = np.broadcast_to(t, (runs, steps))
+    keys = ("temp_c", "mq2_adc", "dist_cm", "tilt_deg", "vib")
+
+    if compiled:
+        if runs == 0:
+            return {}
+        core = AEISCore(cfg)
+        grid = {k: np.ascontiguousarray(arrays[k], dtype=float) for k in keys}
+        f = {k: np.ascontiguousarray(v) for k, v in core.batch_factors(grid).items()}
+        t = np.ascontiguousarray(t, dtype=np.int64)
+        _, s, buf = _state_in(core)
+        s = np.tile(s, (runs, 1))
+        buf = np.tile(buf, (runs, 1))
+        out_f = np.empty((runs, 6, steps))
+        state = np.empty((runs, steps), dtype=np.int8)
+        events = np.empty((runs, steps), dtype=np.uint8)
+        grid_kernel(grid["temp_c"], grid["mq2_adc"], grid["dist_cm"], f["gas_r"], f["temp_r"], f["dist_r"],
+                    f["tilt_r"], f["vib_r"], t, _params(core), s, buf, out_f, state, events)
+        return _columns(t, f, _baseline(cfg, f), out_f.transpose(1, 0, 2), state, events)
+
+    fleet = AEISFleet(cfg, runs)
+    cols = None
+    for j in range(steps):
+        res = fleet.step({**{k: arrays[k][:, j] for k in keys}, "t": t[:, j]})
+        if cols is None:
+            cols = {k: np.empty((runs, steps), dtype=v.dtype) for k, v in res.items()}
+        for k, v in res.items():
+            cols[k][:, j] = v
+    return cols or {}
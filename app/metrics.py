@@ -0,0 +1,105 @@
+import math
+from typing import Optional
+
+
+class MetricsAccumulator:
+    """
+    Online evaluation of one stream in O(1) memory. Feed ticks with update() or whole
+    chunks with update_batch(); both give the same result.
+
+    - false_alarms / missed_hazards / reaction_time_steps as in compute_metrics()
+    - confusion[truth][state]: hazard truth (0/1) x AEIS state (0 NORMAL, 1 CAUTION, 2 CRITICAL)
+    - any nonzero truth value counts as hazard, on both paths
+    - confidence min / mean (when confidences are supplied)
+    - detected(): the last `window` ticks were all CAUTION or worse (validation's detection rule)
+    """
+
+    def __init__(self, window: int = 20) -> None:
+        self.window = window
+        self.n = 0
+        self.false_alarms = 0
+        self.missed_hazards = 0
+        self.confusion = [[0, 0, 0], [0, 0, 0]]
+        self.hazard_start = None
+        self.reaction_time = None
+        self.conf_n = 0
+        self.conf_sum = 0.0
+        self.conf_min = math.inf
+        self.alarm_run = 0
+
+    def update(self, truth: int, state: int, confidence: Optional[float] = None) -> None:
+        alarm = state >= 1
+        hazard = truth != 0
+        if alarm and not hazard:
+            self.false_alarms += 1
+        elif hazard and not alarm:
+            self.missed_hazards += 1
+        self.confusion[1 if hazard else 0][state] += 1
+        if self.hazard_start is None:
+            if hazard:
+                self.hazard_start = self.n
+        if self.hazard_start is not None and self.reaction_time is None and alarm:
+            self.reaction_time = self.n - self.hazard_start
+        self.alarm_run = self.alarm_run + 1 if alarm else 0
+        if confidence is not None:
+            self.conf_n += 1
+            self.conf_sum += confidence
+            if confidence < self.conf_min:
+                self.conf_min = confidence
+        self.n += 1
+
+    def update_batch(self, truth, states, confidence=None) -> None:
+        # numpy only here: update() stays importable and usable on the NumPy-free live path
+        import numpy as np
+        truth = np.asarray(truth)
+        states = np.asarray(states)
+        k = len(states)
+        if k == 0:
+            return
+        alarm = states >= 1
+        hazard = truth != 0
+        self.false_alarms += int(np.count_nonzero(alarm & ~hazard))
+        self.missed_hazards += int(np.count_nonzero(hazard & ~alarm))
+        counts = np.bincount(hazard.astype(np.intp) * 3 + states.astype(np.intp), minlength=6)
+        for i in range(6):
+            self.confusion[i // 3][i % 3] += int(counts[i])
+
+        if self.hazard_start is None:
+            hz = np.flatnonzero(hazard)
+            if len(hz):
+                self.hazard_start = self.n + int(hz[0])
+        if self.hazard_start is not None and self.reaction_time is None:
+            lo = max(0, self.hazard_start - self.n)
+            hits = np.flatnonzero(alarm[lo:])
+            if len(hits):
+                self.reaction_time = self.n + lo + int(hits[0]) - self.hazard_start
+
+        quiet = np.flatnonzero(~alarm)
+        self.alarm_run = self.alarm_run + k if len(quiet) == 0 else k - 1 - int(quiet[-1])
+
+        if confidence is not None:
+            confidence = np.asarray(confidence, dtype=float)
+            self.conf_n += k
+            self.conf_sum += float(np.sum(confidence))
+            self.conf_min = min(self.conf_min, float(np.min(confidence)))
+        self.n += k
+
+    def detected(self) -> bool:
+        return self.n >= self.window and self.alarm_run >= self.window
+
+    @property
+    def conf_mean(self) -> float:
+        return self.conf_sum / self.conf_n if self.conf_n else 0.0
+
+    def result(self) -> dict:
+        return {
+            "false_alarms": self.false_alarms,
+            "missed_hazards": self.missed_hazards,
+            "reaction_time_steps": self.reaction_time if self.reaction_time is not None else "",
+        }
+
+
+def compute_metrics(hazard_truth, states_num):
+    acc = MetricsAccumulator()
+    acc.update_batch(hazard_truth, states_num)
+    return acc.result()
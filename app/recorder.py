@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import re
+import struct
+import time
+from typing import Iterator, Optional
+
+# file = MAGIC + records; record = REC_HEADER(kind, host time_ns, length) + payload
+MAGIC = b"AEISREC1"
+REC_HEADER = struct.Struct("<BQI")
+REC_RX = 1     # raw bytes read from the device, exactly as received
+REC_TX = 2     # raw bytes written to the device
+REC_PROTO = 3  # telemetry encoding switched; payload is the protocol name
+SUFFIX = ".rec"
+
+
+class SessionRecorder:
+    """
+    Append-only recorder of raw serial traffic with host timestamps.
+
+    Data goes through a normal buffered file; it is flushed and fsync'ed at most every
+    `fsync_s` seconds, so a crash loses at most that much. Files rotate once they exceed
+    `max_bytes`: <dir>/<prefix>-00000.rec, <prefix>-00001.rec, ... numbering continues
+    after existing files, so restarting a session never overwrites a recording.
+    """
+
+    def __init__(self, directory: str, prefix: str = "session", max_bytes: int = 64 << 20, fsync_s: float = 1.0) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.fsync_s = fsync_s
+        self.records = 0
+        self.bytes = 0
+        existing = session_files(directory, prefix)
+        self._index = _file_index(existing[-1]) + 1 if existing else 0
+        self._f = None
+        self._size = 0
+        self._last_sync = time.monotonic()
+        self._open()
+
+    def _open(self) -> None:
+        path = os.path.join(self.directory, f"{self.prefix}-{self._index:05d}{SUFFIX}")
+        self._f = open(path, "xb")
+        self._f.write(MAGIC)
+        self._size = len(MAGIC)
+        self.path = path
+
+    def _sync(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._last_sync = time.monotonic()
+
+    def write(self, kind: int, payload: bytes, t_ns: Optional[int] = None) -> None:
+        if self._f is None:
+            raise ValueError("Recorder is closed")
+        self._f.write(REC_HEADER.pack(kind, time.time_ns() if t_ns is None else t_ns, len(payload)))
+        self._f.write(payload)
+        n = REC_HEADER.size + len(payload)
+        self._size += n
+        self.bytes += n
+        self.records += 1
+        if self._size >= self.max_bytes:
+            self._sync()
+            self._f.close()
+            self._index += 1
+            self._open()
+        elif time.monotonic() - self._last_sync >= self.fsync_s:
+            self._sync()
+
+    def rx(self, data: bytes) -> None:
+        self.write(REC_RX, data)
+
+    def tx(self, data: bytes) -> None:
+        self.write(REC_TX, data)
+
+    def proto(self, name: str) -> None:
+        self.write(REC_PROTO, name.encode("ascii"))
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._sync()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _file_index(path: str) -> int:
+    return int(path[-len(SUFFIX) - 5:-len(SUFFIX)])
+
+
+def session_files(directory: str, prefix: str = "session") -> list[str]:
+    pat = re.compile(re.escape(prefix) + r"-\d{5}" + re.escape(SUFFIX) + "$")
+    return sorted(os.path.join(directory, n) for n in os.listdir(directory) if pat.match(n))
+
+
+def iter_records(paths: list[str]) -> Iterator[tuple[int, int, bytes]]:
+    """
+    Yield (kind, t_ns, payload) across files in order.
+    A record cut short at the end of a file (crash before fsync) ends that file quietly.
+    """
+    for path in paths:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a session recording: {path}")
+            while True:
+                head = f.read(REC_HEADER.size)
+                if len(head) < REC_HEADER.size:
+                    break
+                kind, t_ns, n = REC_HEADER.unpack(head)
+                payload = f.read(n)
+                if len(payload) < n:
+                    break
+                yield kind, t_ns, payload
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+# bump when the drawing code changes so cached figures are re-rendered
+RENDER_VERSION = 1
+
+
+def figure_spec(title: str, x, series, ylabel: str, yticks: Optional[Tuple[List[int], List[str]]] = None) -> Dict[str, Any]:
+    """
+    Everything needed to draw one figure, as plain data so it can be hashed and sent to a worker.
+    `series` is either one y sequence or a list of (label, y) pairs (drawn with a legend).
+    """
+    if isinstance(series, list) and series and isinstance(series[0], tuple):
+        lines = [(label, np.asarray(y, dtype=float)) for label, y in series]
+    else:
+        lines = [(None, np.asarray(series, dtype=float))]
+    return {"title": title, "x": np.asarray(x, dtype=float), "lines": lines, "ylabel": ylabel, "yticks": yticks}
+
+
+def spec_hash(spec: Dict[str, Any], dpi: int) -> str:
+    h = hashlib.sha1()
+    h.update(repr((RENDER_VERSION, dpi, spec["title"], spec["ylabel"], spec["yticks"],
+                   [label for label, _ in spec["lines"]])).encode("utf-8"))
+    h.update(spec["x"].tobytes())
+    for _, y in spec["lines"]:
+        h.update(y.tobytes())
+    return h.hexdigest()
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _draw(ax, spec: Dict[str, Any]) -> None:
+    for label, y in spec["lines"]:
+        ax.plot(spec["x"], y, label=label)
+    if spec["yticks"]:
+        ax.set_yticks(spec["yticks"][0], spec["yticks"][1])
+    ax.set_title(spec["title"])
+    ax.set_xlabel("time step")
+    ax.set_ylabel(spec["ylabel"])
+    if spec["lines"][0][0] is not None:
+        ax.legend()
+
+
+def render_figure(job: Tuple[str, Dict[str, Any], int]) -> str:
+    path, spec, dpi = job
+    plt = _pyplot()
+    fig = plt.figure()
+    _draw(fig.gca(), spec)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return path
+
+
+def render_panel(job: Tuple[str, List[Dict[str, Any]], int]) -> str:
+    """All of a scenario's figures as one multi-panel image."""
+    path, specs, dpi = job
+    plt = _pyplot()
+    cols = 3
+    rows = -(-len(specs) // cols)
+    fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 3.2 * rows), squeeze=False)
+    for ax, spec in zip(axes.flat, specs):
+        _draw(ax, spec)
+    for ax in axes.flat[len(specs):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return path
+
+
+def _load_manifest(fig_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(fig_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_all(figures: Dict[str, List[Tuple[str, Dict[str, Any]]]], dpi: int = 220, workers: Optional[int] = None,
+               panel: bool = False, force: bool = False) -> Dict[str, int]:
+    """
+    Render {fig_dir: [(file name, spec), ...]} in a process pool.
+    A figure is skipped when its file exists and its input hash matches fig_dir/manifest.json.
+    panel=True renders one overview.png per fig_dir instead of one file per figure.
+    """
+    jobs, funcs, manifests, pending = [], [], {}, []
+    skipped = 0
+    for fig_dir, items in figures.items():
+        os.makedirs(fig_dir, exist_ok=True)
+        manifest = manifests[fig_dir] = {} if force else _load_manifest(fig_dir)
+        if panel:
+            h = hashlib.sha1("".join(spec_hash(s, dpi) for _, s in items).encode("ascii")).hexdigest()
+            entries = [("overview.png", h, render_panel, [s for _, s in items])]
+        else:
+            entries = [(fn, spec_hash(s, dpi), render_figure, s) for fn, s in items]
+        for fn, h, func, payload in entries:
+            path = os.path.join(fig_dir, fn)
+            if manifest.get(fn) == h and os.path.exists(path):
+                skipped += 1
+                continue
+            jobs.append((path, payload, dpi))
+            funcs.append(func)
+            pending.append((fig_dir, fn, h))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        for func, job in zip(funcs, jobs):
+            func(job)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+            for f in [ex.submit(func, job) for func, job in zip(funcs, jobs)]:
+                f.result()
+
+    for fig_dir, fn, h in pending:
+        manifests[fig_dir][fn] = h
+    for fig_dir, manifest in manifests.items():
+        with open(os.path.join(fig_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return {"rendered": len(jobs), "skipped": skipped}
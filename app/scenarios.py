@@ -1,5 +1,6 @@
 import random
 from typing import Dict, List, Tuple
+import numpy as np
 
 def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
@@ -8,8 +9,7 @@ def pressure_to_altitude_m(p_hpa: float) -> float:
     p0 = 1013.25
     return 44330.0 * (1.0 - (p_hpa / p0) ** (1.0 / 5.255))
 
-def _base_stream(steps: int, seed: int) -> List[Dict[str, float]]:
-    random.seed(seed)
+def _base_stream(steps: int, rng: random.Random) -> List[Dict[str, float]]:
     temp_c = 23.0
     hum_pct = 45.0
     press_hpa = 1008.0
@@ -22,14 +22,14 @@ def _base_stream(steps: int, seed: int) -> List[Dict[str, float]]:
     out = []
     for t in range(steps):
         
-        temp_c += random.uniform(-0.05, 0.05)
-        hum_pct += random.uniform(-0.2, 0.2)
-        press_hpa += random.uniform(-0.05, 0.05)
+        temp_c += rng.uniform(-0.05, 0.05)
+        hum_pct += rng.uniform(-0.2, 0.2)
+        press_hpa += rng.uniform(-0.05, 0.05)
 
-        mq2_adc += random.uniform(-8, 8)
-        dist_cm += random.uniform(-2.5, 2.5)
-        tilt_deg += random.uniform(-0.2, 0.2)
-        vib += random.uniform(-0.01, 0.01)
+        mq2_adc += rng.uniform(-8, 8)
+        dist_cm += rng.uniform(-2.5, 2.5)
+        tilt_deg += rng.uniform(-0.2, 0.2)
+        vib += rng.uniform(-0.01, 0.01)
 
        
         temp_c = clamp(temp_c, -10, 80)
@@ -61,21 +61,22 @@ def scenario_false_alarm_stress(steps: int = 300, seed: int = 1) -> Tuple[str, L
     Many false spikes; no real hazard.
     Ground truth hazard = 0 always.
     """
-    data = _base_stream(steps, seed)
+    rng = random.Random(seed)
+    data = _base_stream(steps, rng)
     hazard_truth = [0] * steps
 
     for p in data:
         t = p["t"]
         
-        if 60 <= t <= 180 and random.random() < 0.22:
-            p["mq2_adc"] = clamp(p["mq2_adc"] + random.uniform(700, 1400), 0, 4095)
+        if 60 <= t <= 180 and rng.random() < 0.22:
+            p["mq2_adc"] = clamp(p["mq2_adc"] + rng.uniform(700, 1400), 0, 4095)
         
-        if 90 <= t <= 140 and random.random() < 0.10:
-            p["temp_c"] = clamp(p["temp_c"] + random.uniform(6, 14), -10, 80)
+        if 90 <= t <= 140 and rng.random() < 0.10:
+            p["temp_c"] = clamp(p["temp_c"] + rng.uniform(6, 14), -10, 80)
         
-        if 120 <= t <= 170 and random.random() < 0.12:
-            p["tilt_deg"] = clamp(p["tilt_deg"] + random.uniform(2.0, 6.0), 0, 45)
-            p["vib"] = clamp(p["vib"] + random.uniform(0.05, 0.15), 0.0, 2.0)
+        if 120 <= t <= 170 and rng.random() < 0.12:
+            p["tilt_deg"] = clamp(p["tilt_deg"] + rng.uniform(2.0, 6.0), 0, 45)
+            p["vib"] = clamp(p["vib"] + rng.uniform(0.05, 0.15), 0.0, 2.0)
 
     return ("false_alarm_stress", data, hazard_truth)
 
@@ -84,15 +85,16 @@ def scenario_real_hazard_escalation(steps: int = 300, seed: int = 42) -> Tuple[s
     Real hazard rises (gas + temp), plus obstacle approach & vibration episode.
     Ground truth hazard = 1 during hazard window.
     """
-    data = _base_stream(steps, seed)
+    rng = random.Random(seed)
+    data = _base_stream(steps, rng)
     hazard_truth = [1 if (190 <= t <= 240) else 0 for t in range(steps)]
 
     for p in data:
         t = p["t"]
 
         
-        if 80 <= t <= 130 and random.random() < 0.18:
-            p["mq2_adc"] = clamp(p["mq2_adc"] + random.uniform(600, 1200), 0, 4095)
+        if 80 <= t <= 130 and rng.random() < 0.18:
+            p["mq2_adc"] = clamp(p["mq2_adc"] + rng.uniform(600, 1200), 0, 4095)
 
         
         if 140 <= t <= 170:
@@ -100,14 +102,14 @@ def scenario_real_hazard_escalation(steps: int = 300, seed: int = 42) -> Tuple[s
 
        
         if 190 <= t <= 240:
-            p["mq2_adc"] = clamp(p["mq2_adc"] + random.uniform(25, 45), 0, 4095)
-            p["temp_c"] = clamp(p["temp_c"] + random.uniform(0.12, 0.25), -10, 80)
-            p["hum_pct"] = clamp(p["hum_pct"] - random.uniform(0.1, 0.25), 0, 100)
+            p["mq2_adc"] = clamp(p["mq2_adc"] + rng.uniform(25, 45), 0, 4095)
+            p["temp_c"] = clamp(p["temp_c"] + rng.uniform(0.12, 0.25), -10, 80)
+            p["hum_pct"] = clamp(p["hum_pct"] - rng.uniform(0.1, 0.25), 0, 100)
 
         
         if 210 <= t <= 230:
-            p["tilt_deg"] = clamp(p["tilt_deg"] + random.uniform(0.5, 1.2), 0, 45)
-            p["vib"] = clamp(p["vib"] + random.uniform(0.05, 0.12), 0.0, 2.0)
+            p["tilt_deg"] = clamp(p["tilt_deg"] + rng.uniform(0.5, 1.2), 0, 45)
+            p["vib"] = clamp(p["vib"] + rng.uniform(0.05, 0.12), 0.0, 2.0)
 
     return ("real_hazard_escalation", data, hazard_truth)
 
@@ -116,7 +118,8 @@ def scenario_sensor_dropout(steps: int = 300, seed: int = 7) -> Tuple[str, List[
     Sensor dropout: MQ2 gets stuck or drops to 0 for a period.
     Also includes a real hazard later, so AEIS must not rely on one sensor only.
     """
-    data = _base_stream(steps, seed)
+    rng = random.Random(seed)
+    data = _base_stream(steps, rng)
     hazard_truth = [1 if (200 <= t <= 245) else 0 for t in range(steps)]
 
     for p in data:
@@ -128,10 +131,10 @@ def scenario_sensor_dropout(steps: int = 300, seed: int = 7) -> Tuple[str, List[
 
        
         if 200 <= t <= 245:
-            p["mq2_adc"] = clamp(p["mq2_adc"] + random.uniform(35, 55), 0, 4095)
-            p["temp_c"] = clamp(p["temp_c"] + random.uniform(0.15, 0.28), -10, 80)
-            p["tilt_deg"] = clamp(p["tilt_deg"] + random.uniform(0.2, 0.6), 0, 45)
-            p["vib"] = clamp(p["vib"] + random.uniform(0.03, 0.08), 0.0, 2.0)
+            p["mq2_adc"] = clamp(p["mq2_adc"] + rng.uniform(35, 55), 0, 4095)
+            p["temp_c"] = clamp(p["temp_c"] + rng.uniform(0.15, 0.28), -10, 80)
+            p["tilt_deg"] = clamp(p["tilt_deg"] + rng.uniform(0.2, 0.6), 0, 45)
+            p["vib"] = clamp(p["vib"] + rng.uniform(0.03, 0.08), 0.0, 2.0)
 
     return ("sensor_dropout", data, hazard_truth)
 
@@ -141,3 +144,123 @@ def all_scenarios(steps: int = 300):
         scenario_real_hazard_escalation(steps=steps, seed=42),
         scenario_sensor_dropout(steps=steps, seed=7),
     ]
+
+
+# --- Vectorized generators -------------------------------------------------
+# Same scenario shapes as above, built column-wise with a local numpy Generator.
+# Streams differ from the legacy random-module ones (different RNG), so the published
+# results/ keep coming from the functions above.
+
+SENSOR_COLUMNS = ("t", "temp_c", "hum_pct", "press_hpa", "alt_m", "mq2_adc", "dist_cm", "tilt_deg", "vib")
+
+
+def _walk(rng: np.random.Generator, n: int, x0: float, step: float, lo: float, hi: float) -> np.ndarray:
+    """
+    Random walk clamped to [lo, hi] at every step, as in _base_stream.
+    While only one bound can be active, the clamped walk is the cumulative sum plus a running
+    max correction (Lindley recursion); we switch bounds each time the walk reaches the other one.
+    """
+    inc = rng.uniform(-step, step, n)
+    out = np.empty(n)
+    k, v, lower = 0, x0, True
+    while k < n:
+        # bounded chunks keep each bound switch from rescanning the whole tail
+        s = v + np.cumsum(inc[k:k + 65536])
+        if lower:
+            x = s + np.maximum(0.0, np.maximum.accumulate(lo - s))
+            crossed = x > hi
+        else:
+            x = s - np.maximum(0.0, np.maximum.accumulate(s - hi))
+            crossed = x < lo
+        if not crossed.any():
+            out[k:k + len(x)] = x
+            k += len(x)
+            v = float(x[-1])
+            continue
+        j = int(np.argmax(crossed))
+        out[k:k + j] = x[:j]
+        v = hi if lower else lo
+        out[k + j] = v
+        k += j + 1
+        lower = not lower
+    return out
+
+
+def base_arrays(steps: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    press_hpa = _walk(rng, steps, 1008.0, 0.05, 900, 1100)
+    return {
+        "t": np.arange(steps),
+        "temp_c": _walk(rng, steps, 23.0, 0.05, -10, 80),
+        "hum_pct": _walk(rng, steps, 45.0, 0.2, 0, 100),
+        "press_hpa": press_hpa,
+        "alt_m": pressure_to_altitude_m(press_hpa),
+        "mq2_adc": _walk(rng, steps, 350.0, 8, 0, 4095),
+        "dist_cm": _walk(rng, steps, 150.0, 2.5, 2, 400),
+        "tilt_deg": _walk(rng, steps, 2.0, 0.2, 0, 45),
+        "vib": _walk(rng, steps, 0.05, 0.01, 0.0, 2.0),
+    }
+
+
+def _window(t: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    return (t >= lo) & (t <= hi)
+
+
+def _add(a: Dict[str, np.ndarray], key: str, mask: np.ndarray, rng: np.random.Generator,
+         lo: float, hi: float, clip_lo: float, clip_hi: float) -> None:
+    a[key][mask] = np.clip(a[key][mask] + rng.uniform(lo, hi, int(mask.sum())), clip_lo, clip_hi)
+
+
+def false_alarm_stress_arrays(steps: int = 300, seed: int = 1) -> Tuple[str, Dict[str, np.ndarray], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = base_arrays(steps, rng)
+    t = a["t"]
+    _add(a, "mq2_adc", _window(t, 60, 180) & (rng.random(steps) < 0.22), rng, 700, 1400, 0, 4095)
+    _add(a, "temp_c", _window(t, 90, 140) & (rng.random(steps) < 0.10), rng, 6, 14, -10, 80)
+    m = _window(t, 120, 170) & (rng.random(steps) < 0.12)
+    _add(a, "tilt_deg", m, rng, 2.0, 6.0, 0, 45)
+    _add(a, "vib", m, rng, 0.05, 0.15, 0.0, 2.0)
+    return ("false_alarm_stress", a, np.zeros(steps, dtype=int))
+
+
+def real_hazard_escalation_arrays(steps: int = 300, seed: int = 42) -> Tuple[str, Dict[str, np.ndarray], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = base_arrays(steps, rng)
+    t = a["t"]
+    _add(a, "mq2_adc", _window(t, 80, 130) & (rng.random(steps) < 0.18), rng, 600, 1200, 0, 4095)
+    m = _window(t, 140, 170)
+    a["dist_cm"][m] = np.clip(a["dist_cm"][m] - 3.5, 2, 400)
+    hazard = _window(t, 190, 240)
+    _add(a, "mq2_adc", hazard, rng, 25, 45, 0, 4095)
+    _add(a, "temp_c", hazard, rng, 0.12, 0.25, -10, 80)
+    _add(a, "hum_pct", hazard, rng, -0.25, -0.1, 0, 100)
+    m = _window(t, 210, 230)
+    _add(a, "tilt_deg", m, rng, 0.5, 1.2, 0, 45)
+    _add(a, "vib", m, rng, 0.05, 0.12, 0.0, 2.0)
+    return ("real_hazard_escalation", a, hazard.astype(int))
+
+
+def sensor_dropout_arrays(steps: int = 300, seed: int = 7) -> Tuple[str, Dict[str, np.ndarray], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = base_arrays(steps, rng)
+    t = a["t"]
+    a["mq2_adc"][_window(t, 120, 170)] = 0.0
+    hazard = _window(t, 200, 245)
+    _add(a, "mq2_adc", hazard, rng, 35, 55, 0, 4095)
+    _add(a, "temp_c", hazard, rng, 0.15, 0.28, -10, 80)
+    _add(a, "tilt_deg", hazard, rng, 0.2, 0.6, 0, 45)
+    _add(a, "vib", hazard, rng, 0.03, 0.08, 0.0, 2.0)
+    return ("sensor_dropout", a, hazard.astype(int))
+
+
+def all_scenario_arrays(steps: int = 300):
+    return [
+        false_alarm_stress_arrays(steps=steps, seed=1),
+        real_hazard_escalation_arrays(steps=steps, seed=42),
+        sensor_dropout_arrays(steps=steps, seed=7),
+    ]
+
+
+def to_records(arrays: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """Columnar arrays -> the list-of-dicts layout of the legacy generators."""
+    cols = [arrays[k].tolist() for k in SENSOR_COLUMNS]
+    return [dict(zip(SENSOR_COLUMNS, row)) for row in zip(*cols)]
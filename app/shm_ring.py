@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Any, NamedTuple, Optional
+
+from app.transport_serial import ENV_CODES
+
+# segment = HEADER + capacity * SLOT; header and slots are 64 bytes so no two writers share a cache line.
+# Header: magic, slot size u32, capacity u32, published count u64 (= seq of the next record), closed u8.
+# Slot: seq u64, host rx time ns i64, ts_ms u32, device u16, env u8, fan u8, confidence f64,
+# dist_cm f64, acc f64, mq2 u32.
+MAGIC = b"AEISRNG1"
+HEADER = struct.Struct("<8sIIQB")
+HEADER_SIZE = 64
+SLOT = struct.Struct("<QqIHBBdddI12x")
+SEQ = struct.Struct("<Q")
+OFF_WRITE_SEQ = 16
+OFF_CLOSED = 24
+ENV_UNKNOWN = 0xFF
+_ENV_INDEX = {name: i for i, name in enumerate(ENV_CODES)}
+
+
+class TelemetryRecord(NamedTuple):
+    seq: int
+    rx_ns: int
+    ts_ms: int
+    device: int
+    env: str
+    fan: int
+    confidence: float
+    dist_cm: float
+    acc: float
+    mq2: int
+
+    def to_message(self) -> dict[str, Any]:
+        """The telemetry dict a SerialJsonlTransport would have returned (without `sys`)."""
+        return {
+            "type": "telemetry",
+            "ts_ms": self.ts_ms,
+            "env": self.env,
+            "confidence": self.confidence,
+            "mq2": self.mq2,
+            "dist_cm": self.dist_cm,
+            "acc": self.acc,
+            "fan": self.fan,
+        }
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # the creating process owns the segment; attaching must not register it for cleanup here
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: no track flag; keep the attach out of the resource tracker
+        from multiprocessing import resource_tracker
+
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class TelemetryRing:
+    """
+    Single-producer ring of fixed-layout telemetry records in shared memory.
+
+    The producer (e.g. a serial reader process) calls publish(); any number of RingReader
+    processes attach by name and each follows the stream with its own cursor, so nothing is
+    pickled or copied through a pipe. The ring never blocks the producer: a reader that falls
+    more than `capacity` records behind loses the oldest ones and counts them as overrun.
+
+    Each slot carries its sequence number, written after the payload; a reader validates it
+    before and after copying a slot, so a slot overwritten mid-read is detected, not returned.
+    """
+
+    def __init__(self, capacity: int = 4096, name: Optional[str] = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity * SLOT.size)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, SLOT.size, capacity, 0, 0)
+        # slot seq = 2**64-1 marks "never written"
+        for i in range(capacity):
+            SEQ.pack_into(self.buf, HEADER_SIZE + i * SLOT.size, 0xFFFFFFFFFFFFFFFF)
+        self.seq = 0
+
+    def publish(self, msg: dict[str, Any], device: int = 0, rx_ns: Optional[int] = None) -> int:
+        """Append one telemetry dict; returns its sequence number."""
+        seq = self.seq
+        off = HEADER_SIZE + (seq % self.capacity) * SLOT.size
+        buf = self.buf
+        SEQ.pack_into(buf, off, 0xFFFFFFFFFFFFFFFF)  # invalidate before the payload changes
+        SLOT.pack_into(
+            buf, off,
+            0xFFFFFFFFFFFFFFFF,
+            time.perf_counter_ns() if rx_ns is None else rx_ns,
+            int(msg.get("ts_ms", 0)) & 0xFFFFFFFF,
+            device & 0xFFFF,
+            _ENV_INDEX.get(msg.get("env"), ENV_UNKNOWN),
+            int(msg.get("fan", 0)) & 0xFF,
+            float(msg.get("confidence", 1.0)),
+            float(msg.get("dist_cm", 0.0)),
+            float(msg.get("acc", 0.0)),
+            max(0, int(msg.get("mq2", 0))) & 0xFFFFFFFF,
+        )
+        SEQ.pack_into(buf, off, seq)
+        self.seq = seq + 1
+        SEQ.pack_into(buf, OFF_WRITE_SEQ, self.seq)
+        return seq
+
+    def finish(self) -> None:
+        """Tell readers no more records are coming; they drain what is left and see `closed`."""
+        self.buf[OFF_CLOSED] = 1
+
+    def close(self, unlink: bool = True) -> None:
+        """finish(), then release (and by default remove) the segment."""
+        if self.buf is None:
+            return
+        self.finish()
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+    def __enter__(self) -> "TelemetryRing":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class RingReader:
+    """
+    One consumer of a TelemetryRing, attached by segment name. Starts at the newest record
+    (from_start=False) or the oldest still held. `lost` counts records overwritten before
+    this reader got to them; `overruns` counts how many times that happened.
+    """
+
+    def __init__(self, name: str, from_start: bool = False) -> None:
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, slot_size, capacity, head, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or slot_size != SLOT.size:
+            raise ValueError(f"Not a telemetry ring: {name}")
+        self.capacity = capacity
+        self.next = max(0, head - capacity) if from_start else head
+        self.records = 0
+        self.lost = 0
+        self.overruns = 0
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.buf[OFF_CLOSED])
+
+    def head(self) -> int:
+        return SEQ.unpack_from(self.buf, OFF_WRITE_SEQ)[0]
+
+    def backlog(self) -> int:
+        return self.head() - self.next
+
+    def _skip_to(self, seq: int) -> None:
+        self.lost += seq - self.next
+        self.overruns += 1
+        self.next = seq
+
+    def poll(self, max_n: int = 256) -> list[TelemetryRecord]:
+        """Up to max_n records published since the last call; never blocks."""
+        buf = self.buf
+        cap = self.capacity
+        out: list[TelemetryRecord] = []
+        head = SEQ.unpack_from(buf, OFF_WRITE_SEQ)[0]
+        if head - self.next > cap:
+            self._skip_to(head - cap)
+        while self.next < head and len(out) < max_n:
+            want = self.next
+            off = HEADER_SIZE + (want % cap) * SLOT.size
+            rec = SLOT.unpack_from(buf, off)
+            if rec[0] != want or SEQ.unpack_from(buf, off)[0] != want:
+                # the producer lapped us while we were copying: resync to the oldest safe record
+                head = SEQ.unpack_from(buf, OFF_WRITE_SEQ)[0]
+                self._skip_to(max(want + 1, head - cap + 1))
+                continue
+            env = rec[4]
+            out.append(TelemetryRecord(want, rec[1], rec[2], rec[3], ENV_CODES[env] if env < len(ENV_CODES) else "UNKNOWN",
+                                       *rec[5:]))
+            self.next = want + 1
+        self.records += len(out)
+        return out
+
+    def wait(self, max_n: int = 256, timeout_s: float = 0.1, idle_sleep_s: float = 0.0005) -> list[TelemetryRecord]:
+        """poll(), sleeping briefly between empty polls, for up to timeout_s."""
+        deadline = time.monotonic() + timeout_s
+        while True:
+            out = self.poll(max_n)
+            if out or self.closed or time.monotonic() >= deadline:
+                return out
+            time.sleep(idle_sleep_s)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"records": self.records, "lost": self.lost, "overruns": self.overruns, "backlog": self.backlog()}
+
+    def close(self) -> None:
+        if self.buf is None:
+            return
+        self.buf = None
+        self.shm.close()
+
+    def __enter__(self) -> "RingReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
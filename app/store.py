@@ -0,0 +1,191 @@
+import json
+import os
+from typing import Dict, Any, Iterator, Optional, Sequence, Tuple
+import numpy as np
+
+from aeis_core import AEISCore, AEISConfig, batch_event_masks
+from metrics import MetricsAccumulator
+
+META_FILE = "meta.json"
+SENSOR_KEYS = ("t", "temp_c", "mq2_adc", "dist_cm", "tilt_deg", "vib")
+TRACE_COLUMNS = {
+    "temp_r": np.float64,
+    "gas_r": np.float64,
+    "dist_r": np.float64,
+    "tilt_r": np.float64,
+    "vib_r": np.float64,
+    "confidence": np.float64,
+    "raw_risk": np.float64,
+    "current_risk": np.float64,
+    "forecast_risk": np.float64,
+    "effective_risk": np.float64,
+    "baseline_state": np.int8,
+    "aeis_state": np.int8,
+    "events": np.uint8,
+}
+# fixed .npy header size so a column can be streamed first and its length patched in on close
+_HEADER_LEN = 128
+
+
+def _npy_header(dtype: np.dtype, length: int) -> bytes:
+    d = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (length,)}
+    body = repr(d).encode("latin1")
+    pad = _HEADER_LEN - len(np.lib.format.MAGIC_PREFIX) - 4 - len(body) - 1
+    if pad < 0:
+        raise ValueError(f"Column header too long for dtype {dtype}")
+    return (np.lib.format.MAGIC_PREFIX + b"\x01\x00"
+            + (_HEADER_LEN - 10).to_bytes(2, "little") + body + b" " * pad + b"\n")
+
+
+class ColumnWriter:
+    """
+    Append-only columnar store: one .npy file per column plus meta.json.
+    Chunks are written straight to disk, so recordings can be much larger than RAM.
+    Column dtypes are fixed by the first chunk; every chunk must carry the same columns and length.
+    """
+
+    def __init__(self, path: str, attrs: Optional[Dict[str, Any]] = None) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.attrs = dict(attrs or {})
+        self.length = 0
+        self._files: Dict[str, Any] = {}
+        self._dtypes: Dict[str, np.dtype] = {}
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        if self._files and set(columns) != set(self._files):
+            raise ValueError(f"Column set changed: {sorted(columns)} != {sorted(self._files)}")
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns differ in length: {sorted(lengths)}")
+        for name, values in columns.items():
+            values = np.asarray(values)
+            f = self._files.get(name)
+            if f is None:
+                self._dtypes[name] = values.dtype
+                f = self._files[name] = open(os.path.join(self.path, name + ".npy"), "wb")
+                f.write(_npy_header(values.dtype, 0))
+            f.write(np.ascontiguousarray(values, dtype=self._dtypes[name]).tobytes())
+        self.length += lengths.pop() if lengths else 0
+
+    def close(self) -> None:
+        for name, f in self._files.items():
+            f.seek(0)
+            f.write(_npy_header(self._dtypes[name], self.length))
+            f.close()
+        meta = {
+            "length": self.length,
+            "columns": {name: np.lib.format.dtype_to_descr(dt) for name, dt in self._dtypes.items()},
+            "attrs": self.attrs,
+        }
+        with open(os.path.join(self.path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        self._files.clear()
+
+    def __enter__(self) -> "ColumnWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ColumnStore:
+    """Read side of a ColumnWriter directory. Columns are opened lazily as read-only memmaps."""
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = path
+        self.length: int = meta["length"]
+        self.columns = tuple(meta["columns"])
+        self.attrs: Dict[str, Any] = meta.get("attrs", {})
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        col = self._cache.get(name)
+        if col is None:
+            if name not in self.columns:
+                raise KeyError(name)
+            col = self._cache[name] = np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r")
+        return col
+
+    def iter_chunks(self, names: Optional[Sequence[str]] = None, chunk: int = 1 << 16
+                    ) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """Yield (offset, {name: slice}) windows; slices are views into the memmaps."""
+        names = list(names or self.columns)
+        cols = [self[n] for n in names]
+        for lo in range(0, self.length, chunk):
+            yield lo, {n: c[lo:lo + chunk] for n, c in zip(names, cols)}
+
+
+def save_columns(path: str, columns: Dict[str, np.ndarray], attrs: Optional[Dict[str, Any]] = None) -> None:
+    with ColumnWriter(path, attrs) as w:
+        w.append(columns)
+
+
+def trace_columns(res: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """run_batch() result -> the stored per-step trace (event flags packed into one Event mask)."""
+    out = {name: res[name].astype(dt, copy=False) for name, dt in TRACE_COLUMNS.items() if name != "events"}
+    out["events"] = batch_event_masks(res)
+    return out
+
+
+def record_run(path: str, arrays: Dict[str, np.ndarray], hazard_truth: Optional[np.ndarray] = None,
+               cfg: Optional[AEISConfig] = None, chunk: int = 1 << 16,
+               attrs: Optional[Dict[str, Any]] = None) -> None:
+    """Run AEIS over a sensor stream chunk by chunk and store sensors, hazard truth and the full trace."""
+    core = AEISCore(cfg or AEISConfig())
+    n = len(arrays["t"])
+    with ColumnWriter(path, attrs) as w:
+        for lo in range(0, n, chunk):
+            part = {k: np.asarray(v[lo:lo + chunk]) for k, v in arrays.items()}
+            cols = dict(part)
+            if hazard_truth is not None:
+                cols["hazard_truth"] = np.asarray(hazard_truth[lo:lo + chunk], dtype=np.int8)
+            cols.update(trace_columns(core.run_batch(part)))
+            w.append(cols)
+
+
+def replay(store: ColumnStore, cfg: Optional[AEISConfig] = None, chunk: int = 1 << 16
+           ) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+    """Re-run AEIS (possibly with a different config) over the stored sensor columns."""
+    core = AEISCore(cfg or AEISConfig())
+    for lo, part in store.iter_chunks(SENSOR_KEYS, chunk):
+        yield lo, core.run_batch(part)
+
+
+def trace_metrics(store: ColumnStore, state_col: str = "aeis_state", chunk: int = 1 << 20) -> Dict[str, Any]:
+    """compute_metrics() over a stored trace without materialising whole columns."""
+    acc = MetricsAccumulator()
+    for _, c in store.iter_chunks(("hazard_truth", state_col), chunk):
+        acc.update_batch(c["hazard_truth"], c[state_col])
+    return acc.result()
+
+
+def envelope(col: np.ndarray, buckets: int = 2000, chunk: int = 1 << 20) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Min/max per bucket for plotting long columns: returns (bucket start index, lo, hi).
+    Reads the column in chunks, so it works on memmaps larger than RAM.
+    """
+    n = len(col)
+    size = max(1, -(-n // buckets))
+    chunk = max(size, chunk - chunk % size)
+    lo_parts, hi_parts = [], []
+    for i in range(0, n, chunk):
+        part = np.asarray(col[i:i + chunk], dtype=float)
+        pad = -len(part) % size
+        if pad:
+            part = np.concatenate([part, np.full(pad, part[-1])])
+        part = part.reshape(-1, size)
+        lo_parts.append(part.min(axis=1))
+        hi_parts.append(part.max(axis=1))
+    if not lo_parts:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), empty, empty
+    return np.arange(0, n, size), np.concatenate(lo_parts), np.concatenate(hi_parts)
@@ -0,0 +1,175 @@
+import csv
+import itertools
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace, fields
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+
+from aeis_core import AEISCore, AEISConfig
+from metrics import compute_metrics
+from scenarios import all_scenarios
+from validation import generate_run, evaluate_run, run_rng
+
+# fields that feed the normalization functions; candidates that agree on these share factors
+NORM_FIELDS = (
+    "temp_min", "temp_max", "mq2_min", "mq2_max", "dist_min", "dist_max",
+    "tilt_warn", "tilt_crit", "vib_warn", "vib_crit",
+)
+RANK_BY = (
+    "val_false_negative_rate",
+    "scen_missed_hazards",
+    "val_false_positive_rate",
+    "scen_false_alarms",
+    "scen_reaction_time_steps",
+)
+SENSOR_KEYS = ("t", "temp_c", "mq2_adc", "dist_cm", "tilt_deg", "vib")
+
+
+def field_type(name: str) -> type:
+    types = {f.name: type(f.default) for f in fields(AEISConfig)}
+    if name not in types:
+        raise ValueError(f"Unknown AEISConfig field: {name}")
+    return types[name]
+
+
+def grid_space(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the listed values."""
+    names = list(space)
+    for name in names:
+        field_type(name)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_space(space: Dict[str, Any], samples: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    `samples` random candidates. A (lo, hi) tuple is sampled uniformly (inclusive for int fields),
+    a list is sampled as a choice.
+    """
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(samples):
+        cand = {}
+        for name, spec in space.items():
+            kind = field_type(name)
+            if isinstance(spec, tuple):
+                lo, hi = spec
+                cand[name] = int(rng.integers(lo, hi + 1)) if kind is int else float(rng.uniform(lo, hi))
+            else:
+                cand[name] = kind(spec[int(rng.integers(len(spec)))])
+        out.append(cand)
+    return out
+
+
+def build_workload(steps: int = 300, val_runs: int = 200, val_steps: int = 400,
+                   mix: Optional[Dict[str, float]] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Generate the sensor streams once; every candidate is evaluated against the same data."""
+    scenarios = []
+    for name, data, hazard_truth in all_scenarios(steps=steps):
+        arrays = {k: np.array([p[k] for p in data]) for k in SENSOR_KEYS}
+        scenarios.append((name, arrays, hazard_truth))
+    runs = []
+    for run_id in range(val_runs):
+        scenario_type, arrays = generate_run(run_rng(run_id, seed), val_steps, mix)
+        runs.append((run_id, scenario_type, arrays))
+    return {"scenarios": scenarios, "runs": runs}
+
+
+_WORKLOAD: Optional[Dict[str, Any]] = None
+# normalization key -> {data key -> factors}; only the most recently used FACTOR_CONFIGS
+# normalizations are kept, so sweeping NORM_FIELDS does not grow memory per candidate
+FACTOR_CONFIGS = 4
+_FACTORS: "OrderedDict[Tuple, Dict[Tuple, Dict[str, np.ndarray]]]" = OrderedDict()
+
+
+def _init_worker(workload: Dict[str, Any]) -> None:
+    global _WORKLOAD
+    _WORKLOAD = workload
+    _FACTORS.clear()
+
+
+def _factors(core: AEISCore, key: Tuple, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    norm = tuple(getattr(core.cfg, f) for f in NORM_FIELDS)
+    per_data = _FACTORS.get(norm)
+    if per_data is None:
+        per_data = _FACTORS[norm] = {}
+        while len(_FACTORS) > FACTOR_CONFIGS:
+            _FACTORS.popitem(last=False)
+    else:
+        _FACTORS.move_to_end(norm)
+    cached = per_data.get(key)
+    if cached is None:
+        cached = per_data[key] = core.batch_factors(arrays)
+    return cached
+
+
+def evaluate_candidate(params: Dict[str, Any]) -> Dict[str, Any]:
+    cfg = replace(AEISConfig(), **params)
+    row: Dict[str, Any] = dict(params)
+
+    false_alarms = missed = 0
+    reaction = []
+    for name, arrays, hazard_truth in _WORKLOAD["scenarios"]:
+        core = AEISCore(cfg)
+        res = core.run_batch(arrays, _factors(core, ("scenario", name), arrays))
+        m = compute_metrics(hazard_truth, res["aeis_state"])
+        false_alarms += m["false_alarms"]
+        missed += m["missed_hazards"]
+        if m["reaction_time_steps"] != "":
+            reaction.append(m["reaction_time_steps"])
+        row[f"{name}_false_alarms"] = m["false_alarms"]
+        row[f"{name}_missed_hazards"] = m["missed_hazards"]
+        row[f"{name}_reaction_time_steps"] = m["reaction_time_steps"]
+    row["scen_false_alarms"] = false_alarms
+    row["scen_missed_hazards"] = missed
+    row["scen_reaction_time_steps"] = sum(reaction) / len(reaction) if reaction else ""
+
+    runs = _WORKLOAD["runs"]
+    fp = fn = 0
+    min_conf = 0.0
+    for run_id, scenario_type, arrays in runs:
+        r = evaluate_run(run_id, scenario_type, arrays, cfg,
+                         _factors(AEISCore(cfg), ("run", run_id), arrays))
+        fp += r["false_positive"]
+        fn += r["false_negative"]
+        min_conf += r["min_confidence"]
+    n = len(runs) or 1
+    row["val_false_positive_rate"] = fp / n
+    row["val_false_negative_rate"] = fn / n
+    row["val_avg_min_confidence"] = min_conf / n
+    return row
+
+
+def _rank_key(row: Dict[str, Any]) -> Tuple:
+    return tuple(math.inf if row[k] == "" else row[k] for k in RANK_BY)
+
+
+def run_sweep(candidates: List[Dict[str, Any]], workload: Optional[Dict[str, Any]] = None,
+              workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Evaluate every candidate and return the rows ranked best first (see RANK_BY)."""
+    workload = workload or build_workload()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(candidates) <= 1:
+        _init_worker(workload)
+        rows = [evaluate_candidate(c) for c in candidates]
+    else:
+        chunk = max(1, len(candidates) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workload,)) as ex:
+            rows = list(ex.map(evaluate_candidate, candidates, chunksize=chunk))
+    rows.sort(key=_rank_key)
+    for i, r in enumerate(rows, start=1):
+        r["rank"] = i
+    return rows
+
+
+def write_table(rows: List[Dict[str, Any]], out_path: str = "sweep_results.csv") -> None:
+    keys: List[str] = ["rank"]
+    for r in rows:
+        keys += [k for k in r if k not in keys]
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: r.get(k, "") for k in keys})
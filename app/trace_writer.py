@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Iterator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+HAVE_ZSTD = zstandard is not None
+_READ_ERRORS = (EOFError, OSError) + ((zstandard.ZstdError,) if HAVE_ZSTD else ())
+CODEC_SUFFIX = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "none": ".jsonl"}
+
+
+def step_record(res, **extra: Any) -> dict[str, Any]:
+    """StepResult -> flat JSON-able dict (numbers only; events stay a bitmask), plus any extra keys."""
+    rec = res._asdict()
+    rec.update(extra)
+    return rec
+
+
+def _compressor(codec: str):
+    if codec == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "zstd":
+        if not HAVE_ZSTD:
+            raise ValueError("codec 'zstd' needs the zstandard package")
+        return zstandard.ZstdCompressor(level=3).compress
+    if codec == "none":
+        return lambda data: data
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+class TraceWriter:
+    """
+    Streaming JSON Lines writer for AEIS step outputs / events in long-running deployments.
+
+    write() only appends to an in-memory batch under a short lock and never touches the disk.
+    A background thread takes the batch every `flush_s` seconds (or as soon as `batch_records`
+    are pending), encodes and compresses it as one independent chunk (a gzip member / zstd frame)
+    and appends it to <dir>/<prefix>-NNNNN.jsonl.gz. Files rotate after `max_bytes` or
+    `max_age_s`; numbering continues after existing files.
+
+    If the disk falls behind and `max_pending` records are already waiting, write() drops the
+    record and counts it in `dropped` instead of blocking the decision loop. A crash loses at
+    most the pending batch; every chunk already written decodes on its own.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "trace",
+        codec: str = "gzip",
+        max_bytes: int = 64 << 20,
+        max_age_s: float = 3600.0,
+        flush_s: float = 1.0,
+        batch_records: int = 4096,
+        max_pending: int = 65536,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.codec = codec
+        self._compress = _compressor(codec)
+        self.suffix = CODEC_SUFFIX[codec]
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.flush_s = flush_s
+        self.batch_records = batch_records
+        self.max_pending = max_pending
+
+        self.records = 0        # accepted by write()
+        self.dropped = 0        # rejected by write() (backlog full), unencodable, or lost to a failed disk write
+        self.written = 0        # records on disk
+        self.chunks = 0
+        self.raw_bytes = 0
+        self.bytes = 0
+        self.files = 0
+        self.errors = 0
+
+        existing = trace_files(directory, prefix, self.suffix)
+        self._index = _file_index(existing[-1], self.suffix) + 1 if existing else 0
+        self._f = None
+        self._size = 0
+        self._opened = 0.0
+        self._pending: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name=f"aeis-trace-{prefix}", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict[str, Any]) -> bool:
+        """Queue one record; False (and counted in `dropped`) if the backlog is full or the writer is closed."""
+        with self._lock:
+            if self._closing or len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.append(record)
+            self.records += 1
+            n = len(self._pending)
+        if n >= self.batch_records:
+            self._wake.set()
+        return True
+
+    def write_step(self, res, **extra: Any) -> bool:
+        return self.write(step_record(res, **extra))
+
+    def _take(self) -> list[dict[str, Any]]:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            closing = self._closing
+            batch = self._take()
+            if batch:
+                self._write_chunk(batch)
+            elif self._f is not None and time.monotonic() - self._opened >= self.max_age_s:
+                self._close_file()
+            if closing:
+                break
+        self._close_file()
+
+    def _open_file(self) -> None:
+        path = os.path.join(self.directory, f"{self.prefix}-{self._index:05d}{self.suffix}")
+        self._f = open(path, "xb")
+        self._index += 1
+        self._size = 0
+        self._opened = time.monotonic()
+        self.files += 1
+        self.path = path
+
+    def _close_file(self) -> None:
+        if self._f is None:
+            return
+        try:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+        except OSError:
+            self.errors += 1
+        self._f = None
+
+    def _drop(self, n: int) -> None:
+        self.errors += 1
+        with self._lock:
+            self.dropped += n
+
+    def _write_chunk(self, batch: list[dict[str, Any]]) -> None:
+        lines = []
+        for r in batch:
+            try:
+                lines.append(json.dumps(r, separators=(",", ":")))
+            except (TypeError, ValueError):
+                # not JSON-serializable (or circular): drop just this record
+                self._drop(1)
+        if not lines:
+            return
+        try:
+            raw = ("\n".join(lines) + "\n").encode("utf-8")
+            data = self._compress(raw)
+        except Exception:
+            self._drop(len(lines))
+            return
+        try:
+            if self._f is None:
+                self._open_file()
+            self._f.write(data)
+            self._f.flush()
+        except OSError:
+            self._drop(len(lines))
+            self._close_file()
+            return
+        self._size += len(data)
+        self.written += len(lines)
+        self.chunks += 1
+        self.raw_bytes += len(raw)
+        self.bytes += len(data)
+        if self._size >= self.max_bytes or time.monotonic() - self._opened >= self.max_age_s:
+            self._close_file()
+
+    def close(self) -> None:
+        """Write everything still pending, then stop the thread and close the file."""
+        with self._lock:
+            self._closing = True
+        self._wake.set()
+        self._thread.join()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+            dropped = self.dropped
+        return {
+            "records": self.records,
+            "written": self.written,
+            "dropped": dropped,
+            "pending": pending,
+            "chunks": self.chunks,
+            "files": self.files,
+            "errors": self.errors,
+            "ratio": self.raw_bytes / self.bytes if self.bytes else 0.0,
+        }
+
+
+def _file_index(path: str, suffix: str) -> int:
+    return int(path[-len(suffix) - 5:-len(suffix)])
+
+
+def trace_files(directory: str, prefix: str = "trace", suffix: str = CODEC_SUFFIX["gzip"]) -> list[str]:
+    if not os.path.isdir(directory):
+        return []
+    pat = re.compile(re.escape(prefix) + r"-\d{5}" + re.escape(suffix) + "$")
+    return sorted(os.path.join(directory, n) for n in os.listdir(directory) if pat.match(n))
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if not HAVE_ZSTD:
+            raise ValueError(f"Reading {path} needs the zstandard package")
+        import io
+
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_traces(paths: list[str]) -> Iterator[dict[str, Any]]:
+    """
+    Records across files in order. A chunk cut short at the end of a file (crash mid-write)
+    ends that file quietly.
+    """
+    for path in paths:
+        with _open_text(path) as f:
+            try:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+            except _READ_ERRORS:
+                continue
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Callable, Optional
+
+import serial
+
+from app.transport_serial import SerialConfig, LineFramer, BinaryFramer, PROTO_BINARY, PROTO_JSONL, encode_jsonl
+
+
+class PortQueue(asyncio.Queue):
+    """
+    Bounded queue of (port, msg) shared by the transports of an AsyncSerialHub. Besides get(),
+    a transport can take just its own port's messages (get_port), and a drop_oldest eviction
+    is charged to the port whose message was evicted (`dropped`, per port).
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self.dropped: dict[str, int] = {}
+        self._arrived = asyncio.Event()
+
+    def _put(self, item) -> None:
+        super()._put(item)
+        self._arrived.set()
+
+    def offer(self, port: str, msg: dict[str, Any], overflow: str) -> bool:
+        """put_nowait((port, msg)) under the given overflow policy; False if msg was discarded."""
+        if self.full():
+            if overflow == "drop_newest":
+                self.dropped[port] = self.dropped.get(port, 0) + 1
+                return False
+            old_port, _ = self.get_nowait()
+            self.dropped[old_port] = self.dropped.get(old_port, 0) + 1
+        self.put_nowait((port, msg))
+        return True
+
+    async def get_port(self, port: str) -> dict[str, Any]:
+        """Oldest message from `port`, leaving other ports' messages queued in order."""
+        while True:
+            for i, (p, msg) in enumerate(self._queue):
+                if p == port:
+                    del self._queue[i]
+                    return msg
+            self._arrived.clear()
+            await self._arrived.wait()
+
+
+class AsyncSerialJsonlTransport:
+    """
+    asyncio JSON Lines transport. A background reader pulls whatever bytes are available,
+    frames complete lines and pushes decoded messages into a bounded queue.
+
+    On a full queue, overflow="drop_oldest" (default) evicts the oldest message,
+    overflow="drop_newest" discards the incoming one; both are counted in `dropped`.
+    Corrupt lines are counted in `decode_errors` and skipped instead of raising.
+    `port` may be a device path, a pty, or a pySerial URL such as "loop://".
+
+    With a shared `sink` (see AsyncSerialHub) messages go there as (port, msg); read_message()
+    and wait_for() still return only this port's messages, unwrapped.
+    """
+
+    def __init__(
+        self,
+        cfg: SerialConfig,
+        queue_size: int = 1024,
+        overflow: str = "drop_oldest",
+        sink: Optional[PortQueue] = None,
+    ) -> None:
+        if overflow not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.cfg = cfg
+        self.overflow = overflow
+        # a shared sink receives (port, msg) tuples instead of bare messages
+        self.queue: asyncio.Queue = sink if sink is not None else asyncio.Queue(maxsize=queue_size)
+        self._sink = sink
+        self.ser: Optional[serial.SerialBase] = None
+        self.framer = LineFramer()
+        self._fd: Optional[int] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dropped = 0
+        self.messages = 0
+        self._framer_errors = 0  # decode errors of framers replaced by set_protocol()
+        # optional raw-traffic sink, see SerialJsonlTransport.recorder
+        self.recorder = None
+
+    async def open(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.ser = serial.serial_for_url(
+            self.cfg.port,
+            baudrate=self.cfg.baud,
+            timeout=0,
+            write_timeout=self.cfg.write_timeout_s,
+        )
+        try:
+            fd = self.ser.fileno() if os.name == "posix" else None
+        except (AttributeError, OSError, serial.SerialException):
+            fd = None
+        if fd is not None:
+            self._fd = fd
+            self._loop.add_reader(fd, self._on_readable)
+        else:
+            self._poller = self._loop.create_task(self._poll())
+
+    async def close(self) -> None:
+        if self._fd is not None and self._loop is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        if self.ser and self.ser.is_open:
+            self.ser.close()
+
+    async def __aenter__(self) -> "AsyncSerialJsonlTransport":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _on_readable(self) -> None:
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+        except serial.SerialException:
+            # device went away; stop watching the descriptor
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+            return
+        if data:
+            self._feed(data)
+
+    async def _poll(self) -> None:
+        # fallback for ports without a selectable descriptor: bulk reads off the loop thread
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await loop.run_in_executor(None, self._read_blocking)
+            if data:
+                self._feed(data)
+            else:
+                await asyncio.sleep(self.cfg.read_timeout_s / 10)
+
+    def _read_blocking(self) -> bytes:
+        return self.ser.read(self.ser.in_waiting or 1)
+
+    def _feed(self, data: bytes) -> None:
+        if self.recorder is not None:
+            self.recorder.rx(data)
+        for msg in self.framer.feed(data):
+            self._put(msg)
+
+    @property
+    def decode_errors(self) -> int:
+        return self._framer_errors + self.framer.decode_errors + self.framer.overflows
+
+    @property
+    def dropped(self) -> int:
+        if self._sink is not None:
+            return self._sink.dropped.get(self.cfg.port, 0)
+        return self._dropped
+
+    def _put(self, msg: dict[str, Any]) -> None:
+        if self._sink is not None:
+            if self._sink.offer(self.cfg.port, msg, self.overflow):
+                self.messages += 1
+            return
+        q = self.queue
+        if q.full():
+            self._dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            q.get_nowait()
+        q.put_nowait(msg)
+        self.messages += 1
+
+    def _get(self):
+        return self._sink.get_port(self.cfg.port) if self._sink is not None else self.queue.get()
+
+    async def read_message(self, timeout_s: Optional[float] = None) -> Optional[dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._get(), timeout_s)
+        except asyncio.TimeoutError:
+            return None
+
+    async def write_message(self, obj: dict[str, Any]) -> None:
+        data = encode_jsonl(obj)
+        async with self._write_lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_blocking, data)
+        if self.recorder is not None:
+            self.recorder.tx(data)
+
+    async def set_protocol(self, proto: str) -> None:
+        if proto not in (PROTO_JSONL, PROTO_BINARY):
+            raise ValueError(f"Unknown protocol: {proto}")
+        await self.write_message({"type": "cmd", "cmd": "proto", "value": proto})
+        self._framer_errors += self.framer.decode_errors + self.framer.overflows
+        self.framer = BinaryFramer() if proto == PROTO_BINARY else LineFramer()
+        if self.recorder is not None:
+            self.recorder.proto(proto)
+
+    def _write_blocking(self, data: bytes) -> None:
+        self.ser.write(data)
+        self.ser.flush()
+
+    async def wait_for(self, predicate: Callable[[dict[str, Any]], bool], timeout_s: float = 3.0) -> dict[str, Any]:
+        async def _wait() -> dict[str, Any]:
+            while True:
+                msg = await self._get()
+                if predicate(msg):
+                    return msg
+        try:
+            return await asyncio.wait_for(_wait(), timeout_s)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout waiting for message") from None
+
+
+class AsyncSerialHub:
+    """Many serial ports on one event loop, feeding one bounded queue of (port, msg)."""
+
+    def __init__(self, queue_size: int = 4096, overflow: str = "drop_oldest") -> None:
+        self.queue = PortQueue(maxsize=queue_size)
+        self.overflow = overflow
+        self.transports: dict[str, AsyncSerialJsonlTransport] = {}
+
+    async def add(self, cfg: SerialConfig) -> AsyncSerialJsonlTransport:
+        tr = AsyncSerialJsonlTransport(cfg, overflow=self.overflow, sink=self.queue)
+        await tr.open()
+        self.transports[cfg.port] = tr
+        return tr
+
+    async def read(self, timeout_s: Optional[float] = None) -> Optional[tuple[str, dict[str, Any]]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout_s)
+        except asyncio.TimeoutError:
+            return None
+
+    async def write(self, port: str, obj: dict[str, Any]) -> None:
+        await self.transports[port].write_message(obj)
+
+    async def close(self) -> None:
+        for tr in self.transports.values():
+            await tr.close()
+        self.transports.clear()
+
+    @property
+    def dropped(self) -> int:
+        return sum(tr.dropped for tr in self.transports.values())
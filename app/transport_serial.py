@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import binascii
 import json
+import struct
 import time
+from collections import deque
 from dataclasses import dataclass
 from typing import Any, Optional
 
 import serial
 
+# aeis_core has no sibling imports either; this module is used from both layouts
+try:
+    from app.aeis_core import LatencyHistogram
+except ImportError:  # PYTHONPATH=app
+    from aeis_core import LatencyHistogram
+
 
 class SerialProtocolError(RuntimeError):
     pass
@@ -18,6 +27,8 @@ class SerialConfig:
     baud: int = 115200
     read_timeout_s: float = 0.2
     write_timeout_s: float = 1.0
+    stall_s: float = 0.05        # a write()+flush() slower than this counts as a write stall
+    stats_log_s: float = 0.0     # > 0: emit a link health line this often (SerialJsonlTransport.log)
 
 
 def encode_jsonl(obj: dict[str, Any]) -> bytes:
@@ -35,6 +46,296 @@ def decode_jsonl_line(raw: bytes) -> dict[str, Any]:
     return obj
 
 
+# Binary protocol "bin1": one COBS-encoded record per frame, frames delimited by 0x00.
+# Record (little-endian): type u8, seq u16, ts_ms u32, env u8, sys u8, confidence u16 (x1e4),
+# mq2 u16, dist_cm u16 (x10), acc i16 (x1e3), fan u8, then CRC-16/CCITT-FALSE u16 over the record.
+# Host -> device commands stay JSON Lines in both modes.
+PROTO_BINARY = "bin1"
+PROTO_JSONL = "jsonl"
+MSG_TELEMETRY = 0x01
+ENV_CODES = ("NORMAL", "CAUTION", "HAZARD")
+SYS_CODES = ("OK", "DEGRADED", "FAULT")
+TELEMETRY_STRUCT = struct.Struct("<BHIBBHHHhB")
+CRC_STRUCT = struct.Struct("<H")
+
+
+def cobs_encode(data: bytes) -> bytes:
+    out = bytearray()
+    for block in data.split(b"\x00"):
+        while len(block) >= 254:
+            out.append(0xFF)
+            out += block[:254]
+            block = block[254:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out)
+
+
+def cobs_decode(enc: bytes) -> bytes:
+    pieces: list[bytes] = []
+    cur: list[bytes] = []
+    i, n = 0, len(enc)
+    while i < n:
+        code = enc[i]
+        j = i + code
+        if code == 0 or j > n:
+            raise SerialProtocolError("Bad COBS frame")
+        cur.append(enc[i + 1:j])
+        i = j
+        # a full 254-byte block (0xFF) carries no implied zero
+        if code < 0xFF:
+            pieces.append(cur[0] if len(cur) == 1 else b"".join(cur))
+            cur = []
+    if cur:
+        pieces.append(b"".join(cur))
+    return b"\x00".join(pieces)
+
+
+def _code(table: tuple[str, ...], value: Any, field: str) -> int:
+    try:
+        return table.index(str(value))
+    except ValueError:
+        raise SerialProtocolError(f"Cannot encode {field}={value!r}") from None
+
+
+def encode_binary(obj: dict[str, Any], seq: int = 0) -> bytes:
+    """Telemetry dict (as sent in JSON Lines) -> one delimited bin1 frame."""
+    rec = TELEMETRY_STRUCT.pack(
+        MSG_TELEMETRY,
+        seq & 0xFFFF,
+        int(obj.get("ts_ms", 0)) & 0xFFFFFFFF,
+        _code(ENV_CODES, obj.get("env", "NORMAL"), "env"),
+        _code(SYS_CODES, obj.get("sys", "OK"), "sys"),
+        min(10000, max(0, round(float(obj.get("confidence", 1.0)) * 10000))),
+        min(0xFFFF, max(0, int(obj.get("mq2", 0)))),
+        min(0xFFFF, max(0, round(float(obj.get("dist_cm", 0.0)) * 10))),
+        min(32767, max(-32768, round(float(obj.get("acc", 0.0)) * 1000))),
+        int(obj.get("fan", 0)) & 0xFF,
+    )
+    return cobs_encode(rec + CRC_STRUCT.pack(binascii.crc_hqx(rec, 0xFFFF))) + b"\x00"
+
+
+def decode_binary_frame(frame: bytes) -> dict[str, Any]:
+    """One bin1 frame without its 0x00 delimiter -> telemetry dict (JSON Lines keys plus seq)."""
+    raw = cobs_decode(frame)
+    if len(raw) != TELEMETRY_STRUCT.size + CRC_STRUCT.size:
+        raise SerialProtocolError("Bad binary record length")
+    rec = raw[:TELEMETRY_STRUCT.size]
+    if CRC_STRUCT.unpack_from(raw, TELEMETRY_STRUCT.size)[0] != binascii.crc_hqx(rec, 0xFFFF):
+        raise SerialProtocolError("CRC mismatch")
+    kind, seq, ts_ms, env, sys_, conf, mq2, dist, acc, fan = TELEMETRY_STRUCT.unpack(rec)
+    if kind != MSG_TELEMETRY or env >= len(ENV_CODES) or sys_ >= len(SYS_CODES):
+        raise SerialProtocolError("Unknown binary record")
+    return {
+        "type": "telemetry",
+        "seq": seq,
+        "ts_ms": ts_ms,
+        "env": ENV_CODES[env],
+        "sys": SYS_CODES[sys_],
+        "confidence": conf / 10000,
+        "mq2": mq2,
+        "dist_cm": dist / 10,
+        "acc": acc / 1000,
+        "fan": fan,
+    }
+
+
+class BinaryFramer:
+    """bin1 counterpart of LineFramer: splits on 0x00, counts bad frames and sequence gaps."""
+
+    def __init__(self, max_frame: int = 256) -> None:
+        self.max_frame = max_frame
+        self.buf = bytearray()
+        self.decode_errors = 0
+        self.overflows = 0
+        self.seq_gaps = 0
+        self._last_seq: Optional[int] = None
+
+    def feed(self, data: bytes) -> list[dict[str, Any]]:
+        buf = self.buf
+        buf += data
+        out: list[dict[str, Any]] = []
+        start = 0
+        while True:
+            end = buf.find(0, start)
+            if end < 0:
+                break
+            if end > start:
+                try:
+                    msg = decode_binary_frame(bytes(buf[start:end]))
+                except SerialProtocolError:
+                    self.decode_errors += 1
+                else:
+                    seq = msg["seq"]
+                    if self._last_seq is not None and seq != (self._last_seq + 1) & 0xFFFF:
+                        self.seq_gaps += 1
+                    self._last_seq = seq
+                    out.append(msg)
+            start = end + 1
+        if start:
+            del buf[:start]
+        if len(buf) > self.max_frame:
+            self.overflows += 1
+            buf.clear()
+        return out
+
+    def reset(self) -> None:
+        self.buf.clear()
+        self._last_seq = None
+
+
+class LineFramer:
+    """
+    Splits a byte stream into JSON Lines messages.
+    Bytes are appended to one reusable buffer, complete lines are decoded straight from
+    memoryview slices, and a partial line is carried over to the next feed().
+    Corrupt lines are counted in `decode_errors` and skipped; a line longer than
+    `max_line` is discarded up to the next newline and counted in `overflows`.
+    """
+
+    def __init__(self, max_line: int = 4096) -> None:
+        self.max_line = max_line
+        self.buf = bytearray()
+        self.decode_errors = 0
+        self.overflows = 0
+        self._discarding = False
+
+    def feed(self, data: bytes) -> list[dict[str, Any]]:
+        buf = self.buf
+        buf += data
+        out: list[dict[str, Any]] = []
+        start = 0
+        with memoryview(buf) as mv:
+            while True:
+                nl = buf.find(b"\n", start)
+                if nl < 0:
+                    break
+                if self._discarding:
+                    self._discarding = False
+                elif nl > start:
+                    text = str(mv[start:nl], "utf-8", "replace")
+                    if text.strip():
+                        try:
+                            obj = json.loads(text)
+                        except ValueError:
+                            obj = None
+                        if isinstance(obj, dict):
+                            out.append(obj)
+                        else:
+                            self.decode_errors += 1
+                start = nl + 1
+        if start:
+            del buf[:start]
+        if len(buf) > self.max_line:
+            self.overflows += 1
+            buf.clear()
+            self._discarding = True
+        return out
+
+    def reset(self) -> None:
+        self.buf.clear()
+        self._discarding = False
+
+
+class LinkStats:
+    """
+    Link health for one SerialJsonlTransport: traffic counters, empty reads, write timings and
+    stalls, and device -> host latency from the firmware's ts_ms.
+
+    The device clock (ms since boot) has an unknown offset from the host's, so latency is taken
+    relative to the fastest frame seen: offset = min(host_ms - ts_ms) over the current and
+    previous `offset_window` frames, which follows slow clock drift. A backwards ts_ms (reboot
+    or wrap) restarts the estimate and is counted in `clock_resets`.
+    Rx fields are updated by the reading thread and tx fields by the writing one.
+    """
+
+    def __init__(self, offset_window: int = 256) -> None:
+        self.offset_window = offset_window
+        self.started = time.monotonic()
+        self.rx_bytes = 0
+        self.rx_msgs = 0
+        self.tx_bytes = 0
+        self.tx_msgs = 0
+        self.reads = 0
+        self.empty_reads = 0
+        self.write_stalls = 0
+        self.clock_resets = 0
+        self.write = LatencyHistogram()    # write() + flush()
+        self.latency = LatencyHistogram()  # device -> host, above the fastest observed frame
+        self.offset_ms: Optional[float] = None
+        self._win_min = float("inf")
+        self._prev_min = float("inf")
+        self._win_n = 0
+        self._last_ts: Optional[int] = None
+
+    def on_read(self, nbytes: int, msgs: list[dict[str, Any]], host_ms: float) -> None:
+        self.reads += 1
+        self.rx_bytes += nbytes
+        self.rx_msgs += len(msgs)
+        for msg in msgs:
+            ts = msg.get("ts_ms")
+            if isinstance(ts, int):
+                self._sample(host_ms, ts)
+
+    def _sample(self, host_ms: float, ts: int) -> None:
+        if self._last_ts is not None and ts < self._last_ts:
+            self.clock_resets += 1
+            self._win_min = self._prev_min = float("inf")
+            self._win_n = 0
+        self._last_ts = ts
+        d = host_ms - ts
+        if d < self._win_min:
+            self._win_min = d
+        self._win_n += 1
+        if self._win_n >= self.offset_window:
+            self._prev_min, self._win_min, self._win_n = self._win_min, float("inf"), 0
+        offset = min(self._win_min, self._prev_min)
+        self.offset_ms = offset
+        self.latency.add(int((d - offset) * 1e6))
+
+    def on_write(self, nbytes: int, nmsgs: int, dt_ns: int, stall_s: float) -> None:
+        self.tx_bytes += nbytes
+        self.tx_msgs += nmsgs
+        self.write.add(dt_ns)
+        if dt_ns > stall_s * 1e9:
+            self.write_stalls += 1
+
+    def mark(self) -> tuple:
+        """Current (time, traffic counters); pass it to rates() / snapshot() later to get rates since now."""
+        return (time.monotonic(), self.rx_bytes, self.rx_msgs, self.tx_bytes, self.tx_msgs)
+
+    def rates(self, since: Optional[tuple] = None) -> dict[str, float]:
+        """
+        Per-second rates since a mark() (default: since the start). Nothing is reset, so each
+        consumer (log line, gateway snapshot, ...) keeps its own mark and its own window.
+        """
+        t0, rb, rm, tb, tm = since if since is not None else (self.started, 0, 0, 0, 0)
+        dt = max(time.monotonic() - t0, 1e-9)
+        return {
+            "rx_bytes_per_s": (self.rx_bytes - rb) / dt,
+            "rx_msgs_per_s": (self.rx_msgs - rm) / dt,
+            "tx_bytes_per_s": (self.tx_bytes - tb) / dt,
+            "tx_msgs_per_s": (self.tx_msgs - tm) / dt,
+        }
+
+    def snapshot(self, since: Optional[tuple] = None) -> dict[str, Any]:
+        return {
+            "uptime_s": time.monotonic() - self.started,
+            "rx_bytes": self.rx_bytes,
+            "rx_msgs": self.rx_msgs,
+            "tx_bytes": self.tx_bytes,
+            "tx_msgs": self.tx_msgs,
+            "reads": self.reads,
+            "empty_reads": self.empty_reads,
+            "write_stalls": self.write_stalls,
+            "clock_resets": self.clock_resets,
+            "clock_offset_ms": self.offset_ms,
+            "write": self.write.snapshot(),
+            "latency": self.latency.snapshot(),
+            **self.rates(since),
+        }
+
+
 class SerialJsonlTransport:
     def __init__(self, cfg: SerialConfig) -> None:
         self.cfg = cfg
@@ -44,25 +345,121 @@ class SerialJsonlTransport:
             timeout=cfg.read_timeout_s,
             write_timeout=cfg.write_timeout_s,
         )
+        self.framer = LineFramer()
+        self._pending: deque[dict[str, Any]] = deque()
+        # optional raw-traffic sink with rx(bytes) / tx(bytes) / proto(name), e.g. recorder.SessionRecorder
+        self.recorder = None
+        self.stats = LinkStats()
+        self.log = print  # sink for the periodic health line (cfg.stats_log_s)
+        self._framer_errors = 0  # decode errors of framers replaced by set_protocol()
+        self._log_mark = self.stats.mark()  # rate window of the periodic log line
+
+    def set_protocol(self, proto: str) -> None:
+        """
+        Ask the device to switch its telemetry encoding and switch the local framer to match.
+        Frames already in flight in the old encoding are counted as decode errors.
+        """
+        if proto not in (PROTO_JSONL, PROTO_BINARY):
+            raise ValueError(f"Unknown protocol: {proto}")
+        self.write_message({"type": "cmd", "cmd": "proto", "value": proto})
+        self._framer_errors += self.framer.decode_errors + self.framer.overflows
+        self.framer = BinaryFramer() if proto == PROTO_BINARY else LineFramer()
+        if self.recorder is not None:
+            self.recorder.proto(proto)
 
     def close(self) -> None:
         if self.ser and self.ser.is_open:
             self.ser.close()
 
-    def write_message(self, obj: dict[str, Any]) -> None:
-        self.ser.write(encode_jsonl(obj))
+    @property
+    def decode_errors(self) -> int:
+        return self._framer_errors + self.framer.decode_errors + self.framer.overflows
+
+    def _write(self, data: bytes, nmsgs: int) -> None:
+        t0 = time.perf_counter_ns()
+        self.ser.write(data)
         self.ser.flush()
+        self.stats.on_write(len(data), nmsgs, time.perf_counter_ns() - t0, self.cfg.stall_s)
+        if self.recorder is not None:
+            self.recorder.tx(data)
+
+    def write_message(self, obj: dict[str, Any]) -> None:
+        self._write(encode_jsonl(obj), 1)
+
+    def write_messages(self, objs: list[dict[str, Any]]) -> None:
+        """Several messages in one write() + flush()."""
+        self._write(b"".join(encode_jsonl(o) for o in objs), len(objs))
+
+    def link_snapshot(self, since: Optional[tuple] = None) -> dict[str, Any]:
+        """LinkStats.snapshot() plus decode failures; rates since the stats.mark() `since` (default: start)."""
+        snap = self.stats.snapshot(since)
+        snap["decode_errors"] = self.decode_errors
+        return snap
+
+    def format_stats(self, since: Optional[tuple] = None) -> str:
+        s = self.link_snapshot(since)
+        lat = s["latency"]
+        return (
+            f"[{self.cfg.port}] rx {s['rx_bytes_per_s'] / 1e3:.1f} kB/s {s['rx_msgs_per_s']:.0f} msg/s "
+            f"tx {s['tx_msgs_per_s']:.1f} msg/s decode_err={s['decode_errors']} empty_reads={s['empty_reads']} "
+            f"stalls={s['write_stalls']} latency p50={lat['p50_us'] / 1e3:.1f}ms p99={lat['p99_us'] / 1e3:.1f}ms"
+        )
+
+    def _maybe_log(self) -> None:
+        every = self.cfg.stats_log_s
+        if every > 0:
+            mark = self.stats.mark()
+            if mark[0] - self._log_mark[0] >= every:
+                line = self.format_stats(self._log_mark)
+                self._log_mark = mark
+                self.log(line)
+
+    def read_messages(self) -> list[dict[str, Any]]:
+        """
+        All complete messages currently available. Blocks up to read_timeout_s for the
+        first byte, then takes everything already in the OS buffer in one read.
+        """
+        if self._pending:
+            out = list(self._pending)
+            self._pending.clear()
+            return out
+        data = self.ser.read(self.ser.in_waiting or 1)
+        if not data:
+            self.stats.empty_reads += 1
+            self._maybe_log()
+            return []
+        waiting = self.ser.in_waiting
+        if waiting:
+            data += self.ser.read(waiting)
+        host_ms = time.monotonic_ns() / 1e6
+        if self.recorder is not None:
+            self.recorder.rx(data)
+        msgs = self.framer.feed(data)
+        self.stats.on_read(len(data), msgs, host_ms)
+        self._maybe_log()
+        return msgs
 
     def read_message(self) -> Optional[dict[str, Any]]:
-        raw = self.ser.readline()
-        if not raw:
-            return None
-        return decode_jsonl_line(raw)
+        if not self._pending:
+            self._pending.extend(self.read_messages())
+        return self._pending.popleft() if self._pending else None
 
     def wait_for(self, predicate, timeout_s: float = 3.0) -> dict[str, Any]:
-        t0 = time.time()
-        while time.time() - t0 < timeout_s:
-            msg = self.read_message()
-            if msg and predicate(msg):
-                return msg
-        raise TimeoutError("Timeout waiting for message")
+        """
+        First message matching predicate. Each read blocks for at most the time left, so the
+        deadline (monotonic clock) is kept without spinning or overshooting by read_timeout_s.
+        """
+        deadline = time.monotonic() + timeout_s
+        try:
+            while True:
+                while self._pending:
+                    msg = self._pending.popleft()
+                    if predicate(msg):
+                        return msg
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise TimeoutError("Timeout waiting for message")
+                self.ser.timeout = min(self.cfg.read_timeout_s, left)
+                self._pending.extend(self.read_messages())
+        finally:
+            self.ser.timeout = self.cfg.read_timeout_s
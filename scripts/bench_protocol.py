@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from app.transport_serial import LineFramer, BinaryFramer, encode_jsonl, encode_binary, ENV_CODES
+
+
+def make_telemetry(n: int, seed: int = 0) -> list[dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "type": "telemetry",
+            "ts_ms": 1000 + 50 * i,
+            "env": rnd.choice(ENV_CODES),
+            "sys": "OK",
+            "confidence": round(rnd.uniform(0.4, 1.0), 3),
+            "mq2": rnd.randint(200, 3000),
+            "dist_cm": round(rnd.uniform(5, 250), 1),
+            "acc": round(rnd.uniform(0.0, 1.5), 3),
+            "fan": rnd.randint(0, 1),
+        }
+        for i in range(n)
+    ]
+
+
+def bench_decode(framer, stream: bytes, chunk: int) -> tuple[int, float]:
+    t0 = time.perf_counter()
+    n = 0
+    for i in range(0, len(stream), chunk):
+        n += len(framer.feed(stream[i:i + chunk]))
+    return n, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=50000)
+    ap.add_argument("--chunk", type=int, default=4096, help="bytes per simulated read()")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args()
+
+    msgs = make_telemetry(args.messages)
+    jsonl = b"".join(encode_jsonl(m) for m in msgs)
+    binary = b"".join(encode_binary(m, seq) for seq, m in enumerate(msgs))
+
+    results = {}
+    for name, stream, framer in (("jsonl", jsonl, LineFramer()), ("bin1", binary, BinaryFramer())):
+        n, dt = bench_decode(framer, stream, args.chunk)
+        assert n == len(msgs), f"{name}: decoded {n} of {len(msgs)}"
+        results[name] = {
+            "bytes_per_msg": len(stream) / len(msgs),
+            "decode_msgs_per_s": n / dt,
+            "msgs_per_s_at_115200": 115200 / 10 / (len(stream) / len(msgs)),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, r in results.items():
+        print(f"{name:6s} bytes/msg={r['bytes_per_msg']:6.1f}  decode={r['decode_msgs_per_s']:10.0f} msg/s  "
+              f"link cap @115200={r['msgs_per_s_at_115200']:6.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
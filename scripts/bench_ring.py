@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import time
+
+from app.aeis_core import AEISCore, AEISConfig
+from app.gateway import telemetry_sample
+from app.shm_ring import RingReader, TelemetryRing
+
+TELEMETRY = {
+    "type": "telemetry", "ts_ms": 0, "env": "NORMAL", "sys": "OK", "confidence": 0.97,
+    "mq2": 612, "dist_cm": 118.4, "acc": 0.08, "fan": 0,
+}
+
+
+def _frames(n: int, devices: int) -> list[tuple[int, dict]]:
+    return [(i % devices, {**TELEMETRY, "ts_ms": i * 10, "mq2": 600 + i % 50}) for i in range(n)]
+
+
+def ring_worker(name: str, shard: int, shards: int, out) -> None:
+    """Decision worker: follows the ring and steps one core per device of its shard."""
+    cores: dict[int, AEISCore] = {}
+    cfg = AEISConfig()
+    steps = 0
+    with RingReader(name, from_start=True) as reader:
+        while True:
+            recs = reader.wait(timeout_s=0.05)
+            if not recs and reader.closed:
+                break
+            for r in recs:
+                if r.device % shards != shard:
+                    continue
+                core = cores.get(r.device)
+                if core is None:
+                    core = cores[r.device] = AEISCore(cfg)
+                core.step_lean(*telemetry_sample(r.to_message()), t=r.ts_ms)
+                steps += 1
+        out.put({"shard": shard, "steps": steps, **reader.snapshot()})
+
+
+def queue_worker(q, out) -> None:
+    cores: dict[int, AEISCore] = {}
+    cfg = AEISConfig()
+    steps = 0
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        dev, msg = item
+        core = cores.get(dev)
+        if core is None:
+            core = cores[dev] = AEISCore(cfg)
+        core.step_lean(*telemetry_sample(msg), t=msg["ts_ms"])
+        steps += 1
+    out.put({"steps": steps})
+
+
+def bench_ring(frames, workers: int, capacity: int) -> dict:
+    out = mp.Queue()
+    with TelemetryRing(capacity) as ring:
+        procs = [mp.Process(target=ring_worker, args=(ring.name, i, workers, out)) for i in range(workers)]
+        for p in procs:
+            p.start()
+        time.sleep(0.5)  # let workers attach before the clock starts
+        t0 = time.perf_counter()
+        for dev, msg in frames:
+            ring.publish(msg, dev)
+        publish_s = time.perf_counter() - t0
+        ring.finish()
+        stats = [out.get() for _ in procs]
+        total_s = time.perf_counter() - t0
+        for p in procs:
+            p.join()
+    return {
+        "publish_per_s": len(frames) / publish_s,
+        "end_to_end_per_s": len(frames) / total_s,
+        "steps": sum(s["steps"] for s in stats),
+        "lost": sum(s["lost"] for s in stats),
+        "overruns": sum(s["overruns"] for s in stats),
+    }
+
+
+def bench_queue(frames, workers: int) -> dict:
+    out = mp.Queue()
+    qs = [mp.Queue() for _ in range(workers)]
+    procs = [mp.Process(target=queue_worker, args=(q, out)) for q in qs]
+    for p in procs:
+        p.start()
+    t0 = time.perf_counter()
+    for dev, msg in frames:
+        qs[dev % workers].put((dev, msg))
+    publish_s = time.perf_counter() - t0
+    for q in qs:
+        q.put(None)
+    stats = [out.get() for _ in procs]
+    total_s = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    return {
+        "publish_per_s": len(frames) / publish_s,
+        "end_to_end_per_s": len(frames) / total_s,
+        "steps": sum(s["steps"] for s in stats),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Reader -> decision workers handoff: shared-memory ring vs pickling queues")
+    ap.add_argument("--frames", type=int, default=200_000)
+    ap.add_argument("--devices", type=int, default=16)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--capacity", type=int, default=1 << 16, help="ring slots; a small ring shows overruns")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    frames = _frames(args.frames, args.devices)
+    report = {
+        "ring": bench_ring(frames, args.workers, args.capacity),
+        "mp_queue": bench_queue(frames, args.workers),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, r in report.items():
+            print(f"{name:9s} " + "  ".join(f"{k}={v:.0f}" if isinstance(v, float) else f"{k}={v}" for k, v in r.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numpy", "matplotlib", "pandas", "numba")
+
+# name -> (import statement, sys.path entries, import-time budget in ms above bare interpreter start,
+#          heavy modules that must not be loaded)
+TARGETS = {
+    "aeis_core": ("import aeis_core", ["app"], 60, HEAVY),
+    "transport_serial": ("import app.transport_serial", ["."], 150, HEAVY),
+    "gateway": ("import app.gateway", ["."], 200, HEAVY),
+    "live_serial_demo": ("import live_serial_demo", [".", "scripts"], 200, HEAVY),
+    "run_demo": ("import run_demo", ["app", "scripts"], 600, ("matplotlib", "pandas", "numba")),
+    "validation": ("import validation", ["app"], 600, ("matplotlib", "pandas", "numba")),
+}
+
+PROBE = (
+    "import sys, time\n"
+    "t0 = time.perf_counter()\n"
+    "{stmt}\n"
+    "dt = time.perf_counter() - t0\n"
+    "import json\n"
+    "print(json.dumps({{'import_ms': dt * 1e3, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))\n"
+)
+
+
+def _run(code: str, paths) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.join(ROOT, p) for p in paths))
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - t0
+    res = json.loads(out.stdout.strip().splitlines()[-1]) if out.stdout.strip() else {}
+    res["wall_ms"] = wall * 1e3
+    return res
+
+
+def bench(name: str, repeat: int) -> dict:
+    stmt, paths, budget, forbidden = TARGETS[name]
+    runs = [_run(PROBE.format(stmt=stmt, heavy=HEAVY), paths) for _ in range(repeat)]
+    import_ms = statistics.median(r["import_ms"] for r in runs)
+    bad = [m for m in runs[0]["loaded"] if m in forbidden]
+    return {
+        "import_ms": import_ms,
+        "wall_ms": statistics.median(r["wall_ms"] for r in runs),
+        "budget_ms": budget,
+        "heavy_loaded": runs[0]["loaded"],
+        "ok": import_ms <= budget and not bad,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold-start import time per entry point, against a budget")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", action="append", default=[])
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any target is over budget or loads a forbidden module")
+    args = ap.parse_args()
+
+    bare = statistics.median(_run("pass", [])["wall_ms"] for _ in range(args.repeat))
+    results = {}
+    for name in TARGETS:
+        if args.only and name not in args.only:
+            continue
+        r = results[name] = bench(name, args.repeat)
+        if not args.json:
+            flag = "ok" if r["ok"] else "OVER"
+            print(f"{name:18s} import {r['import_ms']:8.1f} ms  (budget {r['budget_ms']:4d})  "
+                  f"process {r['wall_ms']:7.1f} ms  heavy={','.join(r['heavy_loaded']) or '-'}  {flag}")
+    if args.json:
+        print(json.dumps({"interpreter_ms": bare, "results": results}, indent=2))
+    else:
+        print(f"{'(bare interpreter)':18s} process {bare:7.1f} ms")
+    if args.check and not all(r["ok"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
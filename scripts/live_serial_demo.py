@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import time
 from typing import Any
 
+from app.recorder import SessionRecorder
+from app.trace_writer import TraceWriter
 from app.transport_serial import SerialConfig, SerialJsonlTransport
 
 
@@ -26,14 +29,85 @@ def decide_action(msg: dict[str, Any]) -> dict[str, Any] | None:
     return None
 
 
+def format_message(msg: dict[str, Any]) -> str:
+    if msg.get("type") == "telemetry":
+        return (
+            f"<- ts={msg.get('ts_ms')} env={msg.get('env')} sys={msg.get('sys')} "
+            f"conf={msg.get('confidence')} mq2={msg.get('mq2')} dist={msg.get('dist_cm')} acc={msg.get('acc')} fan={msg.get('fan')}"
+        )
+    return f"<- {msg}"
+
+
+def port_prefix(port: str) -> str:
+    return "session-" + "".join(c if c.isalnum() else "_" for c in port).strip("_")
+
+
+async def run_async(ports: list[str], baud: int, json_only: int, record: str | None = None,
+                    trace: TraceWriter | None = None) -> None:
+    from app.transport_async import AsyncSerialHub
+
+    hub = AsyncSerialHub()
+    recorders = []
+    try:
+        for port in ports:
+            tr = await hub.add(SerialConfig(port=port, baud=baud))
+            if record:
+                tr.recorder = SessionRecorder(record, prefix=port_prefix(port))
+                recorders.append(tr.recorder)
+        await asyncio.sleep(2)
+
+        if json_only == 1:
+            for port in ports:
+                await hub.write(port, {"type": "cmd", "cmd": "json_only", "value": 1})
+                print(f"[{port}] -> sent cmd json_only=1")
+
+        print(f"Listening on {len(ports)} port(s)... Ctrl+C to stop")
+        last_cmd: dict[str, Any] = {}
+
+        while True:
+            port, msg = await hub.read()
+            print(f"[{port}] {format_message(msg)}")
+            if trace is not None:
+                trace.write({"port": port, **msg})
+
+            cmd = decide_action(msg)
+            if cmd and cmd != last_cmd.get(port):
+                await hub.write(port, cmd)
+                print(f"[{port}] ->", cmd)
+                last_cmd[port] = cmd
+                if trace is not None:
+                    trace.write({"port": port, "dir": "tx", **cmd})
+    finally:
+        await hub.close()
+        for rec in recorders:
+            rec.close()
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--port", required=True, help="e.g. /dev/cu.usbserial-XXXX")
+    ap.add_argument("--port", required=True, action="append", help="e.g. /dev/cu.usbserial-XXXX (repeat with --async_io 1)")
     ap.add_argument("--baud", type=int, default=115200)
     ap.add_argument("--json_only", type=int, default=1, help="1 = force ESP32 JSON-only mode")
+    ap.add_argument("--async_io", type=int, default=0, help="1 = asyncio transport, one event loop for all ports")
+    ap.add_argument("--record", default=None, help="directory to record raw serial traffic into (see replay_session.py)")
+    ap.add_argument("--trace", default=None, help="directory for compressed, rotating message/command traces")
     args = ap.parse_args()
 
-    tr = SerialJsonlTransport(SerialConfig(port=args.port, baud=args.baud))
+    trace = TraceWriter(args.trace) if args.trace else None
+
+    if args.async_io == 1:
+        try:
+            asyncio.run(run_async(args.port, args.baud, args.json_only, args.record, trace))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if trace is not None:
+                trace.close()
+        return
+
+    tr = SerialJsonlTransport(SerialConfig(port=args.port[0], baud=args.baud))
+    if args.record:
+        tr.recorder = SessionRecorder(args.record, prefix=port_prefix(args.port[0]))
     try:
         time.sleep(2)  
 
@@ -46,18 +120,15 @@ def main() -> None:
         last_cmd = None
 
         while True:
+            # blocks up to read_timeout_s only when nothing is pending, so no extra sleep here
             msg = tr.read_message()
             if not msg:
                 continue
 
     
-            if msg.get("type") == "telemetry":
-                print(
-                    f"<- ts={msg.get('ts_ms')} env={msg.get('env')} sys={msg.get('sys')} "
-                    f"conf={msg.get('confidence')} mq2={msg.get('mq2')} dist={msg.get('dist_cm')} acc={msg.get('acc')} fan={msg.get('fan')}"
-                )
-            else:
-                print("<-", msg)
+            print(format_message(msg))
+            if trace is not None:
+                trace.write({"port": args.port[0], **msg})
 
             cmd = decide_action(msg)
             if cmd:
@@ -66,11 +137,15 @@ def main() -> None:
                     tr.write_message(cmd)
                     print("->", cmd)
                     last_cmd = cmd
-
-            time.sleep(0.01)
+                    if trace is not None:
+                        trace.write({"port": args.port[0], "dir": "tx", **cmd})
 
     finally:
         tr.close()
+        if tr.recorder is not None:
+            tr.recorder.close()
+        if trace is not None:
+            trace.close()
 
 
 if __name__ == "__main__":
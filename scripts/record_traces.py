@@ -0,0 +1,46 @@
+import argparse
+import os
+import time
+
+from scenarios import all_scenario_arrays
+from store import ColumnStore, record_run, trace_metrics, envelope
+
+
+def plot_store(store: ColumnStore, out_path: str, columns=("effective_risk", "confidence")) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(columns), 1, sharex=True, figsize=(10, 2.5 * len(columns)))
+    for ax, name in zip(axes, columns):
+        x, lo, hi = envelope(store[name])
+        ax.fill_between(x, lo, hi, step="post", linewidth=0.5)
+        ax.set_ylabel(name)
+    axes[-1].set_xlabel("time step")
+    fig.suptitle(store.attrs.get("scenario", store.path))
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=160)
+    plt.close(fig)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Record scenario sensor streams and AEIS traces to a columnar store")
+    ap.add_argument("--steps", type=int, default=1_000_000)
+    ap.add_argument("--out", default="traces")
+    ap.add_argument("--chunk", type=int, default=1 << 16)
+    ap.add_argument("--plot", type=int, default=0, help="1 = save a min/max envelope plot per scenario")
+    args = ap.parse_args()
+
+    for name, arrays, hazard_truth in all_scenario_arrays(steps=args.steps):
+        path = os.path.join(args.out, name)
+        t0 = time.perf_counter()
+        record_run(path, arrays, hazard_truth, chunk=args.chunk, attrs={"scenario": name, "steps": args.steps})
+        dt = time.perf_counter() - t0
+        store = ColumnStore(path)
+        print(f"{name:24s} {len(store)} steps in {dt:.2f}s -> {path}  {trace_metrics(store)}")
+        if args.plot:
+            plot_store(store, os.path.join(path, "trace.png"))
+
+
+if __name__ == "__main__":
+    main()
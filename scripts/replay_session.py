@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Any
+
+from app.aeis_core import AEISCore, AEISConfig, STATES
+from app.gateway import telemetry_sample
+from app.recorder import REC_RX, REC_PROTO, iter_records, session_files
+from app.transport_serial import ENV_CODES, PROTO_BINARY, BinaryFramer, LineFramer
+
+
+def recording_paths(path: str, prefix: str) -> list[str]:
+    return session_files(path, prefix) if os.path.isdir(path) else [path]
+
+
+def paced(records, speed: float):
+    """Yield records on the recorded schedule scaled by `speed` (0 = as fast as possible)."""
+    t0_rec = t0_wall = None
+    for rec in records:
+        if speed > 0:
+            t_ns = rec[1]
+            if t0_rec is None:
+                t0_rec, t0_wall = t_ns, time.perf_counter()
+            delay = (t_ns - t0_rec) / 1e9 / speed - (time.perf_counter() - t0_wall)
+            if delay > 0:
+                time.sleep(delay)
+        yield rec
+
+
+def replay_core(paths: list[str], speed: float, cfg: AEISConfig, temp_c: float, tilt_deg: float,
+                show: int) -> dict[str, Any]:
+    core = AEISCore(cfg)
+    framer = LineFramer()
+    msgs = telemetry = diverged = errors = 0
+    t0 = time.perf_counter()
+    for kind, _, payload in paced(iter_records(paths), speed):
+        if kind == REC_PROTO:
+            errors += framer.decode_errors + framer.overflows
+            framer = BinaryFramer() if payload.decode("ascii") == PROTO_BINARY else LineFramer()
+            continue
+        if kind != REC_RX:
+            continue
+        for msg in framer.feed(payload):
+            msgs += 1
+            if msg.get("type") != "telemetry":
+                continue
+            out = core.step_lean(*telemetry_sample(msg, temp_c, tilt_deg), t=telemetry)
+            telemetry += 1
+            env = msg.get("env")
+            if env in ENV_CODES and ENV_CODES.index(env) != out.state:
+                diverged += 1
+                if diverged <= show:
+                    print(f"diverged ts={msg.get('ts_ms')} device={env} aeis={STATES[out.state]} "
+                          f"risk={out.effective_risk:.3f} conf={out.confidence:.2f}")
+    dt = time.perf_counter() - t0
+    errors += framer.decode_errors + framer.overflows
+    return {
+        "messages": msgs,
+        "telemetry": telemetry,
+        "decode_errors": errors,
+        "divergences": diverged,
+        "divergence_rate": diverged / telemetry if telemetry else 0.0,
+        "wall_s": dt,
+        "msgs_per_s": msgs / dt if dt > 0 else 0.0,
+    }
+
+
+def replay_port(paths: list[str], speed: float, port: str, baud: int) -> dict[str, Any]:
+    """Write the recorded device->host bytes to a serial port (pty, loop://, USB adapter)."""
+    import serial
+
+    ser = serial.serial_for_url(port, baudrate=baud)
+    n = nbytes = 0
+    t0 = time.perf_counter()
+    try:
+        for kind, _, payload in paced(iter_records(paths), speed):
+            if kind == REC_RX:
+                ser.write(payload)
+                n += 1
+                nbytes += len(payload)
+        ser.flush()
+    finally:
+        ser.close()
+    dt = time.perf_counter() - t0
+    return {"chunks": n, "bytes": nbytes, "wall_s": dt, "bytes_per_s": nbytes / dt if dt > 0 else 0.0}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Replay a recorded serial session")
+    ap.add_argument("recording", help="session directory or a single .rec file")
+    ap.add_argument("--prefix", default="session")
+    ap.add_argument("--speed", type=float, default=0.0, help="0 = max speed, 1 = real time, 10 = 10x")
+    ap.add_argument("--port", default=None, help="replay into this serial port instead of AEISCore")
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--temp_c", type=float, default=24.0, help="temperature used when telemetry has none")
+    ap.add_argument("--tilt_deg", type=float, default=2.0, help="tilt used when telemetry has none")
+    ap.add_argument("--show", type=int, default=10, help="print the first N divergences")
+    args = ap.parse_args()
+
+    paths = recording_paths(args.recording, args.prefix)
+    if not paths:
+        raise SystemExit(f"No recordings found in {args.recording}")
+    if args.port:
+        stats = replay_port(paths, args.speed, args.port, args.baud)
+    else:
+        stats = replay_core(paths, args.speed, AEISConfig(), args.temp_c, args.tilt_deg, args.show)
+    for k, v in stats.items():
+        print(f"{k:16s}: {v:.3f}" if isinstance(v, float) else f"{k:16s}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from aeis_core import AEISCore, AEISConfig, Deadband
+from scenarios import all_scenarios, all_scenario_arrays
+from transport_serial import LineFramer, encode_jsonl, decode_jsonl_line
+from validation import iter_runs
+from kernel import HAVE_NUMBA, run_series
+
+SAMPLE = {"t": 0, "temp_c": 24.0, "mq2_adc": 520.0, "dist_cm": 130.0, "tilt_deg": 2.0, "vib": 0.05}
+TELEMETRY = {
+    "type": "telemetry", "ts_ms": 123456, "env": "NORMAL", "sys": "OK", "confidence": 0.97,
+    "mq2": 612, "dist_cm": 118.4, "acc": 0.08, "fan": 0,
+}
+
+
+def _stream(steps: int):
+    return [p for _, data, _ in all_scenarios(steps=steps) for p in data]
+
+
+def bench_step_latency(n: int) -> dict:
+    data = _stream(n // 3 + 1)[:n]
+    core = AEISCore(AEISConfig())
+    lat = np.empty(len(data))
+    clock = time.perf_counter_ns
+    for i, p in enumerate(data):
+        t0 = clock()
+        core.step(p)
+        lat[i] = clock() - t0
+    return {
+        "steps": len(data),
+        "p50_us": float(np.percentile(lat, 50)) / 1e3,
+        "p99_us": float(np.percentile(lat, 99)) / 1e3,
+        "max_us": float(lat.max()) / 1e3,
+    }
+
+
+def bench_step_throughput(n: int) -> dict:
+    data = _stream(n // 3 + 1)[:n]
+    core = AEISCore(AEISConfig())
+    t0 = time.perf_counter()
+    for p in data:
+        core.step(p)
+    dt = time.perf_counter() - t0
+    return {"steps": len(data), "steps_per_s": len(data) / dt}
+
+
+def bench_step_deadband(n: int) -> dict:
+    rng = np.random.default_rng(0)
+    # steady state: sensor noise around a fixed operating point
+    noise = zip(24.0 + rng.normal(0, 0.05, n), 520.0 + rng.normal(0, 4.0, n), 130.0 + rng.normal(0, 0.3, n),
+                2.0 + rng.normal(0, 0.05, n), 0.05 + rng.normal(0, 0.005, n))
+    data = [tuple(map(float, s)) for s in noise]
+    core = AEISCore(AEISConfig())
+    stats = core.enable_deadband(Deadband())
+    t0 = time.perf_counter()
+    for i, s in enumerate(data):
+        core.step_lean(*s, i)
+    dt = time.perf_counter() - t0
+    return {"steps": n, "steps_per_s": n / dt, "fast_ratio": stats.snapshot()["fast_ratio"]}
+
+
+def bench_run_batch(n: int) -> dict:
+    data = _stream(n // 3 + 1)[:n]
+    arrays = {k: np.array([p[k] for p in data]) for k in SAMPLE}
+    t0 = time.perf_counter()
+    AEISCore(AEISConfig()).run_batch(arrays)
+    dt = time.perf_counter() - t0
+    return {"steps": len(data), "steps_per_s": len(data) / dt}
+
+
+def bench_kernel(n: int) -> dict:
+    data = _stream(n // 3 + 1)[:n]
+    arrays = {k: np.array([p[k] for p in data]) for k in SAMPLE}
+    if HAVE_NUMBA:
+        run_series(AEISCore(AEISConfig()), {k: v[:10] for k, v in arrays.items()})  # compile outside the timing
+    t0 = time.perf_counter()
+    run_series(AEISCore(AEISConfig()), arrays)
+    dt = time.perf_counter() - t0
+    return {"steps": len(data), "steps_per_s": len(data) / dt, "compiled": float(HAVE_NUMBA)}
+
+
+def bench_memory_growth(n: int) -> dict:
+    core = AEISCore(AEISConfig())
+    warmup = 10_000
+    for i in range(warmup):
+        core.step(SAMPLE)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(n - warmup):
+        core.step(SAMPLE)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"steps": n, "growth_bytes": after - before, "peak_bytes": peak - before}
+
+
+def bench_scenarios(steps: int) -> dict:
+    t0 = time.perf_counter()
+    all_scenarios(steps=steps)
+    dt = time.perf_counter() - t0
+    return {"steps": 3 * steps, "steps_per_s": 3 * steps / dt}
+
+
+def bench_scenario_arrays(steps: int) -> dict:
+    t0 = time.perf_counter()
+    all_scenario_arrays(steps=steps)
+    dt = time.perf_counter() - t0
+    return {"steps": 3 * steps, "steps_per_s": 3 * steps / dt}
+
+
+def bench_jsonl(n: int) -> dict:
+    t0 = time.perf_counter()
+    lines = [encode_jsonl(TELEMETRY) for _ in range(n)]
+    t1 = time.perf_counter()
+    for line in lines:
+        decode_jsonl_line(line)
+    t2 = time.perf_counter()
+    blob = b"".join(lines)
+    framer = LineFramer()
+    for i in range(0, len(blob), 4096):
+        framer.feed(blob[i:i + 4096])
+    t3 = time.perf_counter()
+    return {
+        "messages": n,
+        "encode_per_s": n / (t1 - t0),
+        "decode_line_per_s": n / (t2 - t1),
+        "framer_decode_per_s": n / (t3 - t2),
+    }
+
+
+def bench_validation(runs: int) -> dict:
+    t0 = time.perf_counter()
+    for _ in iter_runs(runs=runs, workers=1):
+        pass
+    dt = time.perf_counter() - t0
+    return {"runs": runs, "wall_s": dt, "runs_per_s": runs / dt}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(old: dict, new: dict) -> None:
+    for name, metrics in new["results"].items():
+        base = old.get("results", {}).get(name, {})
+        for k, v in metrics.items():
+            if k in base and base[k]:
+                print(f"{name:18s} {k:22s} {base[k]:14.3f} -> {v:14.3f}  ({v / base[k]:6.2f}x)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quick", action="store_true", help="smaller sizes for a smoke run")
+    ap.add_argument("--only", action="append", default=[], help="run only these benchmarks (repeatable)")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = ap.parse_args()
+
+    scale = 10 if args.quick else 1
+    benches = {
+        "step_latency": lambda: bench_step_latency(100_000 // scale),
+        "step_throughput": lambda: bench_step_throughput(300_000 // scale),
+        "step_deadband": lambda: bench_step_deadband(300_000 // scale),
+        "run_batch": lambda: bench_run_batch(300_000 // scale),
+        "kernel": lambda: bench_kernel(300_000 // scale),
+        "memory_growth": lambda: bench_memory_growth(1_000_000 // scale),
+        "scenarios": lambda: bench_scenarios(100_000 // scale),
+        "scenario_arrays": lambda: bench_scenario_arrays(1_000_000 // scale),
+        "jsonl": lambda: bench_jsonl(200_000 // scale),
+        "validation": lambda: bench_validation(800 // scale),
+    }
+
+    results = {}
+    for name, fn in benches.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = fn()
+        print(f"{name:18s} {results[name]}")
+
+    report = {
+        "meta": {
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved: {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
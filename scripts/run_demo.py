@@ -1,47 +1,16 @@
+import argparse
 import os
 import csv
-import matplotlib.pyplot as plt
 
 from aeis_core import AEISCore, AEISConfig
 from scenarios import all_scenarios
-
-
-def state_to_num(s: str) -> int:
-    return {"NORMAL": 0, "CAUTION": 1, "CRITICAL": 2}.get(s, 0)
+from metrics import compute_metrics
 
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def save_plot(fig, out_path: str) -> None:
-    fig.savefig(out_path, dpi=220, bbox_inches="tight")
-
-
-def plot_one(title: str, x, y, ylabel: str):
-    fig = plt.figure()
-    plt.plot(x, y)
-    plt.title(title)
-    plt.xlabel("time step")
-    plt.ylabel(ylabel)
-    plt.tight_layout()
-    return fig
-
-
-def compute_metrics(hazard_truth, states_num):
-    false_alarms = sum(1 for i in range(len(states_num)) if states_num[i] >= 1 and hazard_truth[i] == 0)
-    missed_hazards = sum(1 for i in range(len(states_num)) if hazard_truth[i] == 1 and states_num[i] == 0)
-
-    start = next((i for i, h in enumerate(hazard_truth) if h == 1), None)
-    if start is None:
-        rt = ""
-    else:
-        rt_val = next((j - start for j in range(start, len(states_num)) if states_num[j] >= 1), None)
-        rt = rt_val if rt_val is not None else ""
-
-    return {"false_alarms": false_alarms, "missed_hazards": missed_hazards, "reaction_time_steps": rt}
-
-
 def export_csv_metrics(out_path: str, base_metrics: dict, aeis_metrics: dict):
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -58,7 +27,7 @@ def export_csv_events(out_path: str, events_log):
             w.writerow([e["t"], "|".join(e["events"]), e["baseline_state"], e["aeis_state"]])
 
 
-def run_single_scenario(name, data, hazard_truth, base_out_dir="results"):
+def run_single_scenario(name, data, hazard_truth, base_out_dir="results", figures=True):
     cfg = AEISConfig()
     aeis = AEISCore(cfg)
 
@@ -85,80 +54,66 @@ def run_single_scenario(name, data, hazard_truth, base_out_dir="results"):
     events_log = []
 
     for p in data:
-        out = aeis.step(p)
+        out = aeis.step_lean(p["temp_c"], p["mq2_adc"], p["dist_cm"], p["tilt_deg"], p["vib"], p["t"])
 
-        conf.append(out["confidence"])
-        raw_r.append(out["raw_risk"])
-        cur_r.append(out["current_risk"])
-        fcast_r.append(out["forecast_risk"])
-        eff_r.append(out["effective_risk"])
+        conf.append(out.confidence)
+        raw_r.append(out.raw_risk)
+        cur_r.append(out.current_risk)
+        fcast_r.append(out.forecast_risk)
+        eff_r.append(out.effective_risk)
 
-        base_state_num.append(state_to_num(out["baseline_state"]))
-        aeis_state_num.append(state_to_num(out["aeis_state"]))
+        base_state_num.append(out.baseline)
+        aeis_state_num.append(out.state)
 
-        if out["events"]:
+        if out.events:
             events_log.append({
-                "t": out["t"],
-                "events": out["events"],
-                "baseline_state": out["baseline_state"],
-                "aeis_state": out["aeis_state"],
+                "t": out.t,
+                "events": out.event_strings(),
+                "baseline_state": out.baseline_state,
+                "aeis_state": out.aeis_state,
             })
 
-        f = out["factors"]
-        gas_r.append(f["gas_r"])
-        temp_r.append(f["temp_r"])
-        dist_r.append(f["dist_r"])
-        tilt_r.append(f["tilt_r"])
-        vib_r.append(f["vib_r"])
+        gas_r.append(out.gas_r)
+        temp_r.append(out.temp_r)
+        dist_r.append(out.dist_r)
+        tilt_r.append(out.tilt_r)
+        vib_r.append(out.vib_r)
 
     figs = []
+    if figures:
+        from render import figure_spec
     
-    figs.append(("sensor_dht22_temp.png", plot_one(f"[{name}] DHT22 Temperature (°C)", t, temp_c, "°C")))
-    figs.append(("sensor_dht22_humidity.png", plot_one(f"[{name}] DHT22 Humidity (%)", t, hum_pct, "%")))
-    figs.append(("sensor_bmp280_pressure.png", plot_one(f"[{name}] BMP280 Pressure (hPa)", t, press_hpa, "hPa")))
-    figs.append(("sensor_bmp280_altitude.png", plot_one(f"[{name}] BMP280 Altitude (m)", t, alt_m, "m")))
-    figs.append(("sensor_mq2_gas.png", plot_one(f"[{name}] MQ2 Gas Level", t, mq2_adc, "ADC units")))
-    figs.append(("sensor_hcsr04_distance.png", plot_one(f"[{name}] HC-SR04 Distance (cm)", t, dist_cm, "cm")))
-    figs.append(("sensor_mpu6050_tilt.png", plot_one(f"[{name}] MPU6050 Tilt (deg)", t, tilt_deg, "deg")))
-    figs.append(("sensor_mpu6050_vibration.png", plot_one(f"[{name}] MPU6050 Vibration", t, vib, "a.u.")))
+        figs.append(("sensor_dht22_temp.png", figure_spec(f"[{name}] DHT22 Temperature (°C)", t, temp_c, "°C")))
+        figs.append(("sensor_dht22_humidity.png", figure_spec(f"[{name}] DHT22 Humidity (%)", t, hum_pct, "%")))
+        figs.append(("sensor_bmp280_pressure.png", figure_spec(f"[{name}] BMP280 Pressure (hPa)", t, press_hpa, "hPa")))
+        figs.append(("sensor_bmp280_altitude.png", figure_spec(f"[{name}] BMP280 Altitude (m)", t, alt_m, "m")))
+        figs.append(("sensor_mq2_gas.png", figure_spec(f"[{name}] MQ2 Gas Level", t, mq2_adc, "ADC units")))
+        figs.append(("sensor_hcsr04_distance.png", figure_spec(f"[{name}] HC-SR04 Distance (cm)", t, dist_cm, "cm")))
+        figs.append(("sensor_mpu6050_tilt.png", figure_spec(f"[{name}] MPU6050 Tilt (deg)", t, tilt_deg, "deg")))
+        figs.append(("sensor_mpu6050_vibration.png", figure_spec(f"[{name}] MPU6050 Vibration", t, vib, "a.u.")))
 
     
-    figs.append(("factor_gas_risk.png", plot_one(f"[{name}] Risk factor: Gas", t, gas_r, "risk")))
-    figs.append(("factor_temp_risk.png", plot_one(f"[{name}] Risk factor: Temperature", t, temp_r, "risk")))
-    figs.append(("factor_distance_risk.png", plot_one(f"[{name}] Risk factor: Distance", t, dist_r, "risk")))
-    figs.append(("factor_tilt_risk.png", plot_one(f"[{name}] Risk factor: Tilt", t, tilt_r, "risk")))
-    figs.append(("factor_vibration_risk.png", plot_one(f"[{name}] Risk factor: Vibration", t, vib_r, "risk")))
+        figs.append(("factor_gas_risk.png", figure_spec(f"[{name}] Risk factor: Gas", t, gas_r, "risk")))
+        figs.append(("factor_temp_risk.png", figure_spec(f"[{name}] Risk factor: Temperature", t, temp_r, "risk")))
+        figs.append(("factor_distance_risk.png", figure_spec(f"[{name}] Risk factor: Distance", t, dist_r, "risk")))
+        figs.append(("factor_tilt_risk.png", figure_spec(f"[{name}] Risk factor: Tilt", t, tilt_r, "risk")))
+        figs.append(("factor_vibration_risk.png", figure_spec(f"[{name}] Risk factor: Vibration", t, vib_r, "risk")))
 
     
-    fig = plt.figure()
-    plt.plot(t, conf, label="confidence")
-    plt.plot(t, cur_r, label="current risk")
-    plt.plot(t, fcast_r, label="forecast risk")
-    plt.plot(t, eff_r, label="effective risk")
-    plt.title(f"[{name}] AEIS: Confidence and Risk")
-    plt.xlabel("time step")
-    plt.ylabel("0..1")
-    plt.legend()
-    plt.tight_layout()
-    figs.append(("aeis_confidence_risk.png", fig))
+        figs.append(("aeis_confidence_risk.png", figure_spec(f"[{name}] AEIS: Confidence and Risk", t, [
+            ("confidence", conf),
+            ("current risk", cur_r),
+            ("forecast risk", fcast_r),
+            ("effective risk", eff_r),
+        ], "0..1")))
 
   
-    fig = plt.figure()
-    plt.plot(t, base_state_num, label="Baseline")
-    plt.plot(t, aeis_state_num, label="AEIS")
-    hazard_line = [2 if h == 1 else 0 for h in hazard_truth]
-    plt.plot(t, hazard_line, label="Hazard truth (scaled)")
-    plt.yticks([0, 1, 2], ["NORMAL", "CAUTION", "CRITICAL"])
-    plt.title(f"[{name}] States: Baseline vs AEIS")
-    plt.xlabel("time step")
-    plt.ylabel("state")
-    plt.legend()
-    plt.tight_layout()
-    figs.append(("states_baseline_vs_aeis.png", fig))
-
-    
-    for fn, fig in figs:
-        save_plot(fig, os.path.join(fig_dir, fn))
+        hazard_line = [2 if h == 1 else 0 for h in hazard_truth]
+        figs.append(("states_baseline_vs_aeis.png", figure_spec(f"[{name}] States: Baseline vs AEIS", t, [
+            ("Baseline", base_state_num),
+            ("AEIS", aeis_state_num),
+            ("Hazard truth (scaled)", hazard_line),
+        ], "state", yticks=([0, 1, 2], ["NORMAL", "CAUTION", "CRITICAL"]))))
 
     
     base_metrics = compute_metrics(hazard_truth, base_state_num)
@@ -167,15 +122,13 @@ def run_single_scenario(name, data, hazard_truth, base_out_dir="results"):
     export_csv_metrics(os.path.join(out_dir, "metrics.csv"), base_metrics, aeis_metrics)
     export_csv_events(os.path.join(out_dir, "events.csv"), events_log)
 
-    
-    plt.close("all")
-
-    return {
+    row = {
         "scenario": name,
         **{f"baseline_{k}": v for k, v in base_metrics.items()},
         **{f"aeis_{k}": v for k, v in aeis_metrics.items()},
         "outputs_dir": out_dir
     }
+    return row, fig_dir, figs
 
 
 def write_summary(summary_rows, out_path="results/summary_metrics.csv"):
@@ -194,13 +147,30 @@ def write_summary(summary_rows, out_path="results/summary_metrics.csv"):
 
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=0, help="figure rendering processes, 0 = one per CPU")
+    ap.add_argument("--panel", type=int, default=0, help="1 = one multi-panel overview.png per scenario")
+    ap.add_argument("--figures", type=int, default=1, help="0 = metrics and events only, skip plotting entirely")
+    ap.add_argument("--force", type=int, default=0, help="1 = re-render figures even if their inputs are unchanged")
+    args = ap.parse_args()
+
     scenarios = all_scenarios(steps=300)
     summary = []
+    figures = {}
 
     for (name, data, hazard_truth) in scenarios:
-        row = run_single_scenario(name, data, hazard_truth)
+        row, fig_dir, figs = run_single_scenario(name, data, hazard_truth, figures=bool(args.figures))
         summary.append(row)
-        print(f"[DONE] {name} -> {row['outputs_dir']}")
+        figures[fig_dir] = figs
+
+    if args.figures:
+        from render import render_all
+
+        stats = render_all(figures, workers=args.workers or None, panel=bool(args.panel), force=bool(args.force))
+    for row in summary:
+        print(f"[DONE] {row['scenario']} -> {row['outputs_dir']}")
+    if args.figures:
+        print(f"Figures: {stats['rendered']} rendered, {stats['skipped']} unchanged")
 
     write_summary(summary)
     print("\n=== ALL SCENARIOS COMPLETED ===")
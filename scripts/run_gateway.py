@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.aeis_core import Deadband
+from app.gateway import Gateway
+from app.trace_writer import TraceWriter
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="AEIS gateway: many serial devices, one core per device")
+    ap.add_argument("--port", required=True, action="append", help="serial device (repeatable)")
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--queue_size", type=int, default=1024)
+    ap.add_argument("--json_only", type=int, default=1, help="1 = force ESP32 JSON-only mode")
+    ap.add_argument("--deadband", type=int, default=0, help="1 = change-driven evaluation with default deadbands")
+    ap.add_argument("--max_skip", type=int, default=10, help="with --deadband 1: longest run of fast-path ticks")
+    ap.add_argument("--trace", default=None, help="directory for compressed, rotating step/command traces")
+    ap.add_argument("--stats_s", type=float, default=5.0, help="print per-device counters every N seconds")
+    args = ap.parse_args()
+
+    deadband = Deadband(max_skip=args.max_skip) if args.deadband else None
+    trace = TraceWriter(args.trace) if args.trace else None
+    gw = Gateway(workers=args.workers, queue_size=args.queue_size, deadband=deadband, trace=trace)
+    for port in args.port:
+        gw.add_device(port, args.baud)
+    gw.start()
+    try:
+        time.sleep(2)
+        if args.json_only == 1:
+            for port in args.port:
+                gw.send(port, {"type": "cmd", "cmd": "json_only", "value": 1})
+        print(f"Gateway running: {len(args.port)} device(s), {args.workers} worker(s)... Ctrl+C to stop")
+        while True:
+            time.sleep(args.stats_s)
+            snap = gw.snapshot()
+            for port, st in snap["devices"].items():
+                lat = st["latency"]
+                print(f"[{port}] rx={st['received']} drop={st['dropped']} q={st['queue_depth']} "
+                      f"cmd={st['commands']} err={st['read_errors']}/{st['write_errors']} p50={lat['p50_us']:.0f}us p99={lat['p99_us']:.0f}us"
+                      + (f" fast={st['deadband']['fast_ratio']:.0%}" if st["deadband"] else ""))
+            print(json.dumps({k: snap[k] for k in ("shard_depth", "pending_commands", "trace")}))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gw.stop()
+        if trace is not None:
+            trace.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+
+from sweep import field_type, grid_space, random_space, build_workload, run_sweep, write_table
+
+
+def parse_grid(specs):
+    space = {}
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        kind = field_type(name)
+        space[name] = [kind(v) for v in values.split(",")]
+    return space
+
+
+def parse_random(specs):
+    space = {}
+    for spec in specs:
+        name, rng = spec.split("=", 1)
+        kind = field_type(name)
+        lo, hi = rng.split(":", 1)
+        space[name] = (kind(lo), kind(hi))
+    return space
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--grid", action="append", default=[], help="field=v1,v2,... (repeatable)")
+    ap.add_argument("--random", action="append", default=[], help="field=lo:hi (repeatable)")
+    ap.add_argument("--samples", type=int, default=50, help="candidates for --random")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--val_runs", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    ap.add_argument("--out", default="sweep_results.csv")
+    args = ap.parse_args()
+
+    if args.random:
+        candidates = random_space(parse_random(args.random), args.samples, args.seed)
+    else:
+        candidates = grid_space(parse_grid(args.grid or ["caution_risk=0.38,0.42,0.46", "critical_risk=0.64,0.68,0.72"]))
+
+    workload = build_workload(val_runs=args.val_runs)
+    rows = run_sweep(candidates, workload, workers=args.workers or None)
+    write_table(rows, args.out)
+
+    print(f"{len(rows)} candidates -> {args.out}")
+    for r in rows[:5]:
+        params = {k: v for k, v in r.items() if k in candidates[0]}
+        print(f"#{r['rank']} {params} FN={r['val_false_negative_rate']:.1%} FP={r['val_false_positive_rate']:.1%} "
+              f"missed={r['scen_missed_hazards']} false_alarms={r['scen_false_alarms']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.device_sim import DeviceFarm
+from app.gateway import Gateway
+from app.transport_serial import SerialConfig, SerialJsonlTransport
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Simulated ESP32 device farm on pseudo-terminals")
+    ap.add_argument("--devices", type=int, default=32)
+    ap.add_argument("--rate", type=float, default=20.0, help="telemetry messages per second per device")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds of load (with --host 1)")
+    ap.add_argument("--json_only", type=int, default=1, help="0 = devices interleave debug text lines")
+    ap.add_argument("--host", type=int, default=1, help="1 = run the gateway against the farm, 0 = only serve ports")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = ap.parse_args()
+
+    farm = DeviceFarm(args.devices, args.rate, json_only=args.json_only)
+    farm.start()
+    try:
+        if not args.host:
+            print("\n".join(farm.ports))
+            print("Serving... Ctrl+C to stop")
+            while True:
+                time.sleep(1)
+
+        gw = Gateway(workers=args.workers)
+        for port in farm.ports:
+            gw.add_device(port, transport=SerialJsonlTransport(SerialConfig(port=port, read_timeout_s=0.1)))
+        gw.start()
+        t0 = time.perf_counter()
+        time.sleep(args.duration)
+        farm.stop()
+        time.sleep(0.5)  # let in-flight frames drain
+        dt = time.perf_counter() - t0
+        snap = gw.snapshot()
+        gw.stop()
+    except KeyboardInterrupt:
+        return
+    finally:
+        farm.close()
+
+    devs = snap["devices"].values()
+    fs = farm.snapshot()
+    received = sum(d["received"] for d in devs)
+    rtts = [d["rtt"] for d in devs if d["rtt"]["count"]]
+    lat = [d["latency"] for d in devs if d["latency"]["count"]]
+    report = {
+        "devices": args.devices,
+        "duration_s": dt,
+        "device_sent": fs["sent"],
+        "device_dropped": fs["dropped"],
+        "host_received": received,
+        "host_dropped": sum(d["dropped"] for d in devs),
+        "decode_errors": sum(d["decode_errors"] for d in devs),
+        "loss_rate": 1.0 - received / (fs["sent"] + fs["dropped"]) if fs["sent"] else 0.0,
+        "msgs_per_s": received / dt,
+        "commands": sum(d["commands"] for d in devs),
+        "decision_p99_us": max((x["p99_us"] for x in lat), default=0.0),
+        "rtt_count": sum(x["count"] for x in rtts),
+        "rtt_p50_ms": sorted(x["p50_us"] for x in rtts)[len(rtts) // 2] / 1e3 if rtts else 0.0,
+        "rtt_max_ms": max((x["max_us"] for x in rtts), default=0.0) / 1e3,
+        "link_lat_p99_ms": max((d["link"]["latency"]["p99_us"] for d in devs), default=0.0) / 1e3,
+        "write_stalls": sum(d["link"]["write_stalls"] for d in devs),
+        "empty_reads": sum(d["link"]["empty_reads"] for d in devs),
+        "late_emits": fs["late"],
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for k, v in report.items():
+            print(f"{k:16s}: {v:.3f}" if isinstance(v, float) else f"{k:16s}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# app/ modules use two import styles: flat (`from aeis_core import ...`) and package (`from app.x import ...`)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "app")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from aeis_core import EV_FORECAST_ESCALATION, AEISConfig, AEISCore, Deadband, state_dtype
+from checkpoint import pack_cores
+
+
+def test_stats_cover_deadband_fast_path():
+    core = AEISCore(AEISConfig())
+    stats = core.enable_stats()
+    db = core.enable_deadband(Deadband(mq2_adc=60.0))
+    # gas ramps inside the band: most ticks take the fast path while the trend escalates
+    results = [core.step_lean(24.0, 500.0 + 25.0 * i, 130.0, 2.0, 0.05, i) for i in range(120)]
+
+    snap = stats.snapshot()
+    c = snap["counters"]
+    assert db.fast > db.full > 0
+    assert c["steps"] == snap["step"]["count"] == len(results)
+    assert c["fast_steps"] == snap["fast"]["count"] == db.fast
+    assert snap["stages"]["normalize"]["count"] == db.full
+    escalations = sum(1 for r in results if r.events & EV_FORECAST_ESCALATION)
+    assert c["forecast_escalations"] == escalations > db.full
+
+
+def test_state_record_rejects_windows_that_do_not_fit():
+    assert state_dtype(0xFFFF)["head"] == np.dtype("<u2")
+    with pytest.raises(ValueError):
+        state_dtype(0x10000)
+    core = AEISCore(AEISConfig(trend_window=70000))
+    with pytest.raises(ValueError):
+        core.get_state()
+    with pytest.raises(ValueError):
+        pack_cores([core])
+
+
+def test_state_round_trip_at_the_largest_window():
+    cfg = AEISConfig(trend_window=0xFFFF)
+    core = AEISCore(cfg)
+    core.trend.head, core.trend.count = 0xFFFE, 0xFFFF
+    restored = AEISCore(cfg)
+    restored.set_state(core.get_state())
+    assert (restored.trend.head, restored.trend.count) == (0xFFFE, 0xFFFF)
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from app.device_sim import DeviceFarm
+from app.gateway import Gateway
+from app.trace_writer import TraceWriter, iter_traces, trace_files
+from app.transport_serial import SerialConfig, SerialJsonlTransport
+
+
+def _wait_until(cond, timeout_s=5.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.mark.parametrize("json_only", [1, 0])
+def test_gateway_against_device_farm(json_only):
+    farm = DeviceFarm(4, rate_hz=50.0, json_only=json_only)
+    gw = Gateway(workers=2, flush_interval_s=0.01)
+    try:
+        for port in farm.ports:
+            gw.add_device(port, transport=SerialJsonlTransport(SerialConfig(port=port, read_timeout_s=0.05)))
+        gw.start()
+        farm.start()
+        time.sleep(1.5)
+        farm.stop()
+        sims = {d.port: d for d in farm.devices}
+        assert _wait_until(lambda: all(s["received"] == sims[p].sent and s["queue_depth"] == 0
+                                       for p, s in gw.snapshot()["devices"].items()))
+        # commands still in flight reach the devices
+        assert _wait_until(lambda: all(s["commands"] == sims[p].commands
+                                       for p, s in gw.snapshot()["devices"].items()))
+        snap = gw.snapshot()
+    finally:
+        gw.stop()
+        farm.close()
+
+    for port, st in snap["devices"].items():
+        sim = sims[port]
+        assert sim.sent > 0 and sim.dropped == 0
+        assert st["received"] == sim.sent
+        assert st["processed"] == st["received"]
+        assert st["dropped"] == 0 and st["queue_depth"] == 0
+        assert st["latency"]["count"] == st["processed"]
+        assert st["commands"] >= 1 and st["write_batches"] >= 1
+        assert st["read_errors"] == 0 and st["write_errors"] == 0
+        # with json_only=0 every telemetry line is preceded by one debug text line
+        assert st["decode_errors"] == (0 if json_only else sim.sent)
+        assert st["link"]["rx_msgs"] == st["received"]
+    assert snap["pending_commands"] == 0
+
+
+def test_gateway_steps_cores_on_a_tick_counter(tmp_path):
+    farm = DeviceFarm(2, rate_hz=50.0)
+    trace = TraceWriter(str(tmp_path), flush_s=0.05)
+    gw = Gateway(workers=1, flush_interval_s=0.01, trace=trace)
+    try:
+        for port in farm.ports:
+            gw.add_device(port, transport=SerialJsonlTransport(SerialConfig(port=port, read_timeout_s=0.05)))
+        gw.start()
+        farm.start()
+        time.sleep(0.8)
+        farm.stop()
+        sims = {d.port: d for d in farm.devices}
+        assert _wait_until(lambda: all(s["processed"] == sims[p].sent for p, s in gw.snapshot()["devices"].items()))
+    finally:
+        gw.stop()
+        farm.close()
+        trace.close()
+
+    steps: dict[str, list] = {}
+    for rec in iter_traces(trace_files(str(tmp_path))):
+        if "state" in rec:
+            steps.setdefault(rec["device"], []).append((rec["t"], rec["ts_ms"]))
+    assert set(steps) == set(sims)
+    for port, seen in steps.items():
+        # t counts ticks like SimDevice and replay do; the device clock is kept alongside
+        assert [t for t, _ in seen] == list(range(sims[port].sent))
+        assert all(isinstance(ts, int) for _, ts in seen)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from aeis_core import EV_INCONSISTENT, AEISCore, AEISConfig, batch_event_masks
+from kernel import HAVE_NUMBA, run_grid, run_series
+
+KEYS = ("temp_c", "mq2_adc", "dist_cm", "tilt_deg", "vib")
+COLS = ("confidence", "conf_before", "raw_risk", "current_risk", "forecast_risk", "effective_risk", "aeis_state")
+
+
+def _arrays(n, seed):
+    rng = np.random.default_rng(seed)
+    # wide ranges so spikes, inconsistent sensors and all three states all occur
+    return {
+        "t": np.arange(n),
+        "temp_c": rng.uniform(0, 60, n),
+        "mq2_adc": rng.uniform(150, 2600, n),
+        "dist_cm": rng.uniform(0, 260, n),
+        "tilt_deg": rng.uniform(0, 25, n),
+        "vib": rng.uniform(0, 0.8, n),
+    }
+
+
+def _reference(cfg, arrays):
+    core = AEISCore(cfg)
+    rows = [core.step_lean(*(float(arrays[k][i]) for k in KEYS), int(arrays["t"][i])) for i in range(len(arrays["t"]))]
+    return {
+        "confidence": np.array([r.confidence for r in rows]),
+        "conf_before": np.array([r.conf_before for r in rows]),
+        "raw_risk": np.array([r.raw_risk for r in rows]),
+        "current_risk": np.array([r.current_risk for r in rows]),
+        "forecast_risk": np.array([r.forecast_risk for r in rows]),
+        "effective_risk": np.array([r.effective_risk for r in rows]),
+        "aeis_state": np.array([r.state for r in rows]),
+        "events": np.array([r.events for r in rows]),
+    }
+
+
+@pytest.mark.parametrize("window", [1, 12])
+@pytest.mark.parametrize("compiled", [False, True])
+def test_run_series_matches_step(window, compiled):
+    cfg = AEISConfig(trend_window=window)
+    arrays = _arrays(600, seed=window)
+    ref = _reference(cfg, arrays)
+    assert (ref["events"] & EV_INCONSISTENT).any()  # INCONSISTENT_SENSORS is exercised
+
+    core = AEISCore(cfg)
+    # chunked calls must carry state across exactly like consecutive step() calls
+    parts = [run_series(core, {k: v[a:b] for k, v in arrays.items()}, compiled=compiled)
+             for a, b in ((0, 1), (1, 250), (250, 251), (251, 600))]
+    out = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    for k in COLS:
+        np.testing.assert_array_equal(out[k], ref[k], err_msg=k)
+    np.testing.assert_array_equal(batch_event_masks(out), ref["events"])
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 7, 12])
+def test_run_batch_trend_state_matches_step(window):
+    # chunk ends fall mid-lap, on lap ends and inside the warm-up
+    cfg = AEISConfig(trend_window=window)
+    arrays = _arrays(400, seed=100 + window)
+    ref_core, core = AEISCore(cfg), AEISCore(cfg)
+    cuts = [0, 1, 2, 3, 5, 17, 24, 25, 60, 61, 200, 211, 400]
+    for a, b in zip(cuts, cuts[1:]):
+        res = core.run_batch({k: v[a:b] for k, v in arrays.items()})
+        ref = [ref_core.step_lean(*(float(arrays[k][i]) for k in KEYS), i) for i in range(a, b)]
+        np.testing.assert_array_equal(res["forecast_risk"], [r.forecast_risk for r in ref])
+        rt, tr = ref_core.trend, core.trend
+        assert (tr.buf, tr.head, tr.count, tr.last, tr.sum_y, tr.sum_xy) == \
+            (rt.buf, rt.head, rt.count, rt.last, rt.sum_y, rt.sum_xy)
+
+
+@pytest.mark.parametrize("window", [1, 12])
+@pytest.mark.parametrize("compiled", [False, True])
+def test_run_grid_matches_step(window, compiled):
+    cfg = AEISConfig(trend_window=window)
+    runs = [_arrays(300, seed=10 * window + r) for r in range(3)]
+    grid = {k: np.stack([r[k] for r in runs]) for k in KEYS}
+    out = run_grid(cfg, grid, compiled=compiled)
+    for r, arrays in enumerate(runs):
+        ref = _reference(cfg, arrays)
+        for k in COLS:
+            np.testing.assert_array_equal(out[k][r], ref[k], err_msg=f"run {r} {k}")
+        np.testing.assert_array_equal(batch_event_masks({k: v[r] for k, v in out.items()}), ref["events"])
+
+
+def test_kernel_flag_reports_numba():
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        assert not HAVE_NUMBA
+    else:
+        assert HAVE_NUMBA
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from metrics import MetricsAccumulator, compute_metrics
+
+
+def _stream(acc, truth, states, conf):
+    for h, s, c in zip(truth, states, conf):
+        acc.update(h, s, c)
+    return acc
+
+
+def _chunked(acc, truth, states, conf, size):
+    for i in range(0, len(states), size):
+        acc.update_batch(truth[i:i + size], states[i:i + size], conf[i:i + size])
+    return acc
+
+
+def _same(a, b):
+    assert a.result() == b.result()
+    assert a.confusion == b.confusion
+    assert (a.alarm_run, a.detected(), a.n) == (b.alarm_run, b.detected(), b.n)
+    assert a.conf_min == b.conf_min and a.conf_mean == pytest.approx(b.conf_mean)
+
+
+@pytest.mark.parametrize("truth_values", [(0, 1), (0, 2), (-1, 0, 1), (False, True)])
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_update_and_update_batch_agree(truth_values, size):
+    rng = np.random.default_rng(size)
+    for _ in range(50):
+        n = int(rng.integers(0, 120))
+        truth = [truth_values[int(i)] for i in rng.integers(0, len(truth_values), n)]
+        states = rng.integers(0, 3, n).tolist()
+        conf = rng.uniform(0, 1, n).tolist()
+        _same(_stream(MetricsAccumulator(), truth, states, conf),
+              _chunked(MetricsAccumulator(), truth, states, conf, size))
+
+
+def test_compute_metrics_matches_reference():
+    truth = [0, 0, 1, 1, 1, 0, 1]
+    states = [1, 0, 0, 0, 2, 1, 0]
+    assert compute_metrics(truth, states) == {"false_alarms": 2, "missed_hazards": 3, "reaction_time_steps": 2}
+    assert compute_metrics([0, 0], [0, 0])["reaction_time_steps"] == ""
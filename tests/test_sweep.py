@@ -0,0 +1,26 @@
+import sweep
+from sweep import FACTOR_CONFIGS, build_workload, evaluate_candidate, grid_space, run_sweep
+
+
+def test_factor_cache_is_bounded_over_normalization_sweep():
+    workload = build_workload(steps=60, val_runs=4, val_steps=60, seed=1)
+    sweep._init_worker(workload)
+    for cand in grid_space({"mq2_max": [2000.0 + 50 * i for i in range(3 * FACTOR_CONFIGS)]}):
+        evaluate_candidate(cand)
+        assert len(sweep._FACTORS) <= FACTOR_CONFIGS
+    per_config = len(workload["scenarios"]) + len(workload["runs"])
+    assert all(len(v) == per_config for v in sweep._FACTORS.values())
+
+
+def test_cached_factors_do_not_change_results():
+    workload = build_workload(steps=60, val_runs=4, val_steps=60, seed=2)
+    cands = grid_space({"mq2_max": [2200.0, 2500.0], "caution_risk": [0.40, 0.45]})
+    sweep._init_worker(workload)
+    fresh = []
+    for c in cands:
+        sweep._FACTORS.clear()
+        fresh.append(evaluate_candidate(c))
+    rows = run_sweep(cands, workload, workers=1)
+    key = lambda r: (r["mq2_max"], r["caution_risk"])
+    assert sorted((key(r), {k: v for k, v in r.items() if k != "rank"}) for r in rows) == \
+        sorted((key(r), r) for r in fresh)
@@ -0,0 +1,55 @@
+import os
+import time
+
+from app.trace_writer import TraceWriter, iter_traces, trace_files
+
+
+def test_unencodable_record_is_dropped_and_counted(tmp_path):
+    w = TraceWriter(str(tmp_path), flush_s=0.05)
+    assert w.write({"i": 0})
+    assert w.write({"x": object()})
+    w.close()  # flushes the batch with the bad record in it
+    snap = w.snapshot()
+    assert snap["written"] == 1 and snap["dropped"] == 1 and snap["errors"] == 1
+    assert list(iter_traces(trace_files(str(tmp_path)))) == [{"i": 0}]
+
+
+def test_writer_keeps_running_after_bad_record(tmp_path):
+    w = TraceWriter(str(tmp_path), flush_s=0.05, batch_records=1)
+    w.write({"x": object()})
+    for i in range(100):
+        w.write({"i": i})
+    w.close()
+    snap = w.snapshot()
+    assert snap["written"] == 100 and snap["dropped"] == 1 and snap["pending"] == 0
+    assert [r["i"] for r in iter_traces(trace_files(str(tmp_path)))] == list(range(100))
+
+
+def test_full_backlog_drops_instead_of_blocking(tmp_path):
+    w = TraceWriter(str(tmp_path), flush_s=10.0, batch_records=10**6, max_pending=10)
+    accepted = sum(w.write({"i": i}) for i in range(25))
+    w.close()
+    snap = w.snapshot()
+    assert accepted == 10 and snap["dropped"] == 15 and snap["written"] == 10
+
+
+def test_rotation_and_truncated_tail(tmp_path):
+    d = str(tmp_path)
+    w = TraceWriter(d, max_bytes=500, flush_s=0.01, batch_records=50)
+    for i in range(2_000):
+        w.write({"i": i, "pad": "x" * 20})
+        if i % 200 == 199:
+            time.sleep(0.05)  # let the writer thread take a chunk
+    w.close()
+    files = trace_files(d)
+    assert len(files) > 1
+    assert [r["i"] for r in iter_traces(files)] == list(range(2_000))
+
+    os.truncate(files[-1], os.path.getsize(files[-1]) - 10)
+    recs = list(iter_traces(files))
+    assert [r["i"] for r in recs] == list(range(len(recs)))
+
+    # a new writer continues the numbering instead of overwriting
+    with TraceWriter(d) as w2:
+        w2.write({"i": -1})
+    assert trace_files(d)[-1] > files[-1]
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import pty
+import tty
+
+import pytest
+
+from app.transport_async import AsyncSerialHub, AsyncSerialJsonlTransport
+from app.transport_serial import PROTO_BINARY, SerialConfig, encode_binary, encode_jsonl
+
+
+def _open_pty():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    return master, slave
+
+
+@pytest.fixture
+def pty_pair():
+    """Test double for a device: write to `master` to send, read from it to see commands."""
+    master, slave = _open_pty()
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+
+@pytest.fixture
+def two_ptys():
+    pairs = [_open_pty() for _ in range(2)]
+    yield [(m, os.ttyname(s)) for m, s in pairs]
+    for m, s in pairs:
+        os.close(m)
+        os.close(s)
+
+
+async def _settle(tr, n_expected, timeout_s=2.0):
+    # wait until the reader has consumed everything written so far
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    while tr.messages + tr.dropped + tr.decode_errors < n_expected and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def _lines(n, start=0):
+    return b"".join(encode_jsonl({"type": "telemetry", "n": i}) for i in range(start, start + n))
+
+
+def _drain(q):
+    out = []
+    while not q.empty():
+        out.append(q.get_nowait())
+    return out
+
+
+@pytest.mark.parametrize("overflow, kept", [("drop_oldest", [7, 8, 9]), ("drop_newest", [0, 1, 2])])
+def test_drop_policies(pty_pair, overflow, kept):
+    master, port = pty_pair
+
+    async def run():
+        async with AsyncSerialJsonlTransport(SerialConfig(port=port), queue_size=3, overflow=overflow) as tr:
+            os.write(master, _lines(10))
+            await _settle(tr, 10 + 7)
+            return tr, [m["n"] for m in _drain(tr.queue)]
+
+    tr, got = asyncio.run(run())
+    assert got == kept
+    assert tr.dropped == 7
+
+
+def test_corrupt_lines_are_counted_not_raised(pty_pair):
+    master, port = pty_pair
+
+    async def run():
+        async with AsyncSerialJsonlTransport(SerialConfig(port=port)) as tr:
+            os.write(master, _lines(2) + b"{not json\n" + b"[1, 2]\n" + b"\n" + _lines(2, start=2))
+            await _settle(tr, 4 + 2)
+            return tr, [m["n"] for m in _drain(tr.queue)]
+
+    tr, got = asyncio.run(run())
+    assert got == [0, 1, 2, 3]
+    assert tr.decode_errors == 2
+
+
+def test_set_protocol_keeps_decode_errors(pty_pair):
+    master, port = pty_pair
+
+    async def run():
+        async with AsyncSerialJsonlTransport(SerialConfig(port=port)) as tr:
+            os.write(master, b"{bad\n" + _lines(1))
+            await _settle(tr, 2)
+            await tr.set_protocol(PROTO_BINARY)
+            cmd = os.read(master, 1024)
+            os.write(master, b"\x05garbage\x00" + encode_binary({"ts_ms": 1, "mq2": 600}, seq=0))
+            await _settle(tr, 4)
+            return tr, cmd, _drain(tr.queue)
+
+    tr, cmd, msgs = asyncio.run(run())
+    assert b'"proto"' in cmd
+    assert tr.decode_errors == 2  # one from the JSON Lines framer, one from bin1
+    assert [m.get("mq2") for m in msgs] == [None, 600]
+
+
+def test_hub_tags_messages_by_port(pty_pair):
+    master, port = pty_pair
+
+    async def run():
+        hub = AsyncSerialHub(queue_size=8)
+        try:
+            await hub.add(SerialConfig(port=port))
+            os.write(master, _lines(3))
+            got = [await hub.read(timeout_s=2.0) for _ in range(3)]
+            await hub.write(port, {"type": "cmd", "cmd": "fan_set", "value": 1})
+            return got, os.read(master, 1024)
+        finally:
+            await hub.close()
+
+    got, cmd = asyncio.run(run())
+    assert [(p, m["n"]) for p, m in got] == [(port, 0), (port, 1), (port, 2)]
+    assert cmd == encode_jsonl({"type": "cmd", "cmd": "fan_set", "value": 1})
+
+
+def test_hub_transport_waits_on_its_own_port(two_ptys):
+    (master_a, port_a), (master_b, port_b) = two_ptys
+
+    async def run():
+        hub = AsyncSerialHub(queue_size=16)
+        try:
+            await hub.add(SerialConfig(port=port_a))
+            tr_b = await hub.add(SerialConfig(port=port_b))
+            os.write(master_a, _lines(3))
+            os.write(master_b, _lines(1, start=10) + encode_jsonl({"type": "ack", "cmd": "fan_set"}) + _lines(1, start=11))
+            ack = await tr_b.wait_for(lambda m: m.get("type") == "ack", timeout_s=2.0)
+            nxt = await tr_b.read_message(timeout_s=2.0)
+            rest = [await hub.read(timeout_s=1.0) for _ in range(3)]
+            return ack, nxt, rest, await tr_b.read_message(timeout_s=0.05)
+        finally:
+            await hub.close()
+
+    ack, nxt, rest, none = asyncio.run(run())
+    assert ack == {"type": "ack", "cmd": "fan_set"}
+    assert nxt["n"] == 11
+    # the other port's messages are untouched and still in order
+    assert [(p, m["n"]) for p, m in rest] == [(port_a, 0), (port_a, 1), (port_a, 2)]
+    assert none is None
+
+
+def test_hub_charges_evictions_to_the_evicted_port(two_ptys):
+    (master_a, port_a), (master_b, port_b) = two_ptys
+
+    async def run():
+        hub = AsyncSerialHub(queue_size=3)
+        try:
+            tr_a = await hub.add(SerialConfig(port=port_a))
+            tr_b = await hub.add(SerialConfig(port=port_b))
+            os.write(master_a, _lines(3))
+            await _settle(tr_a, 3)
+            os.write(master_b, _lines(2, start=10))
+            await _settle(tr_b, 2)
+            return tr_a.dropped, tr_b.dropped, hub.dropped, _drain(hub.queue)
+        finally:
+            await hub.close()
+
+    dropped_a, dropped_b, total, left = asyncio.run(run())
+    assert (dropped_a, dropped_b, total) == (2, 0, 2)
+    assert [(p, m["n"]) for p, m in left] == [(port_a, 2), (port_b, 10), (port_b, 11)]
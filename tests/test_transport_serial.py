@@ -0,0 +1,88 @@
+import os
+import pty
+import time
+import tty
+
+import pytest
+
+from app.transport_serial import LinkStats, SerialConfig, SerialJsonlTransport, encode_jsonl
+
+
+@pytest.fixture
+def pty_pair():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+
+def test_rate_windows_are_independent():
+    st = LinkStats()
+    st.on_read(1000, [{}] * 10, 0.0)
+    now = time.monotonic()
+    a = (now - 10.0, 0, 0, 0, 0)      # a consumer that started 10 s ago
+    b = (now - 1.0,) + st.mark()[1:]  # one that last looked 1 s ago, after the first 10 messages
+    st.on_read(500, [{}] * 5, 0.0)
+    # taking one consumer's rates does not move another's window
+    for _ in range(3):
+        st.rates(b)
+        st.snapshot(b)
+    assert st.rates(a)["rx_msgs_per_s"] == pytest.approx(1.5, rel=0.01)
+    assert st.rates(b)["rx_msgs_per_s"] == pytest.approx(5.0, rel=0.01)
+    assert st.rates(b)["rx_bytes_per_s"] == pytest.approx(500.0, rel=0.01)
+
+
+def test_latency_relative_to_fastest_frame_and_clock_reset():
+    st = LinkStats(offset_window=4)
+    # device clock 1000 ms behind the host; frames arrive 0..3 ms late
+    for i, late in enumerate([2, 0, 3, 1, 2, 0]):
+        st.on_read(10, [{"ts_ms": 100 * i}], 1000.0 + 100 * i + late)
+    assert st.offset_ms == pytest.approx(1000.0)
+    assert st.latency.max == 3_000_000
+    st.on_read(10, [{"ts_ms": 5}], 9000.0)  # device rebooted
+    assert st.clock_resets == 1
+    assert st.offset_ms == pytest.approx(8995.0)
+
+
+def test_transport_counters_and_log_window(pty_pair):
+    master, port = pty_pair
+    tr = SerialJsonlTransport(SerialConfig(port=port, read_timeout_s=0.05, stats_log_s=1e-6))
+    lines = []
+    tr.log = lines.append
+    try:
+        os.write(master, b"".join(encode_jsonl({"type": "telemetry", "ts_ms": i}) for i in range(5)) + b"{bad\n")
+        time.sleep(0.05)
+        msgs = tr.read_messages()
+        assert len(msgs) == 5
+        assert tr.read_messages() == []
+        tr.write_message({"type": "cmd", "cmd": "fan_set", "value": 1})
+        assert os.read(master, 1024).endswith(b"\n")
+
+        snap = tr.link_snapshot()
+        assert snap["rx_msgs"] == 5 and snap["tx_msgs"] == 1
+        assert snap["decode_errors"] == 1
+        assert snap["empty_reads"] >= 1
+        assert snap["latency"]["count"] == 5
+        # the periodic log line ran, and kept its own window: the snapshot still covers all traffic
+        assert lines and lines[0].startswith(f"[{port}]")
+        assert snap["rx_msgs_per_s"] > 0
+    finally:
+        tr.close()
+
+
+def test_wait_for_keeps_deadline(pty_pair):
+    master, port = pty_pair
+    tr = SerialJsonlTransport(SerialConfig(port=port, read_timeout_s=1.0))
+    try:
+        os.write(master, encode_jsonl({"type": "ack", "n": 1}) + encode_jsonl({"type": "ack", "n": 2}))
+        assert tr.wait_for(lambda m: m.get("n") == 2, timeout_s=1.0)["n"] == 2
+        t0 = time.monotonic()
+        with pytest.raises(TimeoutError):
+            tr.wait_for(lambda m: False, timeout_s=0.2)
+        # read_timeout_s is 1 s; the deadline must not overshoot by a whole read
+        assert time.monotonic() - t0 < 0.5
+        assert tr.ser.timeout == 1.0
+    finally:
+        tr.close()
@@ -0,0 +1,29 @@
+import csv
+import os
+
+import pytest
+
+from validation import RESULT_FIELDS, iter_runs, write_results
+
+PUBLISHED = os.path.join(os.path.dirname(__file__), os.pardir, "data", "aeis_validation_results.csv")
+RUNS = 60
+
+
+@pytest.mark.parametrize("engine", ["batch", "grid"])
+def test_write_results_reproduces_published_rows(tmp_path, engine):
+    out = tmp_path / "results.csv"
+    write_results(iter_runs(runs=RUNS, workers=1, engine=engine), str(out))
+    got = out.read_bytes()
+    assert b"\r" not in got
+    with open(PUBLISHED, "rb") as f:
+        want = f.read().split(b"\n")[:RUNS + 1]
+    got = got.split(b"\n")
+    assert got[-1] == b"" and len(got) == RUNS + 2
+    assert got[0] == want[0] == ",".join(RESULT_FIELDS).encode()
+    risk = RESULT_FIELDS.index("max_effective_risk")
+    for g, w in zip(got[1:-1], want[1:]):
+        g, w = next(csv.reader([g.decode()])), next(csv.reader([w.decode()]))
+        # published before the running-sum trend forecaster: this column may move by a few ulps
+        assert float(g[risk]) == pytest.approx(float(w[risk]), rel=1e-14, abs=0)
+        g[risk] = w[risk] = ""
+        assert g == w